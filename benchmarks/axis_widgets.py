@@ -0,0 +1,101 @@
+"""GUI thread time spent per second of a sustained synthetic axis sweep, comparing
+the original QLabel/QLineEdit pair per axis with the AxisBarsWidget.
+
+    python -m benchmarks.axis_widgets [--seconds 5] [--rate 500]
+"""
+import argparse
+import math
+import os
+import time
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PySide6.QtWidgets import (  # noqa: E402
+    QApplication,
+    QGroupBox,
+    QHBoxLayout,
+    QLabel,
+    QLineEdit,
+    QVBoxLayout,
+)
+
+from ed_joy.widgets import AxisBarsWidget  # noqa: E402
+
+DEVICES = 3
+AXES = 8
+
+
+def line_edits(layout):
+    """The original widgets, one QLabel/QLineEdit pair per axis"""
+    widgets = {}
+    for joy_id in range(DEVICES):
+        box_layout = QVBoxLayout()
+        widgets[joy_id] = {}
+        for axis in range(AXES):
+            row = QHBoxLayout()
+            le_axis = QLineEdit()
+            le_axis.setReadOnly(True)
+            row.addWidget(QLabel(f"Axis {axis}"))
+            row.addWidget(le_axis)
+            box_layout.addLayout(row)
+            widgets[joy_id][axis] = le_axis
+        box = QGroupBox()
+        box.setLayout(box_layout)
+        layout.addWidget(box)
+    return lambda joy_id, axis, val: widgets[joy_id][axis].setText(str(val))
+
+
+def axis_bars(layout):
+    widgets = {}
+    for joy_id in range(DEVICES):
+        widgets[joy_id] = AxisBarsWidget(AXES)
+        layout.addWidget(widgets[joy_id])
+    return lambda joy_id, axis, val: widgets[joy_id].set_axis(axis, val)
+
+
+def sweep(app, build, seconds, rate):
+    """Feed every axis a sine sweep, rate batches per second
+
+    Returns:
+        float: GUI thread CPU seconds used per wall clock second
+    """
+    container = QGroupBox()
+    layout = QHBoxLayout()
+    update = build(layout)
+    container.setLayout(layout)
+    container.show()
+    app.processEvents()
+
+    start = time.perf_counter()
+    cpu_start = time.thread_time()
+    n = 0
+    while (now := time.perf_counter()) - start < seconds:
+        for joy_id in range(DEVICES):
+            for axis in range(AXES):
+                val = int(100 * math.sin(now * 2 + axis + joy_id))
+                update(joy_id, axis, val)
+        app.processEvents()
+        n += 1
+        # Sleep until the next batch is due
+        time.sleep(max(0, start + n / rate - time.perf_counter()))
+    elapsed = time.perf_counter() - start
+    used = time.thread_time() - cpu_start
+    container.close()
+    return used / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--seconds", type=float, default=5)
+    parser.add_argument("--rate", type=int, default=500)
+    args = parser.parse_args()
+
+    app = QApplication([])
+    print(f"{DEVICES} devices x {AXES} axes, {args.rate} batches/s")
+    for name, build in (("QLineEdit", line_edits), ("AxisBarsWidget", axis_bars)):
+        busy = sweep(app, build, args.seconds, args.rate)
+        print(f"{name:<16} {busy * 1000:7.1f} ms GUI thread time per second")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""Feed a pipe backed fake joystick to the EvdevBackend and report how long
+frames take from being written, stamped like the kernel stamps them, to being
+returned by wait_for_events. Linux only.
+
+    python -m benchmarks.evdev_backend
+"""
+import os
+import threading
+import time
+
+from ed_joy.evdev import (
+    ABS_HAT0X,
+    ABS_X,
+    ABS_Y,
+    BTN_JOYSTICK,
+    EV_ABS,
+    EV_KEY,
+    EV_SYN,
+    INPUT_EVENT,
+    SYN_REPORT,
+    EvdevBackend,
+    EvdevDevice,
+)
+from ed_joy.inputs import JOYDEVICEREMOVED
+from ed_joy.metrics import percentile
+
+FRAMES = 5000
+RATE = 1000
+"""Frames per second, a fast USB joystick"""
+
+
+def record(ts, ev_type, code, value):
+    return INPUT_EVENT.pack(int(ts), int(ts % 1 * 1e6), ev_type, code, value)
+
+
+def writer(fd):
+    """Write FRAMES frames of two axes, and now and then a button and the hat"""
+    interval = 1 / RATE
+    due = time.perf_counter()
+    for i in range(FRAMES):
+        ts = time.perf_counter()
+        frame = record(ts, EV_ABS, ABS_X, i % 1024) + record(ts, EV_ABS, ABS_Y, 1023)
+        if i % 50 == 0:
+            frame += record(ts, EV_KEY, BTN_JOYSTICK, i // 50 % 2)
+            frame += record(ts, EV_ABS, ABS_HAT0X, i // 50 % 3 - 1)
+        os.write(fd, frame + record(ts, EV_SYN, SYN_REPORT, 0))
+        due += interval
+        time.sleep(max(due - time.perf_counter(), 0))
+    os.close(fd)
+
+
+def main():
+    r, w = os.pipe()
+    os.set_blocking(r, False)
+    backend = EvdevBackend(pattern=None)
+    backend.start()
+    backend.add_device(EvdevDevice(
+        r,
+        "Fake joystick",
+        axes=[(ABS_X, 0, 1023, 512), (ABS_Y, 0, 1023, 512)],
+        buttons=[BTN_JOYSTICK],
+        hats=[0],
+    ))
+
+    thread = threading.Thread(target=writer, args=(w,))
+    latencies = []
+    events = wakeups = 0
+    removed = False
+    start = time.perf_counter()
+    thread.start()
+    while not removed:
+        batch = backend.wait_for_events()
+        now = time.perf_counter()
+        wakeups += 1
+        events += len(batch)
+        for event in batch:
+            probe_ts = getattr(event, "probe_ts", None)
+            if probe_ts is not None:
+                latencies.append(now - probe_ts)
+            if event.type == JOYDEVICEREMOVED:
+                removed = True  # The writer closed the pipe
+    elapsed = time.perf_counter() - start
+    thread.join()
+    backend.stop()
+
+    latencies.sort()
+    print(f"{FRAMES} frames at {RATE}/s, {events} events in {wakeups} wakeups")
+    print(f"{events / elapsed:.0f} events/s, {wakeups / elapsed:.0f} wakeups/s")
+    print(
+        f"write to read latency p50 {percentile(latencies, 50) * 1e3:.3f}ms, "
+        f"p99 {percentile(latencies, 99) * 1e3:.3f}ms, "
+        f"max {latencies[-1] * 1e3:.3f}ms"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,157 @@
+"""End-to-end input to focus latency, run headless.
+
+Drives Joysticks, MainWindow and ProcessMonitorWorker together using SDL's dummy
+drivers, Qt's offscreen platform and the FakeWindowBackend. Synthetic axis events
+are injected one at a time and the time each stage is reached is recorded.
+sdl_event is when the joystick loop dequeued the injected SDL event, sdl->emit
+the time from there to the axes_moved signal.
+
+    python -m benchmarks.focus_latency [--mode event|fps] [--samples 200]
+"""
+import argparse
+import os
+import time
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PySide6.QtCore import Qt  # noqa: E402
+from PySide6.QtWidgets import QApplication  # noqa: E402
+
+from ed_joy.core import MainWindow  # noqa: E402
+from ed_joy.emitters import ProcessMonitorEmitter  # noqa: E402
+from ed_joy.joysticks import Joysticks, percentile  # noqa: E402
+from ed_joy.settings import Settings  # noqa: E402
+from ed_joy.widgets import AxisBarsWidget  # noqa: E402
+from ed_joy.windows import FakeWindowBackend  # noqa: E402
+
+STAGES = ("sdl_event", "emit", "gui_slot", "focus_queued", "focus_performed")
+SDL_TO_EMIT = "sdl->emit"
+JOY_ID = 0
+AXIS = 0
+TIMEOUT = 1.0
+
+
+def run_samples(app, joysticks, backend, other, marks, args):
+    """Inject one probe per sample and time each stage until the focus happens"""
+    results = {stage: [] for stage in (*STAGES, SDL_TO_EMIT)}
+    missed = 0
+    for i in range(args.samples):
+        marks.clear()
+        backend.set_foreground(other)
+        focused = len(backend.focused)
+
+        start = time.perf_counter()
+        joysticks.inject_probe(JOY_ID, AXIS, 0.5 if i % 2 else -0.5)
+        deadline = start + TIMEOUT
+        while len(backend.focused) == focused and time.perf_counter() < deadline:
+            app.processEvents()
+            time.sleep(0.0001)
+
+        if len(backend.focused) == focused:
+            missed += 1
+            continue
+        marks["focus_performed"] = backend.focused[-1][1]
+        for stage in STAGES:
+            if stage in marks:
+                results[stage].append(marks[stage] - start)
+        if "sdl_event" in marks and "emit" in marks:
+            results[SDL_TO_EMIT].append(marks["emit"] - marks["sdl_event"])
+    return results, missed
+
+
+def report(args, results, missed):
+    """Print p50/p99/max per stage in milliseconds, from the injection for the
+    STAGES"""
+    print(f"mode={args.mode} samples={args.samples} missed={missed}")
+    print(f"{'stage':<16} {'p50 ms':>8} {'p99 ms':>8} {'max ms':>8}")
+    for stage, values in results.items():
+        values = sorted(values)
+        if not values:
+            print(f"{stage:<16} {'-':>8} {'-':>8} {'-':>8}")
+            continue
+        print(
+            f"{stage:<16} {percentile(values, 50) * 1000:8.3f} "
+            f"{percentile(values, 99) * 1000:8.3f} {values[-1] * 1000:8.3f}"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--mode", choices=("event", "fps"), default="event")
+    parser.add_argument("--samples", type=int, default=200)
+    args = parser.parse_args()
+
+    settings = Settings()
+    # Changes are then only written by flush(), the saved config is left alone
+    settings.stop_writer()
+    title = settings["monitor.process.title"]
+    settings["monitor.joysticks"] = [JOY_ID]
+    settings["monitor.process.enabled"] = True
+
+    backend = FakeWindowBackend()
+    backend.create_window(title)
+    other = backend.create_window("Some other window")
+
+    app = QApplication([])
+    joysticks = Joysticks()
+    joysticks.mode = args.mode
+    joysticks.start()
+
+    window = MainWindow(ProcessMonitorEmitter(), window_backend=backend)
+    # The dummy joystick driver has no devices, give the probe axis a widget
+    window.joystick_axis_widgets[JOY_ID] = AxisBarsWidget(AXIS + 1)
+    window.start_proc_monitor()
+    window.pm.refocus_interval = 0
+
+    marks = {}
+
+    def mark(stage):
+        marks.setdefault(stage, time.perf_counter())
+
+    # Runs on the joystick thread. The probe was stamped with time.time() as it
+    # was dequeued, see Joysticks._drain
+    clock_offset = time.perf_counter() - time.time()
+    handle_event = joysticks._handle_event
+
+    def sdl_event(event, now):
+        if getattr(event, "probe_ts", None) is not None:
+            marks.setdefault("sdl_event", event.ts + clock_offset)
+        handle_event(event, now)
+
+    joysticks._handle_event = sdl_event
+
+    # Runs on the joystick thread, as soon as the batch is emitted
+    joysticks.emitter.axes_moved.connect(
+        lambda batch, now: mark("emit"), Qt.DirectConnection
+    )
+
+    def gui_slot(batch, now):
+        mark("gui_slot")
+        window.update_axes_batch(batch, now)
+
+    joysticks.emitter.axes_moved.connect(gui_slot)
+
+    focus_on_monitor_window = window.pm.focus_on_monitor_window
+
+    def focus_queued(target=None):
+        mark("focus_queued")
+        focus_on_monitor_window(target)
+
+    window.pm.focus_on_monitor_window = focus_queued
+
+    results, missed = run_samples(app, joysticks, backend, other, marks, args)
+    # Read before stopping, stop_proc_monitor drops the worker
+    focus_stats = dict(window.pm.focus_stats)
+
+    window.stop_proc_monitor()
+    joysticks.stop()
+
+    report(args, results, missed)
+    print(f"joystick loop: {joysticks.stats.snapshot()}")
+    print(f"focus: {focus_stats}")
+
+
+if __name__ == "__main__":
+    main()
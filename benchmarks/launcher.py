@@ -0,0 +1,97 @@
+"""Start and stop dummy companion apps one after the other, as a simple launcher
+would, then with the Launcher. Each app is a Python child that only opens its
+port after a delay, half of them ignore the terminate request and are killed.
+
+    python -m benchmarks.launcher
+"""
+import socket
+import sys
+import time
+
+from ed_joy.launcher import CompanionApp, Launcher
+from ed_joy.windows import FakeWindowBackend
+
+APPS = 4
+STARTUP = 0.5
+"""Seconds each app takes to open its port"""
+STOP_TIMEOUT = 1.0
+
+APP_SOURCE = """
+import signal, socket, sys, time
+if sys.argv[3] == "stubborn":
+    signal.signal(signal.SIGTERM, signal.SIG_IGN)
+time.sleep(float(sys.argv[2]))
+s = socket.socket()
+s.bind(("127.0.0.1", int(sys.argv[1])))
+s.listen()
+time.sleep(60)
+"""
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def build_apps():
+    return [
+        CompanionApp(
+            f"app{i}",
+            [
+                sys.executable,
+                "-c",
+                APP_SOURCE,
+                str(port),
+                str(STARTUP),
+                "stubborn" if i % 2 == 0 else "polite",
+            ],
+            ready_port=port,
+            ready_timeout=10,
+        )
+        for i, port in enumerate(free_port() for _ in range(APPS))
+    ]
+
+
+def sequential():
+    """Start, wait for and stop the apps one at a time"""
+    launchers = [
+        Launcher([app], window_backend=FakeWindowBackend(), stop_timeout=STOP_TIMEOUT)
+        for app in build_apps()
+    ]
+    start = time.perf_counter()
+    for launcher in launchers:
+        for future in launcher.start_all():
+            future.result()
+    started = time.perf_counter() - start
+    start = time.perf_counter()
+    for launcher in launchers:
+        launcher.shutdown()
+    return started, time.perf_counter() - start
+
+
+def parallel():
+    launcher = Launcher(
+        build_apps(), window_backend=FakeWindowBackend(), stop_timeout=STOP_TIMEOUT
+    )
+    start = time.perf_counter()
+    # What the process monitor emits when the game window appears
+    launcher.on_process_running("default", True)
+    while not all(state == "ready" for state in launcher.states.values()):
+        time.sleep(0.01)
+    started = time.perf_counter() - start
+    assert not launcher.start_all(), "apps started twice"
+    start = time.perf_counter()
+    launcher.shutdown()
+    return started, time.perf_counter() - start
+
+
+def main():
+    print(f"{APPS} apps, {STARTUP}s startup, {STOP_TIMEOUT}s stop timeout")
+    for name, run in (("sequential", sequential), ("launcher", parallel)):
+        started, stopped = run()
+        print(f"{name:<12} ready in {started:6.2f}s, stopped in {stopped:6.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""Replay a recorded input session through Joysticks and report the pipeline
+throughput. Recordings are made by setting joysticks.record in the settings.
+
+    python -m benchmarks.replay recording.bin [--realtime]
+"""
+import argparse
+import os
+import time
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PySide6.QtCore import Qt  # noqa: E402
+from PySide6.QtWidgets import QApplication  # noqa: E402
+
+from ed_joy.joysticks import Joysticks  # noqa: E402
+from ed_joy.recording import ReplaySource  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("path")
+    parser.add_argument("--realtime", action="store_true")
+    args = parser.parse_args()
+
+    app = QApplication([])
+    signals = {"axes_moved": 0, "axes": 0, "buttons": 0, "hats": 0}
+
+    def on_axes(batch, now):
+        signals["axes_moved"] += 1
+        signals["axes"] += len(batch) // 3
+
+    def on_button(joy_id, button, now):
+        signals["buttons"] += 1
+
+    def on_hat(joy_id, hat, value, now):
+        signals["hats"] += 1
+
+    joysticks = Joysticks()
+    joysticks.record_path = ""  # Don't record the replay
+    joysticks.source = source = ReplaySource(args.path, args.realtime)
+    emitter = joysticks.emitter
+    emitter.axes_moved.connect(on_axes, Qt.DirectConnection)
+    emitter.button_down.connect(on_button, Qt.DirectConnection)
+    emitter.button_up.connect(on_button, Qt.DirectConnection)
+    emitter.hat_motion.connect(on_hat, Qt.DirectConnection)
+
+    start = time.perf_counter()
+    joysticks.start()
+    while not source.finished:
+        app.processEvents()
+        time.sleep(0.01)
+    elapsed = time.perf_counter() - start
+    joysticks.stop()
+
+    print(f"replayed {source.count} events in {elapsed:.3f}s")
+    print(f"{source.count / elapsed:.0f} events/s, signals: {signals}")
+    joy_filter = joysticks.filter
+    print(f"filter passed {joy_filter.passed}, dropped {joy_filter.dropped}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""Compare a full window rescan on every pass against the WindowTracker, using
+the in-memory FakeWindowBackend. The process variant matches on the executable
+name and renames the window halfway through.
+
+    python -m benchmarks.window_tracking
+"""
+import time
+
+from ed_joy.windows import (
+    FakeWindowBackend,
+    Target,
+    WindowMatcher,
+    WindowTracker,
+    title_matcher,
+)
+
+WINDOWS = 300
+PASSES = 10000
+TITLE = "Elite - Dangerous (CLIENT)"
+EXECUTABLE = "EliteDangerous64.exe"
+
+
+def build_backend(notifications):
+    backend = FakeWindowBackend(notifications)
+    for i in range(WINDOWS):
+        backend.create_window(f"Some window {i}", backend.create_process(f"{i}.exe"))
+    backend.create_window(TITLE, backend.create_process(EXECUTABLE))
+    return backend
+
+
+def full_scan():
+    """The original approach, enumerate and match every window on every pass"""
+    backend = build_backend(False)
+    match = title_matcher(TITLE)
+    start = time.perf_counter()
+    for _ in range(PASSES):
+        for _hwnd, title in backend.enum_windows():
+            if match(title):
+                break
+    return time.perf_counter() - start, backend.calls
+
+
+def tracker(notifications):
+    backend = build_backend(notifications)
+    engine = WindowTracker(backend, title_matcher(TITLE))
+    engine.start()
+    start = time.perf_counter()
+    for _ in range(PASSES):
+        engine.refresh()
+    return time.perf_counter() - start, backend.calls
+
+
+def tracker_process(notifications):
+    backend = build_backend(notifications)
+    match = WindowMatcher([Target("default", TITLE, EXECUTABLE)])
+    engine = WindowTracker(backend, match)
+    engine.start()
+    start = time.perf_counter()
+    for i in range(PASSES):
+        if i == PASSES // 2:
+            backend.set_title(engine.hwnd, "Elite - Dangerous (renamed)")
+        engine.refresh()
+    return time.perf_counter() - start, backend.calls
+
+
+def main():
+    print(f"{WINDOWS + 1} windows, {PASSES} passes")
+    for name, bench in (
+        ("full scan", full_scan),
+        ("tracker (polling)", lambda: tracker(False)),
+        ("tracker (notifications)", lambda: tracker(True)),
+        ("tracker (process, polling)", lambda: tracker_process(False)),
+        ("tracker (process, notif.)", lambda: tracker_process(True)),
+    ):
+        elapsed, calls = bench()
+        print(f"{name:<28} {elapsed / PASSES * 1e6:8.2f} us/pass  {calls}")
+
+
+if __name__ == "__main__":
+    main()
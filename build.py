@@ -1,4 +1,6 @@
 import sys
+import tomllib
+from pathlib import Path
 
 import PyInstaller.__main__
 import questionary as quest
@@ -29,6 +31,15 @@ Only the following command-line options have an effect when building from a spec
     --log-level
 """
 
+def bake_version():
+    """Write the version from pyproject.toml to ed_joy/_version.py so the
+    bundle does not need to parse pyproject.toml at runtime"""
+    with open("pyproject.toml", "rb") as f:
+        version = tomllib.load(f)["project"]["version"]
+    Path("ed_joy", "_version.py").write_text(
+        f'"""Generated by build.py"""\n__version__ = "{version}"\n'
+    )
+
 def file():
     # print("Building file")
     call_installer("ed_joy_onefile.spec","dist\\onefile")
@@ -41,6 +52,7 @@ def both():
     file()
 
 def call_installer(spec, dist_path):
+    bake_version()
     PyInstaller.__main__.run([
         spec,
         "--noconfirm",
@@ -1,5 +1,4 @@
 import sys
-import tomllib
 from pathlib import Path
 
 
@@ -27,10 +26,19 @@ def resource_path(relative_path, mkdir=False):
     return ret_pth
 
 def get_version():
-    """Read the project version from pyproject.toml.
+    """Get the project version, baked in by build.py or read from pyproject.toml.
     Returns:
         str: semver version
     """
+    try:
+        from ed_joy._version import __version__
+
+        return __version__
+    except ImportError:
+        pass
+
+    import tomllib
+
     pyproject = Path(__file__).parent.parent / "pyproject.toml"
     with pyproject.open("rb") as f:
         data = tomllib.load(f)
@@ -0,0 +1,36 @@
+import multiprocessing
+import sys
+
+
+def main():
+    """Entry point, python -m ed_joy [--headless] [--asyncio] [--startup-profile]
+    [--trace FILE]"""
+    # Frozen builds start the capture process by running the executable again
+    multiprocessing.freeze_support()
+    if "--startup-profile" in sys.argv:
+        # Enable before anything else is imported
+        from ed_joy import startup
+
+        startup.enable()
+
+    if "--trace" in sys.argv:
+        index = sys.argv.index("--trace") + 1
+        if index >= len(sys.argv):
+            sys.exit("--trace needs a file name, e.g. --trace trace.json")
+        from ed_joy import tracing
+
+        tracing.enable(sys.argv[index])
+
+    if "--headless" in sys.argv:
+        # Avoid importing core, which loads the Qt widgets
+        from ed_joy import headless
+
+        headless.run("--asyncio" in sys.argv)
+    else:
+        from ed_joy import core
+
+        core.run("--asyncio" in sys.argv)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""Optional asyncio core, enabled with --asyncio. Joystick reading, window
+tracking, focus scheduling and settings persistence run as tasks and timers on a
+single asyncio event loop. With the window, the loop is driven by the Qt event
+loop through QtAsyncio, so signals are delivered without crossing threads."""
+import asyncio
+
+from ed_joy import logs
+
+
+class AsyncCore:
+    """Run the joystick loop and the settings persistence on the running event
+    loop. The process monitor is an AsyncProcessMonitor, started by its owner."""
+
+    def __init__(self, joysticks, settings):
+        """
+        Args:
+            joysticks (Joysticks): Joysticks
+            settings (Settings): Settings
+        """
+        self.joysticks = joysticks
+        self.settings = settings
+        self._joystick_task = None
+        self._save_handle = None
+        """Pending settings write, see _on_settings_change"""
+        self._loop = None
+        self._logger = logs.get_logger(__name__)
+
+    def start(self):
+        """Start the tasks, call from a coroutine running on the event loop"""
+        self._loop = asyncio.get_running_loop()
+        if self.joysticks.capture != "thread":
+            self._logger.warning("joysticks.capture is ignored by the asyncio core")
+        if self.joysticks.backend != "pygame":
+            self._logger.warning("joysticks.backend is ignored by the asyncio core")
+        self._joystick_task = asyncio.ensure_future(self.joysticks.run_async())
+        self._joystick_task.add_done_callback(self._on_task_done)
+
+        # Write settings from a timer on the event loop, not the writer thread
+        self.settings.stop_writer()
+        self.settings.subscribe(self._on_settings_change)
+
+    def stop(self):
+        """Cancel the tasks and write any pending settings"""
+        if self._joystick_task is not None:
+            self._joystick_task.cancel()
+            self._joystick_task = None
+        self.settings.unsubscribe(self._on_settings_change)
+        if self._save_handle is not None:
+            self._save_handle.cancel()
+            self._save_handle = None
+        self.settings.flush()
+
+    def _on_task_done(self, task):
+        """Private: Log a task that ended with an exception"""
+        if not task.cancelled() and task.exception() is not None:
+            self._logger.error("Joystick task failed", exc_info=task.exception())
+
+    def _on_settings_change(self, snapshot):
+        """Private: Batch changes for save_delay seconds, then write them"""
+        if self._save_handle is None:
+            self._save_handle = self._loop.call_later(
+                self.settings.save_delay, self._save_settings
+            )
+
+    def _save_settings(self):
+        """Private: Timer callback writing the batched changes"""
+        self._save_handle = None
+        try:
+            self.settings.flush()
+        except Exception:
+            self._logger.exception("Exception occurred while saving settings.")
+
+    async def main(self):
+        """Start the tasks, for QtAsyncio.run() which then keeps running"""
+        self.start()
@@ -0,0 +1,300 @@
+"""Input capture in a separate process. The capture process reads SDL and writes
+fixed size records into a shared memory ring buffer, the main process reads them
+in place. Device metadata, which is rare and variable sized, goes over a queue.
+"""
+import multiprocessing as mp
+import os
+import queue
+import struct
+import time
+from multiprocessing import shared_memory
+
+from ed_joy.inputs import (
+    JOYAXISMOTION,
+    JOYBUTTONDOWN,
+    JOYBUTTONUP,
+    JOYDEVICEADDED,
+    JOYDEVICEREMOVED,
+    JOYHATMOTION,
+    InputEvent,
+)
+
+# OS environ call to hide the PyGame support prompt
+os.environ["PYGAME_HIDE_SUPPORT_PROMPT"] = "hide"
+pg = None
+"""pygame, only imported in the capture process, see capture_main"""
+
+RING_HEADER = struct.Struct("<QQ")
+"""Capacity, write sequence. Padded to RING_HEADER_SIZE"""
+RING_HEADER_SIZE = 64
+RING_RECORD = struct.Struct("<dHBBhh")
+"""Timestamp, SDL instance ID, kind, axis/button/hat, value, value. 16 bytes"""
+
+AXIS, BUTTON_DOWN, BUTTON_UP, HAT = 0, 1, 2, 3
+AXIS_SCALE = 32767
+
+
+class EventRing:
+    """Single producer, single consumer ring of RING_RECORDs in shared memory.
+    The producer never waits, a consumer that falls more than a full ring behind
+    skips ahead and counts the records it lost."""
+
+    def __init__(self, name=None, capacity=4096):
+        """
+        Args:
+            name (str, optional): Attach to an existing ring. Defaults to None,
+                                  creating a new one.
+            capacity (int, optional): Records held when creating. Defaults to 4096.
+        """
+        if name is None:
+            size = RING_HEADER_SIZE + RING_RECORD.size * capacity
+            self._shm = shared_memory.SharedMemory(create=True, size=size)
+            RING_HEADER.pack_into(self._shm.buf, 0, capacity, 0)
+            self._owner = True
+        else:
+            # The creating process owns the memory, don't let the tracker unlink it
+            self._shm = shared_memory.SharedMemory(name=name, track=False)
+            self._owner = False
+        self._buf = self._shm.buf
+        self.capacity = RING_HEADER.unpack_from(self._buf, 0)[0]
+        self._write = 0
+        """Producer: next sequence to write"""
+        self._read = 0
+        """Consumer: next sequence to read"""
+        self.lost = 0
+        """Consumer: records overwritten before they were read"""
+
+    @property
+    def name(self):
+        return self._shm.name
+
+    def _offset(self, seq):
+        return RING_HEADER_SIZE + (seq % self.capacity) * RING_RECORD.size
+
+    def write(self, ts, instance_id, kind, index, v0, v1):
+        """Producer: append a record"""
+        RING_RECORD.pack_into(
+            self._buf, self._offset(self._write), ts, instance_id, kind, index, v0, v1
+        )
+        self._write += 1
+        # Publish the record only once it is fully written
+        struct.pack_into("<Q", self._buf, 8, self._write)
+
+    def read(self):
+        """Consumer: read every record written since the last call, in place
+
+        Yields:
+            tuple: timestamp, instance ID, kind, index, value, value
+        """
+        write = struct.unpack_from("<Q", self._buf, 8)[0]
+        if write - self._read > self.capacity:
+            self.lost += write - self._read - self.capacity
+            self._read = write - self.capacity
+        while self._read < write:
+            yield RING_RECORD.unpack_from(self._buf, self._offset(self._read))
+            self._read += 1
+
+    def close(self):
+        self._buf = None
+        self._shm.close()
+        if self._owner:
+            self._shm.unlink()
+
+
+def _describe(joy):
+    """Private: Device metadata sent to the main process"""
+    return {
+        "instance_id": joy.get_instance_id(),
+        "guid": joy.get_guid(),
+        "name": joy.get_name(),
+        "num_axes": joy.get_numaxes(),
+        "num_buttons": joy.get_numbuttons(),
+        "num_hats": joy.get_numhats(),
+        "axes": [joy.get_axis(axis) for axis in range(joy.get_numaxes())],
+    }
+
+
+def _capture_device(event, joysticks, devices):
+    """Private: Open or close a device and queue its metadata
+
+    Args:
+        event (pg.event.Event): JOYDEVICEADDED or JOYDEVICEREMOVED event
+        joysticks (dict): Opened joysticks by SDL instance ID
+        devices (mp.Queue): Device metadata queue, see capture_main
+    """
+    if event.type == pg.JOYDEVICEADDED:
+        joy = pg.joystick.Joystick(event.device_index)
+        joy.init()
+        joysticks[joy.get_instance_id()] = joy
+        devices.put(("added", _describe(joy)))
+    else:
+        joy = joysticks.pop(event.instance_id, None)
+        if joy is not None:
+            joy.quit()
+        devices.put(("removed", event.instance_id))
+
+
+def _capture_input(event, now, ring):
+    """Private: Write an axis, button or hat event to the ring
+
+    Args:
+        event (pg.event.Event): pygame event
+        now (float): Timestamp the event was read
+        ring (EventRing): Ring to write to
+
+    Returns:
+        bool: True if a record was written
+    """
+    if event.type == pg.JOYAXISMOTION:
+        value = round(max(-1.0, min(1.0, event.value)) * AXIS_SCALE)
+        ring.write(now, event.instance_id, AXIS, event.axis, value, 0)
+    elif event.type == pg.JOYBUTTONDOWN:
+        ring.write(now, event.instance_id, BUTTON_DOWN, event.button, 0, 0)
+    elif event.type == pg.JOYBUTTONUP:
+        ring.write(now, event.instance_id, BUTTON_UP, event.button, 0, 0)
+    elif event.type == pg.JOYHATMOTION:
+        x, y = event.value
+        ring.write(now, event.instance_id, HAT, event.hat, x, y)
+    else:
+        return False
+    return True
+
+
+def capture_main(ring_name, ready, stop, devices, idle_timeout):
+    """Capture process entry point
+
+    Args:
+        ring_name (str): Shared memory name of the EventRing
+        ready (mp.Event): Set after records are written
+        stop (mp.Event): Set by the main process to stop capturing
+        devices (mp.Queue): Device metadata, ("added", dict) or ("removed", id)
+        idle_timeout (int): How long (ms) to block before checking for a stop
+    """
+    global pg
+    import pygame as pg
+
+    ring = EventRing(ring_name)
+    pg.display.init()
+    pg.joystick.init()
+    joysticks = {}
+    while not stop.is_set():
+        event = pg.event.wait(idle_timeout)
+        if event.type == pg.NOEVENT:
+            continue
+        written = False
+        while event.type != pg.NOEVENT:
+            if event.type in (pg.JOYDEVICEADDED, pg.JOYDEVICEREMOVED):
+                _capture_device(event, joysticks, devices)
+                written = True
+            else:
+                # Stamped as it is dequeued, see InputBackend
+                written = _capture_input(event, time.time(), ring) or written
+            event = pg.event.poll()
+        if written:
+            ready.set()
+    ring.close()
+    pg.quit()
+
+
+class CaptureSource:
+    """Run input capture in its own process and feed the records to Joysticks in
+    place of the SDL event queue."""
+
+    def __init__(self, capacity=4096, idle_timeout=250):
+        """
+        Args:
+            capacity (int, optional): Ring buffer records. Defaults to 4096.
+            idle_timeout (int, optional): How long (ms) to block before checking
+                                          for a halt. Defaults to 250.
+        """
+        self._idle_timeout = idle_timeout
+        self.ring = EventRing(capacity=capacity)
+        ctx = mp.get_context("spawn")
+        self._ready = ctx.Event()
+        self._stop = ctx.Event()
+        self._devices = ctx.Queue()
+        self._process = ctx.Process(
+            target=capture_main,
+            args=(
+                self.ring.name,
+                self._ready,
+                self._stop,
+                self._devices,
+                idle_timeout,
+            ),
+            daemon=True,
+        )
+
+    def start(self):
+        self._process.start()
+
+    def stop(self, timeout=2):
+        """Stop the capture process and release the ring buffer"""
+        self._stop.set()
+        self._process.join(timeout)
+        if self._process.is_alive():
+            self._process.terminate()
+        self.ring.close()
+
+    def wake(self):
+        """Interrupt wait_for_events"""
+        self._ready.set()
+
+    def _device_events(self):
+        """Private: Convert queued device metadata into device events"""
+        events = []
+        while True:
+            try:
+                kind, data = self._devices.get_nowait()
+            except queue.Empty:
+                return events
+            if kind == "added":
+                # Described by the capture process, see Joysticks._add_device
+                events.append(InputEvent(JOYDEVICEADDED, device_index=-1, **data))
+            else:
+                events.append(InputEvent(JOYDEVICEREMOVED, instance_id=data))
+
+    def wait_for_events(self):
+        """Wait for the capture process to write records and return them as
+        InputEvents
+
+        Returns:
+            list: InputEvents, stamped with the time the capture process read
+                  them, see InputBackend
+        """
+        # Clear before reading, so a record written meanwhile sets it again
+        if self._ready.wait(self._idle_timeout / 1000):
+            self._ready.clear()
+        events = self._device_events()
+        # Records are stamped with time.time(), latency is measured in
+        # perf_counter() time
+        offset = time.perf_counter() - time.time()
+        for ts, instance_id, kind, index, v0, v1 in self.ring.read():
+            stamps = {"ts": ts, "probe_ts": ts + offset}
+            if kind == AXIS:
+                events.append(InputEvent(
+                    JOYAXISMOTION,
+                    joy=instance_id,
+                    instance_id=instance_id,
+                    axis=index,
+                    value=v0 / AXIS_SCALE,
+                    **stamps,
+                ))
+            elif kind == BUTTON_DOWN or kind == BUTTON_UP:
+                events.append(InputEvent(
+                    JOYBUTTONDOWN if kind == BUTTON_DOWN else JOYBUTTONUP,
+                    joy=instance_id,
+                    instance_id=instance_id,
+                    button=index,
+                    **stamps,
+                ))
+            elif kind == HAT:
+                events.append(InputEvent(
+                    JOYHATMOTION,
+                    joy=instance_id,
+                    instance_id=instance_id,
+                    hat=index,
+                    value=(v0, v1),
+                    **stamps,
+                ))
+        return events
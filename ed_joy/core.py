@@ -1,26 +1,11 @@
 import atexit
-import ctypes
-import os
-import queue
+import functools
 import sys
 import time
 
-import pywintypes
-import win32api
-import win32con
-import win32gui
-
-from ed_joy import logs
-from ed_joy.process_monitor import ProcessMonitor
+from ed_joy import logs, metrics, startup, tracing
 from ed_joy.settings import Settings
-
-# OS environ call to hide the PyGame support prompt
-os.environ["PYGAME_HIDE_SUPPORT_PROMPT"] = "hide"
-import pygame as pg
-from PySide6.QtCore import (
-    QRunnable,
-    QThreadPool,
-)
+from PySide6.QtCore import Qt, QTimer
 from PySide6.QtGui import QAction
 from PySide6.QtWidgets import (
     QApplication,
@@ -36,161 +21,73 @@ from PySide6.QtWidgets import (
 )
 
 from ed_joy import get_version
-from ed_joy.emitters import ProcessMonitorEmitter
-from ed_joy.joysticks import Joysticks
-from ed_joy.process_monitor import ProcessMonitor
-
-
-class ProcessMonitorWorker(QRunnable):
-    def __init__(
-        self, emitter: ProcessMonitorEmitter, monitor_window_name, *args, **kwargs
-    ):
-        """Initialize our Process Monitor
-        Args:
-            monitor_window_name (str): The name of the process to monitor for
-        """
-        super().__init__()
-        self.emitter = emitter
-        self.monitor_name = monitor_window_name.lower()
-
-        self.queue = queue.Queue()
-        self._win_list = []
-
-        """Internal list of windows"""
-        self.is_process_running = False
-        self.signals = ProcessMonitorEmitter()
-
-        self.running = False
-
-    def __enum_windows_callback(self, hwnd, result):
-        """capture all running processes with window names"""
-        # [ ] potentially refactor to only save relevant names
-        name = win32gui.GetWindowText(hwnd)
-        # we can exclude blank names
-        if name:
-            result.append((hwnd, name))
+from ed_joy.emitters import LauncherEmitter, ProcessMonitorEmitter
+from ed_joy.joysticks import Joysticks, unpack_axes
+from ed_joy.launcher import Launcher
+from ed_joy.process_monitor import (
+    AsyncProcessMonitor,
+    ProcessMonitorWorker,
+    route_axes,
+)
+from ed_joy.supervisor import Supervisor
+from ed_joy.widgets import AxisBarsWidget, ButtonMatrixWidget, MetricsPanel
 
-    def _get_window_list(self):
-        """update our window list"""
-        self._win_list = []  # Reset our window list
-        win32gui.EnumWindows(self.__enum_windows_callback, self._win_list)
 
-    def focus_on_monitor_window(self):
-        self.queue.put("focus")
+def timed_slot(slot):
+    """Record the time spent in a MainWindow slot, in the metrics and the trace
 
-    def _focus_window_name(self, window_name, force=False):
-        hwnd = win32gui.FindWindow(None, window_name)
-        if hwnd:
-            self._focus_window(hwnd, force)
+    Args:
+        slot (callable): Slot method
 
-    def _focus_window(self, hwnd, force=False):
-        """Private: Set focused window to hwnd. Gracefully continue if it fails.
+    Returns:
+        callable: Wrapped slot
+    """
+    name = slot.__name__
 
-        Args:
-            hwnd (hwnd): Window Handle
-            force (bool, optional): Force focus. Defaults to False.
-        """
+    @functools.wraps(slot)
+    def wrapper(self, *args):
+        start = time.perf_counter()
         try:
-            win32gui.ShowWindow(hwnd, win32con.SW_RESTORE)
-            win32gui.SetForegroundWindow(hwnd)
-        except pywintypes.error:
-            if force:
-                self._force_focus(hwnd)
-
-    def _force_focus(self, hwnd_target):
-        """Private: Force focus on specified window.
-        NOTE: As windows restricts when we can focus another program, we need to
-        hook into the active foreground window. This is potentially an issue
-        for games with cheat detection, need to be careful
-
-        Args:
-            hwnd_target (int): Window handle
-        """
-        user32 = ctypes.windll.user32
-        foreground_hwnd = user32.GetForegroundWindow()
-        if foreground_hwnd == hwnd_target:
-            print("Aready focused, doing nothing")
-            return  # We already have focus
+            return slot(self, *args)
+        finally:
+            end = time.perf_counter()
+            self._slot_time.labels(name).observe(end - start)
+            tracing.complete(name, "gui", start, end)
 
-        foreground_tid = user32.GetWindowThreadProcessId(foreground_hwnd, 0)
-        target_tid = user32.GetWindowThreadProcessId(hwnd_target, 0)
+    return wrapper
 
-        current_thread_id = win32api.GetCurrentThreadId()
-
-        # Attach to the foreground thread
-        user32.AttachThreadInput(current_thread_id, foreground_tid, True)
-        user32.AttachThreadInput(current_thread_id, target_tid, True)
-
-        try:
-            win32gui.ShowWindow(hwnd_target, win32con.SW_RESTORE)
-            win32gui.SetForegroundWindow(hwnd_target)
-        except Exception as e:
-            print("Exception occurred while focusing.")
-            print(e)
-
-        # Detach from foreground thread
-        user32.AttachThreadInput(current_thread_id, foreground_tid, False)
-        user32.AttachThreadInput(current_thread_id, target_tid, False)
-
-    def _update_proc_running_state(self, is_running):
-        # is_proc_running - Flag indicating last signal
-        # if flag and is_running are different, update the flag and call the signal
-        if self.is_process_running != is_running:
-            self.is_process_running = is_running
-            print(f"Is running: {is_running}")
-            self.emitter.process_running.emit(self.monitor_name, is_running)
-
-    def run(self):
-        """Start running the process monitor worker"""
-        if self.running:
-            return  # As we are already running, do nothing
-
-        self.running = True
-        while self.running:
-            self._get_window_list()
-            # clear our current vars
-            hwnd = None
-            # name = None
-
-            for l_hwnd, l_name in self._win_list:
-                if self.monitor_name in l_name.lower():
-                    hwnd = l_hwnd
-                    # name = l_name
-                    break
-            self._update_proc_running_state(hwnd is not None)
-
-            try:
-                task = self.queue.get(timeout=0.5)  # Short timeout of 500ms
-                if task == "focus":
-                    if hwnd:
-                        self._focus_window(hwnd, True)
-
-                    self.queue.task_done()
-            except queue.Empty:
-                continue
-            time.sleep(0.05)  # Sleep for 50ms
-
-    def stop(self):
-        """Stop the process monitor worker"""
-        self.running = False
 
 class MainWindow(QMainWindow):
-    def __init__(self, process_monitor_emitter, *args, **kwargs):
+    def __init__(
+        self,
+        process_monitor_emitter,
+        *args,
+        window_backend=None,
+        monitor_class=ProcessMonitorWorker,
+        **kwargs,
+    ):
         super().__init__(*args, **kwargs)
 
         self.setWindowTitle("ED Joy {}".format(get_version()))
+        self.metrics_panel = None
+        """Diagnostics panel, created when first shown"""
+        self._slot_time = metrics.Metrics().summary(
+            "ed_joy_gui_slot_seconds", "Time spent in GUI slots", ("slot",)
+        )
         self.generate_base_layout()
         self.settings = Settings()
+        self._logger = logs.get_logger(__name__)
         self.pm = None
+        self.process_states = {}
+        """Target name: last reported running state"""
         self.process_monitor_emitter = process_monitor_emitter
+        self.window_backend = window_backend
+        """Windowing system backend handed to the process monitor"""
+        self.monitor_class = monitor_class
+        """Process monitor implementation, AsyncProcessMonitor for --asyncio"""
 
         # pg.joystick.init()
 
-        self.threadpool = QThreadPool()
-
-        # thread_count = self.threadpool.maxThreadCount()
-        # print("Multithreading with maximum {} threads".format(thread_count))
-
         layout_main_window = QVBoxLayout()
         """Layout - Top level layout for the main window"""
 
@@ -233,9 +130,21 @@ class MainWindow(QMainWindow):
         gb_lay_monitor.addLayout(layout_proc_mon_row_1)
         # End - Monitor Section
 
-        layout_main_window
-        hbox = self.generate_group_boxes()
-        layout_main_window.addLayout(hbox)
+        # Joystick group boxes are added by add_joystick_panel as joysticks
+        # are connected, so the window can be shown first
+        self.joystick_panels = {}
+        self.joystick_axis_widgets = {}
+        self.joystick_monitor_widgets = {}
+        self.joystick_button_widgets = {}
+        self._state_seq = None
+        """Sequence number of the last joystick state shown"""
+        self.state_timer = QTimer(self)
+        """Samples the joystick state to update the button widgets"""
+        self.state_timer.setInterval(33)  # ~30 fps
+        self.state_timer.timeout.connect(self.update_button_states)
+        self.layout_joysticks = QHBoxLayout()
+        """Layout - Joystick group boxes"""
+        layout_main_window.addLayout(self.layout_joysticks)
         w = QWidget()
         w.setLayout(layout_main_window)
         self.setCentralWidget(w)
@@ -267,10 +176,13 @@ class MainWindow(QMainWindow):
         """Start process monitor if it is not running"""
         if self.pm is None:
             self.le_monitor_status.setText("Monitor started")
-            self.pm = ProcessMonitorWorker(
-                self.process_monitor_emitter, self.settings["monitor.process.title"]
+            self.process_states = {}
+            self.pm = self.monitor_class(
+                self.process_monitor_emitter,
+                window_backend=self.window_backend,
+                targets=self.settings.snapshot.targets,
             )
-            self.threadpool.start(self.pm)
+            self.pm.start()
 
     def stop_proc_monitor(self):
         """Stop process Monitor if it is running"""
@@ -279,64 +191,83 @@ class MainWindow(QMainWindow):
             self.pm.stop()
             self.pm = None
 
-    def generate_group_boxes(self):
-        """Generate the groupboxes for all Joysticks."""
-        hbox = QHBoxLayout()
+    @timed_slot
+    def add_joystick_panel(self, joy_id, name, num_axes, num_buttons, num_hats):
+        """Add the groupbox for a connected joystick, slot for
+        JoystickEventEmitter.device_added. Other panels are left untouched.
 
-        self.joystick_axis_widgets = {}
-        self.joystick_monitor_widgets = {}
+        Args:
+            joy_id (int): Joystick ID
+            name (str): Joystick name
+            num_axes (int): Number of axes
+            num_buttons (int): Number of buttons
+            num_hats (int): Number of hats
+        """
+        if joy_id in self.joystick_panels:
+            self.remove_joystick_panel(joy_id)
+
+        joy_gb = QGroupBox()
+        joy_gb.setTitle(name)
+
+        axis_box_layout = QVBoxLayout()
+
+        # Toggle monitored joystick
+        joy_monitor_layout = QHBoxLayout()
+        chk_monitor_joy = QCheckBox()
+        # """Checkbox to toggle joystick monitoring"""
+        chk_monitor_joy.setText(f"Monitor J{joy_id}")
+        if int(joy_id) in self.settings["monitor.joysticks"]:
+            chk_monitor_joy.setChecked(True)
+        chk_monitor_joy.clicked.connect(self.joystick_monitor_checkbox_clicked)
+        joy_monitor_layout.addWidget(chk_monitor_joy)
+        self.joystick_monitor_widgets[joy_id] = chk_monitor_joy
+
+        # layout_joy_mon_row_1 = QHBoxLayout()
+        # lbl_deadzone = QLabel()
+        # lbl_deadzone.setText("Set Deadzone")
+        # layout_joy_mon_row_1.addWidget(lbl_deadzone)
+        # spin_deadzone = QSpinBox()
+        # self.joystick_deadzone_widgets[joy_id] = spin_deadzone
+        # layout_joy_mon_row_1.addWidget(spin_deadzone)
+        # joy_monitor_layout.addLayout(layout_joy_mon_row_1)
+        axis_box_layout.addLayout(joy_monitor_layout)
+
+        # A single widget draws every axis, repainting at a capped rate
+        axis_bars = AxisBarsWidget(num_axes)
+        self.joystick_axis_widgets[joy_id] = axis_bars
+        axis_box_layout.addWidget(axis_bars)
+        # Buttons and hats, updated from the joystick state snapshot
+        if num_buttons or num_hats:
+            button_matrix = ButtonMatrixWidget(num_buttons, num_hats)
+            self.joystick_button_widgets[joy_id] = button_matrix
+            axis_box_layout.addWidget(button_matrix)
+            self.state_timer.start()
+        axis_box_layout.addStretch()
+
+        joy_gb.setLayout(axis_box_layout)
+        # Keep the panels ordered by joystick ID
+        index = sum(1 for x in self.joystick_panels if x < joy_id)
+        self.layout_joysticks.insertWidget(index, joy_gb)
+        self.joystick_panels[joy_id] = joy_gb
+
+    @timed_slot
+    def remove_joystick_panel(self, joy_id):
+        """Remove the groupbox of a disconnected joystick, slot for
+        JoystickEventEmitter.device_removed
 
-        # For each Joystick
-        for joy_index in range(0, pg.joystick.get_count()):
-            joy = pg.joystick.Joystick(joy_index)
-            joy_gb = QGroupBox()
-            joy_gb.setTitle(joy.get_name())
-            axes_group_box = QGroupBox()
-            axes_group_box.setTitle("Axis")
-
-            axis_box_layout = QVBoxLayout()
-
-            # Toggle monitored joystick
-            joy_monitor_layout = QHBoxLayout()
-            chk_monitor_joy = QCheckBox()
-            # """Checkbox to toggle joystick monitoring"""
-            chk_monitor_joy.setText(f"Monitor J{joy_index}")
-            if int(joy_index) in self.settings["monitor.joysticks"]:
-                chk_monitor_joy.setChecked(True)
-            chk_monitor_joy.clicked.connect(self.joystick_monitor_checkbox_clicked)
-            joy_monitor_layout.addWidget(chk_monitor_joy)
-
-            # layout_joy_mon_row_1 = QHBoxLayout()
-            # lbl_deadzone = QLabel()
-            # lbl_deadzone.setText("Set Deadzone")
-            # layout_joy_mon_row_1.addWidget(lbl_deadzone)
-            # spin_deadzone = QSpinBox()
-            # self.joystick_deadzone_widgets[joy_index] = spin_deadzone
-            # layout_joy_mon_row_1.addWidget(spin_deadzone)
-            # joy_monitor_layout.addLayout(layout_joy_mon_row_1)
-            axis_box_layout.addLayout(joy_monitor_layout)
-
-            # create an array to store each axis's lineedit in
-            self.joystick_axis_widgets[joy_index] = {}
-            # Generate a pair of labels/text fields for each axis
-            for axis in range(0, joy.get_numaxes()):
-                joy_axis_layout = QHBoxLayout()
-                lbl_axis = QLabel("Axis {}".format(axis))
-                le_axis = QLineEdit()
-                le_axis.setReadOnly(True)
-                # le_axis.setFixedWidth(51)
-                self.joystick_axis_widgets[joy_index][axis] = le_axis
-                joy_axis_layout.addWidget(lbl_axis)
-                joy_axis_layout.addWidget(le_axis)
-
-                axis_box_layout.addLayout(joy_axis_layout)
-            axis_box_layout.addStretch()
-            for button in range(0, joy.get_numbuttons()):
-                pass
-
-            joy_gb.setLayout(axis_box_layout)
-            hbox.addWidget(joy_gb)
-        return hbox
+        Args:
+            joy_id (int): Joystick ID
+        """
+        joy_gb = self.joystick_panels.pop(joy_id, None)
+        if joy_gb is None:
+            return
+        self.joystick_axis_widgets.pop(joy_id, None)
+        self.joystick_monitor_widgets.pop(joy_id, None)
+        self.joystick_button_widgets.pop(joy_id, None)
+        self.layout_joysticks.removeWidget(joy_gb)
+        joy_gb.deleteLater()
+        if not self.joystick_button_widgets:
+            self.state_timer.stop()
 
     def generate_base_layout(self):
         """Generate the main layout elements such as the menu and status bar"""
@@ -351,6 +282,14 @@ class MainWindow(QMainWindow):
         exit_action.triggered.connect(self.close)
         file_menu.addAction(exit_action)
 
+        # View menu
+        view_menu = menu_bar.addMenu("View")
+
+        # View -> Diagnostics action
+        diagnostics_action = QAction("Diagnostics", self)
+        diagnostics_action.triggered.connect(self.show_metrics_panel)
+        view_menu.addAction(diagnostics_action)
+
         # Create status bar
         status_bar = QStatusBar()
         self.setStatusBar(status_bar)
@@ -359,6 +298,18 @@ class MainWindow(QMainWindow):
         self.status_label = QLabel("Launching")
         status_bar.addPermanentWidget(self.status_label)
 
+    def show_metrics_panel(self):
+        """Show the diagnostics panel in its own window"""
+        if self.metrics_panel is None:
+            self.metrics_panel = MetricsPanel()
+        self.metrics_panel.show()
+        self.metrics_panel.raise_()
+
+    def closeEvent(self, event):  # noqa: N802
+        if self.metrics_panel is not None:
+            self.metrics_panel.close()
+        super().closeEvent(event)
+
     def joystick_monitor_checkbox_clicked(self):
         """Callback to add/remove monitored joystick based on the ID from the
         checkbox name
@@ -369,22 +320,75 @@ class MainWindow(QMainWindow):
             joy_id = checkbox.text().replace("Monitor J", "")
             self.update_monitored_joystick(joy_id, checkbox.isChecked())
 
+    @timed_slot
     def update_process_monitor(self, name, is_running):
-        msg = f"{self.settings['monitor.process.display_name']}"
-        if is_running:
-            msg += " is running"
-        else:
-            msg += " not detected"
-        self.le_monitor_status.setText(msg)
-
-    def update_axes_labels(self, joy_id, axis, val):
-        self.joystick_axis_widgets[joy_id][axis].setText(str(val))
-        if self.settings["monitor.process.enabled"]:
-            if joy_id in self.settings["monitor.joysticks"]:
-                print(
-                    f"Joystick {joy_id} movement detect, joystick is monitored."
-                )
-                self.pm.focus_on_monitor_window()
+        """Show the running state of every target, slot for
+        ProcessMonitorEmitter.process_running
+
+        Args:
+            name (str): Target name
+            is_running (bool): Target window found
+        """
+        self.process_states[name] = is_running
+        msgs = []
+        for target in self.settings.snapshot.targets:
+            if target.name not in self.process_states:
+                continue
+            msg = target.display_name
+            if self.process_states[target.name]:
+                msg += " is running"
+            else:
+                msg += " not detected"
+            msgs.append(msg)
+        self.le_monitor_status.setText(", ".join(msgs))
+
+    def update_launcher_state(self, name, state):
+        """Show companion app state changes, slot for LauncherEmitter.app_state
+
+        Args:
+            name (str): App name
+            state (str): App state
+        """
+        self.statusBar().showMessage(f"{name} {state}", 5000)
+
+    @timed_slot
+    def update_axes_batch(self, batch, now):
+        """Update the axis labels from a batch of coalesced axis changes,
+        requesting focus at most once per batch. The batch focuses the target
+        routed from the last monitored joystick in it.
+
+        Args:
+            batch (array): Flattened (joy_id, axis, value) triples
+            now (float): Timestamp the batch was collected
+        """
+        for joy_id, axis, val in unpack_axes(batch):
+            axis_bars = self.joystick_axis_widgets.get(joy_id)
+            if axis_bars is not None:  # None while a panel is being removed
+                axis_bars.set_axis(axis, val)
+
+        snapshot = self.settings.snapshot
+        if not snapshot.process_enabled or self.pm is None:
+            return
+        target = route_axes(batch, snapshot.routes)
+        if target is not None:
+            self._logger.debug(
+                "Joystick movement detected, joystick is monitored.",
+                extra=logs.RATE_LIMITED,
+            )
+            self.pm.focus_on_monitor_window(target)
+
+    @timed_slot
+    def update_button_states(self):
+        """Sample the joystick state and update the button widgets, only when the
+        state changed since the last sample"""
+        snapshot = Joysticks().state
+        if snapshot.seq == self._state_seq:
+            return
+        self._state_seq = snapshot.seq
+        for joy_id, widget in self.joystick_button_widgets.items():
+            device = snapshot.devices.get(joy_id)
+            if device is not None:
+                widget.set_state(device.buttons, device.hats)
 
     def update_monitored_joystick(self, joy_id, is_checked):
         """Update the settings to add/remove the joystick from the monitored
@@ -395,22 +399,80 @@ class MainWindow(QMainWindow):
             is_checked (bool): Is the current joystick checked
         """
 
+        joy_id = int(joy_id)
+        monitored = self.settings["monitor.joysticks"]
+        if is_checked == (joy_id in monitored):
+            return
+        # Replace the list rather than changing it, the writer may be saving it
         if is_checked:
-            if int(joy_id) not in self.settings["monitor.joysticks"]:
-                joysticks = self.settings["monitor.joysticks"]
-                # We need to modify the joysticks then reassign to trigger a save
-                joysticks.append(int(joy_id))
-                self.settings["monitor.joysticks"] = joysticks
+            self.settings["monitor.joysticks"] = [*monitored, joy_id]
         else:
-            arr = [x for x in self.settings["monitor.joysticks"] if x != int(joy_id)]
-            self.settings["monitor.joysticks"] = arr
+            self.settings["monitor.joysticks"] = [x for x in monitored if x != joy_id]
 
 
 def cleanup():
     """Cleanup tasks to minimize exceptions/errors on shutdown"""
     Joysticks().stop()
+    supervisor = Supervisor()
+    supervisor.stop_all()
+    settings = Settings()
+    settings.close()
+    logs.get_logger(__name__).debug(
+        "Settings: %s changes, %s writes (%s saved)",
+        settings.changes,
+        settings.writes,
+        settings.writes_saved,
+    )
+    logs.get_logger(__name__).debug("Workers: %s", supervisor.health())
+
+def start_joysticks(joysticks, window):
+    """Start reading the joysticks, their group boxes are added to the window as
+    they are announced. Deferred until the window is shown, as starting pygame
+    is slow.
+
+    Args:
+        joysticks (Joysticks): Joysticks
+        window (MainWindow): Main window
+    """
+    joysticks.start()
+
+def show_window(
+    joysticks, process_monitor_emitter, monitor_class, launcher_emitter=None
+):
+    """Create and show the main window, connecting the signals to its slots
+
+    Args:
+        joysticks (Joysticks): Joysticks
+        process_monitor_emitter (ProcessMonitorEmitter): Process monitor emitter
+        monitor_class (type): Process monitor implementation
+        launcher_emitter (LauncherEmitter, optional): Companion app launcher
+                                                      emitter. Defaults to None.
+
+    Returns:
+        MainWindow: Main window
+    """
+    window = MainWindow(process_monitor_emitter, monitor_class=monitor_class)
+    window.show()
+
+    # Connect the signals to the GUI slots
+    joysticks.emitter.device_added.connect(window.add_joystick_panel)
+    joysticks.emitter.device_removed.connect(window.remove_joystick_panel)
+    joysticks.emitter.axes_moved.connect(window.update_axes_batch)
+    process_monitor_emitter.process_running.connect(window.update_process_monitor)
+    if launcher_emitter is not None:
+        launcher_emitter.app_state.connect(window.update_launcher_state)
+
+    # Runs once the event loop has shown the window
+    QTimer.singleShot(0, startup.first_window_shown)
+    return window
+
+def run(use_asyncio=False):
+    """Run the application
 
-def run():
+    Args:
+        use_asyncio (bool, optional): Run the background loops as asyncio tasks
+                                      on the Qt event loop. Defaults to False.
+    """
     logger = logs.get_logger(__name__)
 
     logger.debug("Core starting up")
@@ -419,19 +481,47 @@ def run():
     atexit.register(cleanup)
 
     joysticks = Joysticks()
-    joysticks.start()
-
-    process_monitor = ProcessMonitor()
-    process_monitor.start()
-
     process_monitor_emitter = ProcessMonitorEmitter()
-
     app = QApplication(sys.argv)
-    window = MainWindow(process_monitor_emitter)
-    window.show()
-
-    # Connect the signals to the GUI slots
-    joysticks.emitter.axis_movement.connect(window.update_axes_labels)
-    process_monitor_emitter.process_running.connect(window.update_process_monitor)
+    # Stopped with the other workers by cleanup()
+    metrics.serve(Settings())
+
+    launcher_emitter = LauncherEmitter()
+    launcher = Launcher.from_settings(Settings(), launcher_emitter)
+    if launcher is not None:
+        # Only queues work on the launcher's threads, safe on any thread
+        process_monitor_emitter.process_running.connect(
+            launcher.on_process_running, Qt.DirectConnection
+        )
+        # Registered after cleanup() so it runs first, atexit is LIFO
+        atexit.register(launcher.shutdown)
+
+    if use_asyncio:
+        from PySide6 import QtAsyncio
+
+        from ed_joy.aio import AsyncCore
+
+        async_core = AsyncCore(joysticks, Settings())
+        windows = []
+        """Keeps the window alive once main() returns"""
+
+        async def main():
+            # The process monitor task needs the running loop
+            windows.append(show_window(
+                joysticks,
+                process_monitor_emitter,
+                AsyncProcessMonitor,
+                launcher_emitter,
+            ))
+            await async_core.main()
+
+        app.aboutToQuit.connect(async_core.stop)
+        QtAsyncio.run(main(), keep_running=True)
+        sys.exit()
+
+    window = show_window(
+        joysticks, process_monitor_emitter, ProcessMonitorWorker, launcher_emitter
+    )
+    QTimer.singleShot(0, lambda: start_joysticks(joysticks, window))
 
     sys.exit(app.exec())
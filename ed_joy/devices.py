@@ -0,0 +1,96 @@
+class Device:
+    """A connected joystick"""
+
+    __slots__ = ("joy_id", "instance_id", "guid", "name", "joystick")
+
+    def __init__(self, joy_id, instance_id, guid, name, joystick):
+        self.joy_id = joy_id
+        """Stable ID used by the signals, UI and settings"""
+        self.instance_id = instance_id
+        """SDL instance ID, changes every time the device is connected"""
+        self.guid = guid
+        self.name = name
+        self.joystick = joystick
+
+
+class DeviceRegistry:
+    """Connected joysticks keyed by SDL instance ID. Each device is given a
+    joy_id, reusing the one it had before when the same device is reconnected,
+    so monitored joysticks keep working across a replug."""
+
+    def __init__(self):
+        self._devices = {}
+        """instance_id: Device"""
+        self._slots = {}
+        """instance_id: joy_id, the hot path lookup"""
+        self._known = {}
+        """guid: joy_ids previously given to devices with that guid"""
+
+    def __contains__(self, instance_id):
+        return instance_id in self._devices
+
+    def __len__(self):
+        return len(self._devices)
+
+    def devices(self):
+        return list(self._devices.values())
+
+    def joy_id(self, instance_id, default=None):
+        """Return the joy_id for an SDL instance ID
+
+        Args:
+            instance_id (int): SDL instance ID
+            default (int, optional): Returned if unknown. Defaults to None.
+
+        Returns:
+            int: joy_id
+        """
+        return self._slots.get(instance_id, default)
+
+    def _free_slot(self, guid):
+        """Private: Pick a joy_id, preferring one previously used by this guid"""
+        used = set(self._slots.values())
+        for joy_id in self._known.get(guid, []):
+            if joy_id not in used:
+                return joy_id
+        # Skip IDs remembered for other devices, they may be plugged back in
+        remembered = {x for ids in self._known.values() for x in ids}
+        joy_id = 0
+        while joy_id in used or joy_id in remembered:
+            joy_id += 1
+        return joy_id
+
+    def add(self, instance_id, guid, name, joystick=None):
+        """Register a connected device
+
+        Args:
+            instance_id (int): SDL instance ID
+            guid (str): Device GUID
+            name (str): Device name
+            joystick (optional): Joystick object. Defaults to None.
+
+        Returns:
+            Device: Registered device, None if already registered
+        """
+        if instance_id in self._devices:
+            return None
+        joy_id = self._free_slot(guid)
+        device = Device(joy_id, instance_id, guid, name, joystick)
+        self._devices[instance_id] = device
+        self._slots[instance_id] = joy_id
+        known = self._known.setdefault(guid, [])
+        if joy_id not in known:
+            known.append(joy_id)
+        return device
+
+    def remove(self, instance_id):
+        """Unregister a disconnected device
+
+        Args:
+            instance_id (int): SDL instance ID
+
+        Returns:
+            Device: Removed device, None if unknown
+        """
+        self._slots.pop(instance_id, None)
+        return self._devices.pop(instance_id, None)
@@ -5,11 +5,9 @@ from PySide6.QtCore import (
 
 
 class JoystickEventEmitter(QObject):
-    axis_movement = Signal(
-        int,   # Joystick ID
-        int,   # Axis
-        int,   # New value
-        float, # Timestamp
+    axes_moved = Signal(
+        object, # array("i") of flattened (Joystick ID, Axis, New value) triples
+        float,  # Timestamp
     )
     button_down = Signal(
         int,   # Joystick ID
@@ -27,6 +25,16 @@ class JoystickEventEmitter(QObject):
         tuple, # Position Tuple
         float, # Timestamp
     )
+    device_added = Signal(
+        int,   # Joystick ID
+        str,   # Name
+        int,   # Number of axes
+        int,   # Number of buttons
+        int,   # Number of hats
+    )
+    device_removed = Signal(
+        int,   # Joystick ID
+    )
 
 
 class ProcessMonitorEmitter(QObject):
@@ -34,3 +42,10 @@ class ProcessMonitorEmitter(QObject):
         str,  # Process name
         bool,  # Process running state
     )
+
+
+class LauncherEmitter(QObject):
+    app_state = Signal(
+        str,  # App name
+        str,  # State, see ed_joy.launcher.APP_STATES
+    )
@@ -0,0 +1,577 @@
+"""Linux evdev input backend, selected with joysticks.backend = "evdev". Reads
+/dev/input/event* directly through epoll, without starting SDL, and stamps the
+input with the kernel's event times. Axes, buttons and hats are numbered the way
+SDL numbers them on Linux, so monitored joysticks and filter overrides carry
+over from the pygame backend."""
+import errno
+import fcntl
+import glob
+import itertools
+import os
+import select
+import stat
+import struct
+import time
+
+from ed_joy.inputs import (
+    JOYAXISMOTION,
+    JOYBUTTONDOWN,
+    JOYBUTTONUP,
+    JOYDEVICEADDED,
+    JOYDEVICEREMOVED,
+    JOYHATMOTION,
+    InputBackend,
+    InputEvent,
+)
+from ed_joy.logs import get_logger
+
+DEVICE_PATTERN = "/dev/input/event*"
+
+INPUT_EVENT = struct.Struct("llHHi")
+"""struct input_event: seconds, microseconds, type, code, value"""
+INPUT_ID = struct.Struct("HHHH")
+"""struct input_id: bus type, vendor, product, version"""
+ABS_INFO = struct.Struct("6i")
+"""struct input_absinfo: value, minimum, maximum, fuzz, flat, resolution"""
+
+EV_SYN, EV_KEY, EV_ABS = 0x00, 0x01, 0x03
+SYN_REPORT, SYN_DROPPED = 0x00, 0x03
+ABS_X, ABS_Y, ABS_HAT0X, ABS_HAT3Y, ABS_MAX = 0x00, 0x01, 0x10, 0x17, 0x3F
+BTN_MOUSE, BTN_JOYSTICK, BTN_DIGI = 0x110, 0x120, 0x140
+BTN_TOUCH, BTN_TRIGGER_HAPPY, KEY_MAX = 0x14A, 0x2C0, 0x2FF
+CLOCK_MONOTONIC = 1
+"""perf_counter() uses the same clock on Linux"""
+
+
+def _ioc(direction, nr, size):
+    """Private: Build an evdev ioctl request number"""
+    return direction << 30 | size << 16 | ord("E") << 8 | nr
+
+
+_READ, _WRITE = 2, 1
+EVIOCGID = _ioc(_READ, 0x02, INPUT_ID.size)
+EVIOCSCLOCKID = _ioc(_WRITE, 0xA0, 4)
+
+
+def _bits(fd, nr, max_code):
+    """Private: Read an evdev bitmask ioctl
+
+    Returns:
+        set: codes whose bit is set
+    """
+    buf = bytearray(max_code // 8 + 1)
+    fcntl.ioctl(fd, _ioc(_READ, nr, len(buf)), buf)
+    return {
+        byte * 8 + bit
+        for byte, bits in enumerate(buf)
+        if bits
+        for bit in range(8)
+        if bits >> bit & 1
+    }
+
+
+def _abs_info(fd, code):
+    """Private: Read the current value and range of an absolute axis
+
+    Returns:
+        tuple: value, minimum, maximum, fuzz, flat, resolution
+    """
+    buf = bytearray(ABS_INFO.size)
+    fcntl.ioctl(fd, _ioc(_READ, 0x40 + code, ABS_INFO.size), buf)
+    return ABS_INFO.unpack(buf)
+
+
+def is_joystick(keys, axes):
+    """Tell joysticks from keyboards, mice and touchpads by their capabilities
+
+    Args:
+        keys (set): EV_KEY codes
+        axes (set): EV_ABS codes
+
+    Returns:
+        bool: True for joysticks and gamepads
+    """
+    for key in keys:
+        if BTN_JOYSTICK <= key < BTN_DIGI or key >= BTN_TRIGGER_HAPPY:
+            return True
+    pointer = BTN_TOUCH in keys or any(BTN_MOUSE <= k < BTN_JOYSTICK for k in keys)
+    return ABS_X in axes and ABS_Y in axes and not pointer
+
+
+def _crc16(data):
+    """Private: CRC-16/ARC, as computed by SDL_crc16"""
+    crc = 0
+    for byte in data:
+        crc ^= byte
+        for _ in range(8):
+            crc = crc >> 1 ^ 0xA001 if crc & 1 else crc >> 1
+    return crc
+
+
+def make_guid(bustype, vendor, product, version, name):
+    """Build a GUID the way SDL 2.26 and later build it for Linux devices, so a
+    device keeps its joy_id when it is reconnected, see DeviceRegistry. The
+    name is hashed into the GUID, and stands in for the IDs when the device
+    reports none.
+
+    Args:
+        bustype (int): Bus type
+        vendor (int): USB vendor ID
+        product (int): USB product ID
+        version (int): Product version
+        name (bytes): Device name
+
+    Returns:
+        str: 32 hex digits
+    """
+    crc = _crc16(name)
+    if vendor and product:
+        return struct.pack(
+            "<8H", bustype, crc, vendor, 0, product, 0, version, 0
+        ).hex()
+    # At most 11 characters, NUL terminated
+    return (struct.pack("<2H", bustype, crc) + name[:11].ljust(12, b"\0")).hex()
+
+
+class EvdevDevice:
+    """An open evdev device and its SDL style axis, button and hat numbering.
+    Devices are normally opened with open(), tests can build one around the
+    read end of a pipe or a file holding struct input_event records."""
+
+    def __init__(
+        self,
+        fd,
+        name,
+        guid="",
+        axes=(),
+        buttons=(),
+        hats=(),
+        path=None,
+        monotonic=True,
+    ):
+        """
+        Args:
+            fd (int): File descriptor, non blocking
+            name (str): Device name
+            guid (str, optional): Device GUID. Defaults to "".
+            axes (list, optional): (code, minimum, maximum, value) per axis, in
+                                   axis order. Defaults to ().
+            buttons (list, optional): Key codes, in button order. Defaults to ().
+            hats (list, optional): Hat numbers (0-3), in hat order.
+                                   Defaults to ().
+            path (str, optional): Device node. Defaults to None.
+            monotonic (bool, optional): Event times use CLOCK_MONOTONIC.
+                                        Defaults to True.
+        """
+        self.fd = fd
+        self.name = name
+        self.guid = guid
+        self.path = path
+        self.monotonic = monotonic
+        self.instance_id = None
+        """Given by the backend when the device is added"""
+        self.is_file = stat.S_ISREG(os.fstat(fd).st_mode)
+        """Regular files can not be polled, they are read on every pass"""
+        self.closed = False
+        """Set once the device is gone, see read()"""
+        self.dropped = 0
+        """Number of times the kernel dropped events, see SYN_DROPPED"""
+        self.axes = {code: i for i, (code, *_rest) in enumerate(axes)}
+        """EV_ABS code: axis"""
+        self._ranges = {code: (lo, hi - lo) for code, lo, hi, _value in axes}
+        self.values = [self.normalise(code, value) for code, _lo, _hi, value in axes]
+        """Axis values between -1 and 1, as of the last read"""
+        self.buttons = {code: i for i, code in enumerate(buttons)}
+        """EV_KEY code: button"""
+        self._pressed = set()
+        self.hats = {hat: i for i, hat in enumerate(hats)}
+        """Hat number: hat"""
+        self._hat_values = [[0, 0] for _hat in hats]
+        self._buffer = b""
+        """Trailing partial record"""
+        self._frame = []
+        """Events read since the last SYN_REPORT"""
+        self._dropping = False
+
+    @classmethod
+    def open(cls, path):
+        """Open a device node and read its capabilities
+
+        Args:
+            path (str): Device node, e.g. /dev/input/event3
+
+        Raises:
+            OSError: The device could not be opened or queried
+
+        Returns:
+            EvdevDevice: device, None if it is not a joystick
+        """
+        fd = os.open(path, os.O_RDONLY | os.O_NONBLOCK | os.O_CLOEXEC)
+        try:
+            keys = _bits(fd, 0x20 + EV_KEY, KEY_MAX)
+            abs_codes = _bits(fd, 0x20 + EV_ABS, ABS_MAX)
+            if not is_joystick(keys, abs_codes):
+                os.close(fd)
+                return None
+            name = bytearray(256)
+            fcntl.ioctl(fd, _ioc(_READ, 0x06, len(name)), name)
+            ids = bytearray(INPUT_ID.size)
+            fcntl.ioctl(fd, EVIOCGID, ids)
+            try:
+                # Stamp events with the clock perf_counter() reads
+                fcntl.ioctl(fd, EVIOCSCLOCKID, struct.pack("i", CLOCK_MONOTONIC))
+                monotonic = True
+            except OSError:
+                monotonic = False
+            axes = []
+            for code in sorted(abs_codes):
+                if ABS_HAT0X <= code <= ABS_HAT3Y:
+                    continue
+                value, lo, hi, *_rest = _abs_info(fd, code)
+                axes.append((code, lo, hi, value))
+            hats = [
+                hat
+                for hat in range(4)
+                if {ABS_HAT0X + hat * 2, ABS_HAT0X + hat * 2 + 1} & abs_codes
+            ]
+            # SDL order, joystick buttons first then the ones before them
+            buttons = sorted(keys, key=lambda key: (key < BTN_JOYSTICK, key))
+            name = name.split(b"\0", 1)[0]
+            device = cls(
+                fd,
+                name.decode(errors="replace"),
+                make_guid(*INPUT_ID.unpack(ids), name),
+                axes,
+                buttons,
+                hats,
+                path,
+                monotonic,
+            )
+        except BaseException:
+            os.close(fd)
+            raise
+        for hat in hats:
+            for axis in (0, 1):
+                code = ABS_HAT0X + hat * 2 + axis
+                if code in abs_codes:
+                    device._set_hat(code, _abs_info(fd, code)[0])
+        return device
+
+    def describe(self):
+        """Device metadata for the JOYDEVICEADDED event
+
+        Returns:
+            dict: see Joysticks._register_device
+        """
+        return {
+            "instance_id": self.instance_id,
+            "guid": self.guid,
+            "name": self.name,
+            "num_axes": len(self.axes),
+            "num_buttons": len(self.buttons),
+            "num_hats": len(self.hats),
+            "axes": list(self.values),
+        }
+
+    def normalise(self, code, value):
+        """Scale a raw axis value to -1..1"""
+        lo, span = self._ranges[code]
+        if span <= 0:
+            return 0.0
+        return max(-1.0, min(1.0, (value - lo) * 2 / span - 1))
+
+    def _set_hat(self, code, value):
+        """Private: Record a hat axis, returns the hat and its (x, y) position"""
+        hat = (code - ABS_HAT0X) // 2
+        position = self._hat_values[self.hats[hat]]
+        if (code - ABS_HAT0X) % 2:
+            # evdev counts down as positive, SDL up
+            position[1] = -1 if value > 0 else 1 if value < 0 else 0
+        else:
+            position[0] = 1 if value > 0 else -1 if value < 0 else 0
+        return self.hats[hat], tuple(position)
+
+    def read(self):
+        """Read everything available. Events are only returned once the frame
+        they belong to is complete, at SYN_REPORT.
+
+        Returns:
+            list: InputEvents, sets closed if the device went away
+        """
+        events = []
+        frame = self._frame
+        for sec, usec, ev_type, code, value in INPUT_EVENT.iter_unpack(
+            self._read_available()
+        ):
+            if ev_type == EV_SYN:
+                if code == SYN_REPORT:
+                    if self._dropping:
+                        self._dropping = False
+                        frame = self._resync()
+                    events.extend(frame)
+                    frame = []
+                elif code == SYN_DROPPED:
+                    # The kernel buffer overflowed, the frame is incomplete
+                    self.dropped += 1
+                    self._dropping = True
+                    frame = []
+                continue
+            if self._dropping:
+                continue
+            probe_ts = sec + usec / 1e6 if self.monotonic else None
+            event = self._decode(ev_type, code, value, probe_ts)
+            if event is not None:
+                frame.append(event)
+        self._frame = frame
+        return events
+
+    def _read_available(self):
+        """Private: Read without blocking, returning whole input_events only.
+        A partial event is kept for the next call."""
+        chunks = [self._buffer]
+        while True:
+            try:
+                chunk = os.read(self.fd, INPUT_EVENT.size * 64)
+            except BlockingIOError:
+                break
+            except OSError as e:
+                if e.errno != errno.ENODEV:
+                    get_logger(__name__).warning("%s: %s", self.name, e)
+                self.closed = True
+                break
+            if not chunk:
+                # A pipe whose writer closed, a file that has been read through
+                self.closed = not self.is_file
+                break
+            chunks.append(chunk)
+        data = b"".join(chunks)
+        usable = len(data) - len(data) % INPUT_EVENT.size
+        self._buffer = data[usable:]
+        return data[:usable]
+
+    def _decode(self, ev_type, code, value, probe_ts):
+        """Private: Convert an axis, hat or button input_event
+
+        Returns:
+            InputEvent: None if the device does not report it
+        """
+        iid = self.instance_id
+        if ev_type == EV_ABS:
+            if code in self.axes:
+                value = self.normalise(code, value)
+                self.values[self.axes[code]] = value
+                return InputEvent(
+                    JOYAXISMOTION,
+                    joy=iid,
+                    instance_id=iid,
+                    axis=self.axes[code],
+                    value=value,
+                    probe_ts=probe_ts,
+                )
+            if (code - ABS_HAT0X) // 2 in self.hats:
+                hat, position = self._set_hat(code, value)
+                return InputEvent(
+                    JOYHATMOTION,
+                    joy=iid,
+                    instance_id=iid,
+                    hat=hat,
+                    value=position,
+                    probe_ts=probe_ts,
+                )
+        elif ev_type == EV_KEY and code in self.buttons and value != 2:
+            # value 2 is autorepeat
+            if value:
+                self._pressed.add(code)
+            else:
+                self._pressed.discard(code)
+            return InputEvent(
+                JOYBUTTONDOWN if value else JOYBUTTONUP,
+                joy=iid,
+                instance_id=iid,
+                button=self.buttons[code],
+                probe_ts=probe_ts,
+            )
+        return None
+
+    def _resync(self):
+        """Private: Query the device state after SYN_DROPPED, returning events
+        for what changed while events were lost"""
+        iid = self.instance_id
+        events = []
+        try:
+            for code, axis in self.axes.items():
+                value = self.normalise(code, _abs_info(self.fd, code)[0])
+                if value != self.values[axis]:
+                    self.values[axis] = value
+                    events.append(InputEvent(
+                        JOYAXISMOTION, joy=iid, instance_id=iid, axis=axis, value=value
+                    ))
+            pressed = _bits(self.fd, 0x18, KEY_MAX) & self.buttons.keys()
+        except OSError:
+            return events  # Not a device, e.g. a pipe in a test
+        for code in pressed ^ self._pressed:
+            events.append(InputEvent(
+                JOYBUTTONDOWN if code in pressed else JOYBUTTONUP,
+                joy=iid,
+                instance_id=iid,
+                button=self.buttons[code],
+            ))
+        self._pressed = pressed
+        return events
+
+    def close(self):
+        if self.fd is not None:
+            os.close(self.fd)
+            self.fd = None
+
+
+class EvdevBackend(InputBackend):
+    """Read joysticks from evdev device nodes. A single epoll set covers every
+    device and a wake pipe, so the joystick loop sleeps until input arrives.
+    Device nodes are rescanned while idle to pick up newly connected joysticks,
+    disconnected ones are noticed when reading fails."""
+
+    def __init__(self, pattern=DEVICE_PATTERN, idle_timeout=250, rescan_interval=2.0):
+        """
+        Args:
+            pattern (str, optional): Device nodes to open, None to only use
+                                     devices given to add_device().
+                                     Defaults to DEVICE_PATTERN.
+            idle_timeout (int, optional): How long (ms) to block before checking
+                                          for a halt. Defaults to 250.
+            rescan_interval (float, optional): Seconds between two scans for new
+                                               devices. Defaults to 2.0.
+        """
+        self.pattern = pattern
+        self.rescan_interval = rescan_interval
+        self._idle_timeout = idle_timeout
+        self._devices = {}
+        """fd: EvdevDevice"""
+        self._files = []
+        """Devices backed by regular files, read on every pass"""
+        self._skipped = set()
+        """Nodes that are not joysticks or could not be opened"""
+        self._pending = []
+        """Device events for the next wait_for_events"""
+        self._instance_ids = itertools.count()
+        self._next_scan = 0.0
+        self._epoll = None
+        self._wake_r = self._wake_w = None
+        self._logger = get_logger(__name__)
+
+    @property
+    def devices(self):
+        return list(self._devices.values())
+
+    def start(self):
+        self._epoll = select.epoll()
+        self._wake_r, self._wake_w = os.pipe2(os.O_NONBLOCK | os.O_CLOEXEC)
+        self._epoll.register(self._wake_r, select.EPOLLIN)
+        self.scan()
+
+    def stop(self):
+        for device in self.devices:
+            device.close()
+        self._devices.clear()
+        self._files.clear()
+        if self._epoll is not None:
+            self._epoll.close()
+            os.close(self._wake_r)
+            os.close(self._wake_w)
+            self._epoll = None
+
+    def wake(self):
+        try:
+            os.write(self._wake_w, b"\0")
+        except (BlockingIOError, TypeError):
+            pass  # Already woken, or not started
+
+    def scan(self):
+        """Open the device nodes matching the pattern that are not open yet"""
+        self._next_scan = time.monotonic() + self.rescan_interval
+        if self.pattern is None:
+            return
+        paths = set(glob.glob(self.pattern))
+        # A node that went away may come back as a different device
+        self._skipped &= paths
+        opened = {device.path for device in self._devices.values()}
+        for path in sorted(paths - opened - self._skipped):
+            try:
+                device = EvdevDevice.open(path)
+            except OSError as e:
+                # Usually permissions, the user needs to be in the input group
+                self._logger.debug("Skipping %s: %s", path, e)
+                device = None
+            if device is None:
+                self._skipped.add(path)
+            else:
+                self.add_device(device)
+
+    def add_device(self, device):
+        """Start reading a device, it is announced by the next wait_for_events
+
+        Args:
+            device (EvdevDevice): Device
+        """
+        device.instance_id = next(self._instance_ids)
+        self._devices[device.fd] = device
+        if device.is_file:
+            self._files.append(device)
+        else:
+            self._epoll.register(device.fd, select.EPOLLIN)
+        self._logger.debug("Opened %s (%s)", device.name, device.path)
+        self._pending.append(
+            InputEvent(JOYDEVICEADDED, device_index=-1, **device.describe())
+        )
+
+    def _remove_device(self, device):
+        """Private: Stop reading a device that went away
+
+        Returns:
+            InputEvent: JOYDEVICEREMOVED event
+        """
+        del self._devices[device.fd]
+        if device.is_file:
+            self._files.remove(device)
+        else:
+            self._epoll.unregister(device.fd)
+        device.close()
+        return InputEvent(JOYDEVICEREMOVED, instance_id=device.instance_id)
+
+    def _read(self, device):
+        """Private: Read a device, removing it if it went away"""
+        events = device.read()
+        if device.dropped:
+            self._logger.warning(
+                "%s: the kernel dropped events %s times", device.name, device.dropped
+            )
+            device.dropped = 0
+        if device.closed:
+            events.append(self._remove_device(device))
+        return events
+
+    def wait_for_events(self):
+        """Wait until a device has input or the idle timeout expires
+
+        Returns:
+            list: InputEvents
+        """
+        events = self._pending
+        self._pending = []
+        for device in list(self._files):
+            events.extend(self._read(device))
+        timeout = 0 if events else self._idle_timeout / 1000
+        for fd, _mask in self._epoll.poll(timeout):
+            if fd == self._wake_r:
+                try:
+                    os.read(self._wake_r, 64)
+                except BlockingIOError:
+                    pass
+                continue
+            device = self._devices.get(fd)
+            if device is not None:
+                events.extend(self._read(device))
+        if not events and time.monotonic() >= self._next_scan:
+            self.scan()
+            events, self._pending = self._pending, []
+        return events
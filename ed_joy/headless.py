@@ -0,0 +1,129 @@
+"""Headless service mode. Joystick events are wired straight to the focus logic
+on the joystick thread, without a Qt event loop or any Qt widgets."""
+import asyncio
+import signal
+import threading
+
+from PySide6.QtCore import Qt
+
+from ed_joy import logs, metrics, startup
+from ed_joy.aio import AsyncCore
+from ed_joy.emitters import ProcessMonitorEmitter
+from ed_joy.joysticks import Joysticks
+from ed_joy.launcher import Launcher
+from ed_joy.process_monitor import (
+    AsyncProcessMonitor,
+    ProcessMonitorWorker,
+    route_axes,
+)
+from ed_joy.settings import Settings
+from ed_joy.supervisor import Supervisor
+
+
+def run(use_asyncio=False):
+    """Run headless until interrupted
+
+    Args:
+        use_asyncio (bool, optional): Run the background loops as asyncio tasks.
+                                      Defaults to False.
+    """
+    logger = logs.get_logger(__name__)
+    logger.debug("Headless mode starting up")
+
+    settings = Settings()
+    if not settings.snapshot.process_enabled:
+        logger.warning("monitor.process.enabled is off, focus will not change.")
+
+    process_monitor_emitter = ProcessMonitorEmitter()
+    monitor_class = AsyncProcessMonitor if use_asyncio else ProcessMonitorWorker
+    worker = monitor_class(
+        process_monitor_emitter, targets=settings.snapshot.targets
+    )
+    display_names = {
+        target.name: target.display_name for target in settings.snapshot.targets
+    }
+
+    def on_axes_moved(batch, now):
+        snapshot = settings.snapshot
+        if not snapshot.process_enabled:
+            return
+        target = route_axes(batch, snapshot.routes)
+        if target is not None:
+            worker.focus_on_monitor_window(target)
+
+    def on_process_running(name, is_running):
+        state = "is running" if is_running else "not detected"
+        logger.info("%s %s", display_names.get(name, name), state)
+
+    # No event loop to deliver queued signals, run the slots on the emitting thread
+    joysticks = Joysticks()
+    joysticks.emitter.axes_moved.connect(on_axes_moved, Qt.DirectConnection)
+    process_monitor_emitter.process_running.connect(
+        on_process_running, Qt.DirectConnection
+    )
+
+    launcher = Launcher.from_settings(settings)
+    if launcher is not None:
+        process_monitor_emitter.process_running.connect(
+            launcher.on_process_running, Qt.DirectConnection
+        )
+
+    metrics_server = metrics.serve(settings)
+
+    stop = threading.Event()
+    signal.signal(signal.SIGINT, lambda *args: stop.set())
+    signal.signal(signal.SIGTERM, lambda *args: stop.set())
+    logger.info("Running headless, press Ctrl+C to exit.")
+    if use_asyncio:
+        asyncio.run(_run_async(joysticks, worker, settings, stop))
+    else:
+        _run_threaded(joysticks, worker, stop)
+
+    logger.debug("Headless mode shutting down")
+    worker.stop()
+    joysticks.stop()
+    if launcher is not None:
+        launcher.shutdown()
+    if metrics_server is not None:
+        metrics_server.stop()
+    logger.debug("Workers: %s", Supervisor().health())
+    settings.close()
+
+
+def _run_threaded(joysticks, worker, stop):
+    """Private: Run the joystick and process monitor threads until stop is set
+
+    Args:
+        joysticks (Joysticks): Joysticks
+        worker (ProcessMonitorWorker): Process monitor
+        stop (threading.Event): Set by the signal handlers
+    """
+    worker.start()
+    joysticks.start()
+    startup.ready("headless loops started")
+    # Wake periodically, Event.wait can not be interrupted by Ctrl+C on Windows
+    while not stop.wait(1):
+        pass
+
+
+async def _run_async(joysticks, worker, settings, stop):
+    """Private: Run the asyncio core until stop is set
+
+    Args:
+        joysticks (Joysticks): Joysticks
+        worker (AsyncProcessMonitor): Process monitor
+        settings (Settings): Settings
+        stop (threading.Event): Set by the signal handlers
+    """
+    async_core = AsyncCore(joysticks, settings)
+    async_core.start()
+    worker.start()
+    startup.ready("headless loops started")
+    try:
+        while not stop.is_set():
+            await asyncio.sleep(1)
+    finally:
+        worker.stop()
+        async_core.stop()
+        # Let the cancelled tasks clean up
+        await asyncio.sleep(0)
@@ -0,0 +1,61 @@
+"""Joystick event types shared by the input backends. Kept free of pygame and
+Qt, so backends that do not use SDL can be imported and tested without them."""
+from abc import ABC, abstractmethod
+
+# SDL event types, the same values as the pygame constants. Backends that do not
+# use SDL build InputEvents with them without importing pygame
+JOYAXISMOTION = 0x600
+JOYHATMOTION = 0x602
+JOYBUTTONDOWN = 0x603
+JOYBUTTONUP = 0x604
+JOYDEVICEADDED = 0x605
+JOYDEVICEREMOVED = 0x606
+
+
+class InputEvent:
+    """Joystick event read like a pygame event, for backends without pygame"""
+
+    def __init__(self, type, **attrs):
+        """
+        Args:
+            type (int): Event type, e.g. JOYAXISMOTION
+            **attrs: Same attributes as the pygame event of that type
+        """
+        self.type = type
+        self.__dict__.update(attrs)
+
+    def __repr__(self):
+        attrs = {k: v for k, v in self.__dict__.items() if k != "type"}
+        return f"InputEvent({self.type:#x}, {attrs})"
+
+
+class InputBackend(ABC):
+    """Event source read by Joysticks in place of the SDL event queue, see
+    Joysticks.source. CaptureSource and ReplaySource follow the same interface.
+
+    wait_for_events() returns pygame events or InputEvents of the JOY* types
+    above. Axis, button and hat events carry joy and instance_id, and may carry
+    probe_ts, the perf_counter() time of the input, to measure latency, and ts,
+    the time.time() the input was read when that was before the batch was
+    returned, e.g. in another process. Devices are announced with a
+    JOYDEVICEADDED event with device_index=-1 and the device metadata, see
+    Joysticks._register_device.
+    """
+
+    def start(self):
+        """Open the devices, called before the joystick loop starts"""
+
+    def stop(self):
+        """Release the devices, called once the joystick loop has stopped"""
+
+    def wake(self):
+        """Interrupt wait_for_events, called from other threads"""
+
+    @abstractmethod
+    def wait_for_events(self):
+        """Wait for input, at most the idle timeout
+
+        Returns:
+            list: events, empty if none arrived
+        """
+        raise NotImplementedError
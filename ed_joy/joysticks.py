@@ -1,19 +1,259 @@
+import asyncio
 import os
 import threading
 import time
+from array import array
+from collections import deque
 
-# OS environ call to hide the PyGame support prompt
-os.environ["PYGAME_HIDE_SUPPORT_PROMPT"] = "hide"
-import pygame as pg
 from PySide6.QtCore import (
     Slot,  # noqa: F401
 )
 
+from ed_joy import resource_path, tracing
+from ed_joy.capture import CaptureSource
+from ed_joy.devices import DeviceRegistry
 from ed_joy.emitters import JoystickEventEmitter
+from ed_joy.inputs import (  # noqa: F401
+    JOYAXISMOTION,
+    JOYBUTTONDOWN,
+    JOYBUTTONUP,
+    JOYDEVICEADDED,
+    JOYDEVICEREMOVED,
+    JOYHATMOTION,
+    InputBackend,
+    InputEvent,
+)
 from ed_joy.logs import get_logger
+from ed_joy.metrics import Metrics, percentile
+from ed_joy.recording import InputRecorder
+from ed_joy.settings import Settings
+from ed_joy.state import StateTable
+from ed_joy.supervisor import Worker
+
+# OS environ call to hide the PyGame support prompt
+os.environ["PYGAME_HIDE_SUPPORT_PROMPT"] = "hide"
+pg = None
+"""pygame, imported by Joysticks._open so it stays out of startup"""
 
 # Ensure we have a log for this module
 
+LOOP_MODES = ("fps", "event")
+"""Supported joystick loop modes.
+fps - pump the SDL queue then sleep for a fixed frame time.
+event - block on the SDL queue until an event arrives or the idle timeout expires.
+"""
+
+INPUT_BACKENDS = ("pygame", "evdev")
+"""Supported input backends.
+pygame - SDL through pygame, on the joystick thread or a capture process.
+evdev - Linux /dev/input/event* devices read directly, see ed_joy.evdev.
+"""
+
+class LoopStats:
+    """Counters describing how the joystick loop is behaving. Used to compare
+    loop modes, only ever written from the joystick thread."""
+
+    def __init__(self, samples=1024):
+        """
+        Args:
+            samples (int, optional): Number of latency samples to keep.
+                                     Defaults to 1024.
+        """
+        self._samples = samples
+        self.reset()
+
+    def reset(self):
+        """Reset all counters"""
+        self.started = time.perf_counter()
+        self.wakeups = 0
+        """Number of times the loop woke up"""
+        self.idle_wakeups = 0
+        """Number of times the loop woke up with no events to process"""
+        self.events = 0
+        """Number of SDL events processed"""
+        self.axis_events = 0
+        """Number of axis events received"""
+        self.axis_signals = 0
+        """Number of batched axis signals emitted"""
+        self.latencies = deque(maxlen=self._samples)
+        """Input to emit latency samples in seconds"""
+
+    def add_latency(self, seconds):
+        self.latencies.append(seconds)
+
+    def snapshot(self):
+        """Summarise the counters since the last reset.
+
+        Returns:
+            dict: wakeups/events per second and latency percentiles in ms
+        """
+        elapsed = max(time.perf_counter() - self.started, 1e-9)
+        latencies = sorted(self.latencies)
+        ret = {
+            "elapsed": elapsed,
+            "wakeups_per_sec": self.wakeups / elapsed,
+            "idle_wakeups_per_sec": self.idle_wakeups / elapsed,
+            "events_per_sec": self.events / elapsed,
+            "axis_events": self.axis_events,
+            "axis_signals": self.axis_signals,
+            "latency_samples": len(latencies),
+            "latency_p50_ms": None,
+            "latency_p99_ms": None,
+            "latency_max_ms": None,
+        }
+        if latencies:
+            ret["latency_p50_ms"] = percentile(latencies, 50) * 1000
+            ret["latency_p99_ms"] = percentile(latencies, 99) * 1000
+            ret["latency_max_ms"] = latencies[-1] * 1000
+        return ret
+
+
+class AxisFilter:
+    """Per joystick/axis filter pipeline applied before an axis value is emitted.
+    Values are quantised to -100..100 then pass through the stages in order:
+    deadzone - values inside the deadzone snap to 0
+    unchanged - values equal to the last emitted value are dropped
+    hysteresis - changes not larger than the hysteresis are dropped
+    """
+
+    STAGES = ("deadzone", "unchanged", "hysteresis")
+
+    def __init__(self, deadzone=0, hysteresis=0, overrides=None):
+        """
+        Args:
+            deadzone (int, optional): Default deadzone in quantised units.
+                                      Defaults to 0.
+            hysteresis (int, optional): Default hysteresis in quantised units.
+                                        Defaults to 0.
+            overrides (dict, optional): Per device ("0") or per axis ("0:2")
+                                        dicts with deadzone/hysteresis keys.
+                                        Defaults to None.
+        """
+        self.deadzone = deadzone
+        self.hysteresis = hysteresis
+        self.overrides = overrides or {}
+        self._params = {}
+        """Resolved (deadzone, hysteresis) per (joy_id, axis)"""
+        self._last = {}
+        """Last emitted value per (joy_id, axis)"""
+        self.dropped = dict.fromkeys(self.STAGES, 0)
+        """Number of events dropped by each stage"""
+        self.passed = 0
+        """Number of events that made it through every stage"""
+
+    @classmethod
+    def from_settings(cls, settings):
+        """Build a filter from the joysticks.filter settings
+
+        Args:
+            settings (Settings): Settings instance
+
+        Returns:
+            AxisFilter: filter
+        """
+        return cls(
+            settings["joysticks.filter.deadzone"] or 0,
+            settings["joysticks.filter.hysteresis"] or 0,
+            settings["joysticks.filter.overrides"],
+        )
+
+    def params(self, joy_id, axis):
+        """Resolve the deadzone and hysteresis for an axis, axis overrides take
+        priority over device overrides which take priority over the defaults.
+
+        Returns:
+            tuple: deadzone, hysteresis
+        """
+        key = (joy_id, axis)
+        if key not in self._params:
+            params = {"deadzone": self.deadzone, "hysteresis": self.hysteresis}
+            params.update(self.overrides.get(str(joy_id), {}))
+            params.update(self.overrides.get(f"{joy_id}:{axis}", {}))
+            self._params[key] = (params["deadzone"], params["hysteresis"])
+        return self._params[key]
+
+    def seed(self, joy_id, axis, value):
+        """Record the starting value of an axis without filtering it
+
+        Args:
+            joy_id (int): Joystick ID
+            axis (int): Axis
+            value (float): Axis value between -1 and 1
+
+        Returns:
+            int: Quantised value
+        """
+        quantised = int(value * 100)
+        self._last[(joy_id, axis)] = quantised
+        return quantised
+
+    def apply(self, joy_id, axis, value):
+        """Run an axis value through the pipeline
+
+        Args:
+            joy_id (int): Joystick ID
+            axis (int): Axis
+            value (float): Axis value between -1 and 1
+
+        Returns:
+            int: Quantised value to emit, None if the value was dropped
+        """
+        key = (joy_id, axis)
+        deadzone, hysteresis = self.params(joy_id, axis)
+        quantised = int(value * 100)
+        last = self._last.get(key)
+
+        if abs(quantised) <= deadzone:
+            if last == 0:
+                self.dropped["deadzone"] += 1
+                return None
+            quantised = 0
+
+        if quantised == last:
+            self.dropped["unchanged"] += 1
+            return None
+
+        # Always let the centre and the end stops through
+        if (
+            last is not None
+            and quantised not in (-100, 0, 100)
+            and abs(quantised - last) <= hysteresis
+        ):
+            self.dropped["hysteresis"] += 1
+            return None
+
+        self._last[key] = quantised
+        self.passed += 1
+        return quantised
+
+    def reset(self):
+        """Forget the last emitted values and resolved parameters"""
+        self._params.clear()
+        self._last.clear()
+
+    def forget(self, joy_id):
+        """Forget the last emitted values and resolved parameters of a device
+
+        Args:
+            joy_id (int): Joystick ID
+        """
+        for cache in (self._params, self._last):
+            for key in [key for key in cache if key[0] == joy_id]:
+                del cache[key]
+
+
+def unpack_axes(batch):
+    """Iterate over a batch emitted by JoystickEventEmitter.axes_moved
+
+    Args:
+        batch (array): Flattened (joy_id, axis, value) triples
+
+    Yields:
+        tuple: joy_id, axis, value
+    """
+    for i in range(0, len(batch), 3):
+        yield batch[i], batch[i + 1], batch[i + 2]
+
 
 class Joysticks:
     _instance = None
@@ -40,7 +280,50 @@ class Joysticks:
         """How long we should sleep on each pass."""
         self.fps = 30
         """Our targeted FPS, used to determine how often to run"""
-        self._halt_thread = False
+        settings = Settings()
+        self.mode = settings["joysticks.mode"] or "event"
+        """Loop mode, see LOOP_MODES"""
+        self.idle_timeout = settings["joysticks.idle_timeout"] or 250
+        """How long (ms) the event loop may block before checking for a halt"""
+        self.stats = LoopStats()
+        """Loop counters, see LoopStats"""
+        self.filter = AxisFilter.from_settings(settings)
+        """Axis filter pipeline, see AxisFilter"""
+        self.record_path = settings["joysticks.record"] or ""
+        """Recording file for the raw event stream, empty to disable"""
+        self.recorder = None
+        """InputRecorder used while running, see record_path"""
+        self.source = None
+        """Event source used instead of SDL when set, e.g. ReplaySource"""
+        self.backend = settings["joysticks.backend"] or "pygame"
+        """Input backend, see INPUT_BACKENDS"""
+        self.capture = settings["joysticks.capture"] or "thread"
+        """Where SDL is read, "thread" (joystick thread) or "process" (own
+        process, see CaptureSource)"""
+        self._own_source = None
+        """Source opened by _open() for the backend, closed by _close()"""
+        self._state = StateTable()
+        """Device state table, see state"""
+        self._devices = DeviceRegistry()
+        """Connected devices, keyed by SDL instance ID"""
+        self._pending_axes = {}
+        """Latest value per (joy_id, axis) collected during this loop pass"""
+        self._pending_probes = []
+        """Probe timestamps collected during this loop pass"""
+        self._worker = None
+        """Worker running the joystick loop while started"""
+        metrics = Metrics()
+        self._device_events = metrics.counter(
+            "ed_joy_device_events_total", "Joystick events received", ("joy_id",)
+        )
+        self._signals = metrics.counter(
+            "ed_joy_signals_emitted_total", "Qt signals emitted", ("signal",)
+        )
+        self._jitter = metrics.summary(
+            "ed_joy_loop_jitter_seconds",
+            "How late the joystick loop woke up compared to when it was due",
+            ("loop",),
+        )
         self._running = False
         self._initialized = True
 
@@ -57,6 +340,16 @@ class Joysticks:
         """
         return self._emitter
 
+    @property
+    def state(self):
+        """Get the latest device state snapshot. Lock free, safe to call from any
+        thread.
+
+        Returns:
+            StateSnapshot: snapshot
+        """
+        return self._state.snapshot()
+
     @property
     def fps(self):
         """Return the current FPS.
@@ -77,97 +370,508 @@ class Joysticks:
             self._fps = fps
             self._sleep = round(1 / self.fps * 1000)
 
+    @property
+    def mode(self):
+        """Return the current loop mode.
+
+        Returns:
+            str: Current loop mode
+        """
+        return self._mode
+
+    @mode.setter
+    def mode(self, mode):
+        if mode not in LOOP_MODES:
+            raise ValueError(f"mode must be one of {LOOP_MODES}")
+
+        with self._lock:
+            self._mode = mode
+
+    @property
+    def backend(self):
+        """Return the input backend used by the joystick worker.
+
+        Returns:
+            str: Input backend
+        """
+        return self._backend
+
+    @backend.setter
+    def backend(self, backend):
+        if backend not in INPUT_BACKENDS:
+            raise ValueError(f"backend must be one of {INPUT_BACKENDS}")
+
+        with self._lock:
+            self._backend = backend
+
+    @property
+    def idle_timeout(self):
+        """Return the idle timeout used by the event loop mode.
+
+        Returns:
+            int: Timeout in ms
+        """
+        return self._idle_timeout
+
+    @idle_timeout.setter
+    def idle_timeout(self, timeout):
+        if not isinstance(timeout, int):
+            raise TypeError("idle_timeout parameter must be an int")
+        if timeout <= 0:
+            raise ValueError("idle_timeout must be >0")
+
+        with self._lock:
+            self._idle_timeout = timeout
+
     def start(self):
-        """Start the joystick_thread to monitor input.
+        """Start the joystick worker to monitor input.
         If already started, do nothing"""
-        if hasattr(self,'_thread') and self._thread is not None:
-            # Only run if we do not have an existing thread
+        if self._worker is not None or self._running:
+            # Only run if we do not have an existing worker
             return
 
-        pg.init()
-        pg.joystick.init()
-        self._count = pg.joystick.get_count()
+        self._open(self._backend, self.capture == "process")
+        self._worker = Worker(
+            "joysticks",
+            self._loop_pass,
+            setup=self._loop_setup,
+            teardown=self._loop_teardown,
+            wake=self._wake,
+        )
+        self._worker.start()
 
-        if self._count == 0:
-            print("No joystick found.")
+    def stop(self, timeout=2.0):
+        """Stop the joystick worker and wait for it to finish
 
+        Args:
+            timeout (float, optional): Seconds to wait. Defaults to 2.0.
 
-        self._thread = threading.Thread(
-            target=self.__joystick_thread, args=(), daemon=True
+        Returns:
+            bool: True if the worker stopped, the devices stay open otherwise
+        """
+        if self._worker is None:
+            # Only run if we do have an existing worker
+            if self._running:
+                # run_async() was cancelled without getting to clean up
+                self._close()
+            return True
+        if not self._worker.stop(timeout):
+            # The loop may still be reading the source, keep it open
+            return False
+        self.__logger.debug(f"Loop stats ({self._mode}): {self.stats.snapshot()}")
+        self.__logger.debug(
+            f"Axis filter passed {self.filter.passed}, dropped {self.filter.dropped}"
         )
-        self._thread.start()
+        self.__logger.debug(f"Worker health: {self._worker.health()}")
+        self._close()
+        self._worker = None
+        return True
 
-    def stop(self):
-        if not hasattr(self,'_thread') or self._thread is None:
-            # Only run if we do have an existing thread
+    async def run_async(self):
+        """Run the joystick loop as an asyncio task, in place of the worker
+        thread. SDL is polled on a timer every frame, backing off would delay
+        the first input after an idle period. Cancel the task to stop."""
+        if self._worker is not None or self._running:
             return
+        if self.source is not None:
+            raise ValueError("Event sources need the joystick worker")
+        self._running = True
+        # SDL is polled on the event loop, whatever the backend
+        self._open("pygame", False)
+        self._loop_setup()
+        frame = self._sleep / 1000
+        try:
+            while True:
+                self._process_events(self._poll_events())
+                started = time.perf_counter()
+                await asyncio.sleep(frame)
+                self._observe_jitter("async", started, frame)
+        finally:
+            self.__logger.debug(f"Loop stats (async): {self.stats.snapshot()}")
+            self._loop_teardown()
+            self._close()
+            self._running = False
+
+    def _open(self, backend, capture_process):
+        """Private: Open the event source and the recorder
+
+        Args:
+            backend (str): Input backend, see INPUT_BACKENDS
+            capture_process (bool): Read SDL in a capture process
+        """
+        global pg
+        if backend == "evdev" and self.source is None:
+            from ed_joy.evdev import EvdevBackend
+
+            # Devices are announced by the backend, SDL is never started
+            self._count = 0
+            self._own_source = EvdevBackend(idle_timeout=self._idle_timeout)
+            self._own_source.start()
+            self.source = self._own_source
+        elif capture_process and self.source is None:
+            # Devices are announced by the capture process
+            self._count = 0
+            self._own_source = CaptureSource(idle_timeout=self._idle_timeout)
+            self._own_source.start()
+            self.source = self._own_source
+        elif self.source is not None:
+            # An injected source, e.g. a replay, announces or implies its own
+            # devices. SDL devices would collide with its joystick IDs
+            self._count = 0
+        else:
+            import pygame as pg
+
+            # Only the subsystems we need, the event queue requires the display
+            pg.display.init()
+            pg.joystick.init()
+            self._count = pg.joystick.get_count()
+
+            if self._count == 0:
+                self.__logger.info("No joystick found.")
+
+        if self.record_path:
+            self.recorder = InputRecorder(resource_path(self.record_path, True))
+
+    def _close(self):
+        """Private: Close what _open() opened"""
         with self._lock:
-            self._halt_thread = True
+            if self.recorder is not None:
+                self.recorder.close()
+                self.recorder = None
+            if self._own_source is not None:
+                self._own_source.stop()
+                self.source = self._own_source = None
+
+    @property
+    def devices(self):
+        """Get the connected devices
+
+        Returns:
+            list: Device for each connected joystick
+        """
+        with self._lock:
+            return self._devices.devices()
 
     def get_joysticks_and_axis(self):
-        self._joysticks = []
         for j in range(0, self._count):
-            joy = pg.joystick.Joystick(j)
-            joy.init()
-            # Grab the current axis position. Seems to default to 0
-            for axis in range(0, joy.get_numaxes()):
-                self.emitter.axis_movement.emit(j, axis, joy.get_axis(axis),0)
+            self._add_device(j)
+        self._flush_axes(0)
+        self._state.publish(0)
+
+    def _add_device(self, device_index):
+        """Open a newly connected joystick and register it
+
+        Args:
+            device_index (int): SDL device index
+        """
+        joy = pg.joystick.Joystick(device_index)
+        joy.init()
+        self._register_device(
+            joy.get_instance_id(),
+            joy.get_guid(),
+            joy.get_name(),
+            joy.get_numaxes(),
+            joy.get_numbuttons(),
+            joy.get_numhats(),
+            [joy.get_axis(axis) for axis in range(joy.get_numaxes())],
+            joy,
+        )
+
+    def _register_device(
+        self,
+        instance_id,
+        guid,
+        name,
+        num_axes,
+        num_buttons,
+        num_hats,
+        axes,
+        joystick=None,
+    ):
+        """Register a newly connected joystick, only touching that device's
+        state and filters, and announce it with device_added.
+
+        Args:
+            instance_id (int): SDL instance ID
+            guid (str): Device GUID
+            name (str): Device name
+            num_axes (int): Number of axes
+            num_buttons (int): Number of buttons
+            num_hats (int): Number of hats
+            axes (list): Current axis values
+            joystick (pg.joystick.Joystick, optional): None when opened by
+                                                       another process.
+        """
+        with self._lock:
+            # Yay thread safety
+            device = self._devices.add(instance_id, guid, name, joystick)
+        if device is None:
+            return  # Already registered, SDL announces devices present at init
+        j = device.joy_id
+        self.__logger.info(f"Joystick {j} connected: {device.name}")
+        self._state.add_device(j, num_axes, num_hats)
+        self.filter.forget(j)
+        self._emit("device_added", j, name, num_axes, num_buttons, num_hats)
+        # Grab the current axis position. Seems to default to 0
+        for axis, value in enumerate(axes):
+            self._state.set_axis(j, axis, value)
+            val = self.filter.seed(j, axis, value)
+            self._pending_axes[(j, axis)] = val
+
+    def _remove_device(self, instance_id):
+        """Tear down a disconnected joystick and announce it with device_removed
+
+        Args:
+            instance_id (int): SDL instance ID
+        """
+        with self._lock:
+            device = self._devices.remove(instance_id)
+        if device is None:
+            return
+        j = device.joy_id
+        self.__logger.info(f"Joystick {j} disconnected: {device.name}")
+        self._state.remove_device(j)
+        self.filter.forget(j)
+        for key in [key for key in self._pending_axes if key[0] == j]:
+            del self._pending_axes[key]
+        if device.joystick is not None:
+            device.joystick.quit()
+        self._emit("device_removed", j)
+
+    def inject_probe(self, joy_id, axis, value):
+        """Post a synthetic axis event carrying its creation time so the loop
+        can measure input to emit latency.
+
+        Args:
+            joy_id (int): Joystick ID
+            axis (int): Axis
+            value (float): Axis value between -1 and 1
+        """
+        pg.event.post(
+            pg.event.Event(
+                pg.JOYAXISMOTION,
+                joy=joy_id,
+                instance_id=joy_id,
+                axis=axis,
+                value=value,
+                probe_ts=time.perf_counter(),
+            )
+        )
+
+    def _wait_for_events(self):
+        """Collect the pending SDL events according to the loop mode.
+
+        Returns:
+            list: pygame events, empty if we woke up with nothing to do
+        """
+        if self._mode == "event":
+            # Block until input arrives, waking periodically to check for a halt
+            started = time.perf_counter()
+            event = pg.event.wait(self._idle_timeout)
+            if event.type == pg.NOEVENT:
+                self._observe_jitter("event", started, self._idle_timeout / 1000)
+                return []
+            return self._drain(event)
 
-            with self._lock:
-                # Yay thread safety
-                self._joysticks.append(joy)
+        return self._poll_events()
 
-    def __joystick_thread(self):
+    def _poll_events(self):
+        """Private: Collect the pending SDL events without blocking"""
+        pg.event.pump()
+        return self._drain(pg.event.poll())
+
+    def _drain(self, event):
+        """Private: Dequeue the pending SDL events one at a time, stamping each
+        with the time it was read, see InputBackend
+
+        Args:
+            event (pg.event.Event): First event, already dequeued
+
+        Returns:
+            list: pygame events
+        """
+        events = []
+        while event.type != pg.NOEVENT:
+            event.ts = time.time()
+            events.append(event)
+            event = pg.event.poll()
+        return events
+
+    def _handle_event(self, event, now):
+        """Emit the signal matching a pygame event
+
+        Args:
+            event (pg.event.Event): pygame event or InputEvent
+            now (float): Timestamp the event batch was collected
+        """
+        if event.type == JOYDEVICEADDED:
+            self._handle_device_added(event)
+        elif event.type == JOYDEVICEREMOVED:
+            self._remove_device(event.instance_id)
+        elif hasattr(event, "joy"):  # Skip wake-ups and other non joystick events
+            self._handle_input_event(event, now)
+
+    def _handle_device_added(self, event):
+        """Register a device announced by SDL, or described by a source
+
+        Args:
+            event (pg.event.Event): JOYDEVICEADDED pygame event or InputEvent
+        """
+        if event.device_index < 0:
+            # Described by the source, see InputBackend
+            self._register_device(
+                event.instance_id,
+                event.guid,
+                event.name,
+                event.num_axes,
+                event.num_buttons,
+                event.num_hats,
+                event.axes,
+            )
+        else:
+            self._add_device(event.device_index)
+
+    def _handle_input_event(self, event, now):
+        """Update the device state and emit the signal matching an axis, button
+        or hat event
+
+        Args:
+            event (pg.event.Event): pygame event or InputEvent
+            now (float): Timestamp the event batch was collected
+        """
+        # Synthetic events (probes, replays) fall back to their joy index
+        joy_id = self._devices.joy_id(event.instance_id, event.joy)
+        self._device_events.labels(joy_id).inc()
+        if event.type == JOYAXISMOTION:
+            # Only keep the latest value per axis, see _flush_axes
+            self.stats.axis_events += 1
+            self._state.set_axis(joy_id, event.axis, event.value)
+            val = self.filter.apply(joy_id, event.axis, event.value)
+            if val is not None:
+                self._pending_axes[(joy_id, event.axis)] = val
+        if event.type == JOYBUTTONDOWN:
+            self._state.set_button(joy_id, event.button, True)
+            self._emit("button_down", joy_id, event.button, now)
+            # print(f"Joy: {joy_id} Btn: {event.button} Pressed")
+
+        if event.type == JOYBUTTONUP:
+            self._state.set_button(joy_id, event.button, False)
+            self._emit("button_up", joy_id, event.button, now)
+            # print(f"Joy: {joy_id} Btn: {event.button} Released")
+
+        if event.type == JOYHATMOTION:
+            self._state.set_hat(joy_id, event.hat, event.value)
+            self._emit("hat_motion", joy_id, event.hat, event.value, now)
+            # print(
+            #     f"Joy: {joy_id} Hat: {event.hat} Val:{event.value}",
+            # )
+
+        probe_ts = getattr(event, "probe_ts", None)
+        if probe_ts is not None:
+            self._pending_probes.append(probe_ts)
+
+    def _emit(self, signal, *args):
+        """Private: Emit a JoystickEventEmitter signal, counting and tracing it
+
+        Args:
+            signal (str): Signal name
+        """
+        start = tracing.now()
+        getattr(self._emitter, signal).emit(*args)
+        tracing.complete(signal, "emit", start)
+        self._signals.labels(signal).inc()
+
+    def _flush_axes(self, now):
+        """Emit every axis that changed during this loop pass as a single
+        axes_moved signal, so the GUI thread gets one delivery per pass.
+
+        Args:
+            now (float): Timestamp the event batch was collected
+        """
+        if self._pending_axes:
+            batch = array("i")
+            for (joy_id, axis), val in self._pending_axes.items():
+                batch.extend((joy_id, axis, val))
+            self._pending_axes.clear()
+            self._emit("axes_moved", batch, now)
+            self.stats.axis_signals += 1
+
+        if self._pending_probes:
+            emitted = time.perf_counter()
+            for probe_ts in self._pending_probes:
+                self.stats.add_latency(emitted - probe_ts)
+            self._pending_probes.clear()
+
+    def _loop_setup(self):
+        """Private: Worker setup, also run again after a crash"""
         self.get_joysticks_and_axis()
-        while True:
-            pg.event.pump()
+        self.stats.reset()
+
+    def _loop_teardown(self):
+        """Private: Worker teardown, drop what a crash may have left half done"""
+        self._pending_axes.clear()
+        self._pending_probes.clear()
+
+    def _wake(self):
+        """Private: Interrupt a blocking wait so the worker sees the stop"""
+        wake = getattr(self.source, "wake", None)
+        if wake is not None:
+            wake()
+        elif self.source is None and pg is not None and pg.display.get_init():
+            pg.event.post(pg.event.Event(pg.USEREVENT))
+
+    def _loop_pass(self):
+        """Private: One pass of the joystick loop, run by the worker"""
+        if self.source is not None:
+            events = self.source.wait_for_events()
+        else:
+            events = self._wait_for_events()
+        self._process_events(events)
+
+        worker = self._worker
+        if self._mode == "fps" and worker is not None:
+            started = time.perf_counter()
+            if not worker.wait(self._sleep / 1000):
+                self._observe_jitter("fps", started, self._sleep / 1000)
+
+    def _observe_jitter(self, loop, started, scheduled):
+        """Private: Record how much longer than scheduled the loop slept
+
+        Args:
+            loop (str): Loop variant, "event", "fps" or "async"
+            started (float): perf_counter() when the loop went to sleep
+            scheduled (float): Seconds the loop meant to sleep for
+        """
+        late = time.perf_counter() - started - scheduled
+        self._jitter.labels(loop).observe(max(late, 0.0))
+
+    def _process_events(self, events):
+        """Private: Record, count and handle a batch of events then publish
+        the state
+
+        Args:
+            events (list): pygame events
+        """
+        start = tracing.now()
+        # Sources reading ahead stamp their events, see InputBackend
+        now = getattr(events[-1], "ts", None) if events else None
+        if now is None:
             now = time.time()
-            try:
-                for event in pg.event.get():
-                    if event.type == pg.JOYAXISMOTION:
-                        self.emitter.axis_movement.emit(
-                            event.joy,
-                            event.axis,
-                            int(event.value * 100),
-                            now
-                        )
-                    if event.type == pg.JOYBUTTONDOWN:
-                        self.emitter.button_down.emit(
-                            event.joy,
-                            event.button,
-                            now,
-                        )
-                        # print(f"Joy: {event.joy} Btn: {event.button} Pressed")
-
-                    if event.type == pg.JOYBUTTONUP:
-                        self.emitter.button_up.emit(
-                            event.joy,
-                            event.button,
-                            now,
-                        )
-                        # print(f"Joy: {event.joy} Btn: {event.button} Released")
-
-                    if event.type == pg.JOYHATMOTION:
-                        self.emitter.hat_motion.emit(
-                            event.joy,
-                            event.hat,
-                            event.value,
-                            now
-                        )
-                        # print(
-                        #     f"Joy: {event.joy} Hat: {event.hat} Val:{event.value}",
-                        # )
-
-                with self._lock:
-                    if self._halt_thread:
-                        # Gracefully clean up our thread
-                        self._thread = None
-                        self.halt_thread = False
-                        return
-            except Exception as e:
-                print(e)
-
-            pg.time.wait(self._sleep)
+        if self.recorder is not None:
+            for event in events:
+                self.recorder.record(event, getattr(event, "ts", None) or now)
+        self.stats.wakeups += 1
+        if not events:
+            self.stats.idle_wakeups += 1
+        self.stats.events += len(events)
+
+        for event in events:
+            self._handle_event(event, now)
+        self._flush_axes(now)
+        self._state.publish(now)
+        tracing.complete(
+            "loop_iteration", "joysticks", start, args={"events": len(events)}
+        )
 
     def print_details(self,joy_id):
         """Print the details about the joystick specified
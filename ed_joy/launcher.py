@@ -0,0 +1,446 @@
+"""Companion app launcher. Configured tools are started together when the
+monitored game starts and stopped together when it closes or when ED Joy exits,
+so bringing the toolchain up takes as long as the slowest app rather than the
+sum of them all."""
+import os
+import shlex
+import signal
+import socket
+import subprocess
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+
+from ed_joy import logs, tracing
+from ed_joy.metrics import Metrics
+from ed_joy.settings import DEFAULT_TARGET
+from ed_joy.windows import title_matcher
+
+APP_STATES = ("starting", "ready", "failed", "external", "stopped")
+"""States reported for each app.
+starting - the process was started, waiting for it to be ready
+ready - the app is ready
+failed - the app could not be started or did not get ready in time
+external - the app was already running, it is left alone
+stopped - the app was stopped, or exited on its own
+"""
+
+WINDOWS = os.name == "nt"
+"""Popen.terminate() kills processes outright on Windows, apps are asked to exit
+through their windows or with a Ctrl+Break instead, see Launcher._request_exit"""
+CREATION_FLAGS = subprocess.CREATE_NEW_PROCESS_GROUP if WINDOWS else 0
+"""Ctrl+Break can only be sent to a process group"""
+
+
+class CompanionApp:
+    """A companion tool started by the Launcher. It is ready once its window
+    exists (ready_window), it accepts connections on a local port (ready_port)
+    or, with neither, once it is still running after ready_delay."""
+
+    def __init__(
+        self,
+        name,
+        command,
+        cwd=None,
+        ready_window=None,
+        ready_port=None,
+        ready_delay=0.5,
+        ready_timeout=30.0,
+    ):
+        """
+        Args:
+            name (str): App name
+            command (list): Program and arguments, a string is split
+            cwd (str, optional): Working directory. Defaults to None.
+            ready_window (str, optional): Part of the title of the app's window.
+                                          Defaults to None.
+            ready_port (int, optional): Local TCP port the app listens on.
+                                        Defaults to None.
+            ready_delay (float, optional): Seconds the app must keep running
+                                           when there is nothing else to check.
+                                           Defaults to 0.5.
+            ready_timeout (float, optional): Seconds to wait for the app to be
+                                             ready. Defaults to 30.0.
+        """
+        self.name = name
+        self.command = shlex.split(command) if isinstance(command, str) else command
+        self.cwd = cwd or None
+        self.ready_window = ready_window or None
+        self.ready_port = ready_port or None
+        self.ready_delay = ready_delay
+        self.ready_timeout = ready_timeout
+
+    @classmethod
+    def from_settings(cls, data):
+        """Build an app from a launcher.apps entry
+
+        Args:
+            data (dict): name, command and optionally cwd, ready_window,
+                         ready_port, ready_delay and ready_timeout
+
+        Returns:
+            CompanionApp: app
+        """
+        return cls(
+            data["name"],
+            data["command"],
+            data.get("cwd"),
+            data.get("ready_window"),
+            data.get("ready_port"),
+            data.get("ready_delay", 0.5),
+            data.get("ready_timeout", 30.0),
+        )
+
+
+class Launcher:
+    """Start the companion apps when the trigger target starts running and stop
+    them when it stops, see on_process_running. Apps are started, waited on and
+    stopped concurrently on a thread pool, so callers never block, except for
+    shutdown() which waits for the apps to stop. Start and stop requests are
+    handled one at a time, in the order they were made."""
+
+    def __init__(
+        self,
+        apps,
+        emitter=None,
+        window_backend=None,
+        target=DEFAULT_TARGET,
+        terminate=True,
+        stop_timeout=5.0,
+    ):
+        """
+        Args:
+            apps (list): CompanionApp to launch
+            emitter (LauncherEmitter, optional): Reports app states.
+                                                 Defaults to None.
+            window_backend (WindowBackend, optional): Used for ready_window.
+                                                      Defaults to Win32 on
+                                                      Windows, none elsewhere.
+            target (str, optional): Target starting the apps.
+                                    Defaults to DEFAULT_TARGET.
+            terminate (bool, optional): Stop the apps when the target stops
+                                        running. Defaults to True.
+            stop_timeout (float, optional): Seconds an app gets to exit before
+                                            it is killed. Defaults to 5.0.
+        """
+        self.apps = list(apps)
+        self.emitter = emitter
+        self.target = target
+        self.terminate = terminate
+        self.stop_timeout = stop_timeout
+        self.states = dict.fromkeys((app.name for app in self.apps), "stopped")
+        """App name: state, see APP_STATES"""
+        self._window_backend = window_backend
+        self._processes = {}
+        """App name: Popen of the apps we started"""
+        self._starts = {}
+        """App name: Future of its latest start"""
+        self._lock = threading.Lock()
+        self._cancel = threading.Event()
+        """Set to abandon the starts in progress, see stop_all. Each start_all
+        after a stop gets a new one, so the stop can not cancel later starts"""
+        self._executor = ThreadPoolExecutor(
+            max_workers=max(len(self.apps), 1), thread_name_prefix="launcher"
+        )
+        self._control = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="launcher_control"
+        )
+        """Runs the requests of on_process_running in order, see _request"""
+        self._logger = logs.get_logger(__name__)
+        self._ready_time = Metrics().summary(
+            "ed_joy_launcher_ready_seconds",
+            "Time taken by a companion app to get ready",
+            ("app",),
+        )
+        if window_backend is None and not WINDOWS:
+            for app in self.apps:
+                if app.ready_window is not None:
+                    self._logger.warning(
+                        "No windowing backend, %s gets ready after %ss instead "
+                        "of when its window opens",
+                        app.name,
+                        app.ready_delay,
+                    )
+
+    @classmethod
+    def from_settings(cls, settings, emitter=None, window_backend=None):
+        """Build the launcher from the launcher settings
+
+        Args:
+            settings (Settings): Settings
+            emitter (LauncherEmitter, optional): Reports app states.
+                                                 Defaults to None.
+            window_backend (WindowBackend, optional): Used for ready_window.
+                                                      Defaults to Win32.
+
+        Returns:
+            Launcher: launcher, None when disabled or without apps
+        """
+        apps = settings["launcher.apps"] or []
+        if not settings["launcher.enabled"] or not apps:
+            return None
+        return cls(
+            [CompanionApp.from_settings(app) for app in apps],
+            emitter,
+            window_backend,
+            settings["launcher.target"] or DEFAULT_TARGET,
+            settings["launcher.terminate"],
+            settings["launcher.stop_timeout"] or 5.0,
+        )
+
+    @property
+    def window_backend(self):
+        """Windowing system backend, created on first use. None when not on
+        Windows and none was given, ready_window is not checked then"""
+        if self._window_backend is None and WINDOWS:
+            from ed_joy.windows import Win32WindowBackend
+
+            self._window_backend = Win32WindowBackend()
+        return self._window_backend
+
+    def on_process_running(self, name, is_running):
+        """Slot for ProcessMonitorEmitter.process_running, returns immediately
+
+        Args:
+            name (str): Target name
+            is_running (bool): Target running state
+        """
+        if name != self.target:
+            return
+        if is_running:
+            self._request(self.start_all)
+        elif self.terminate:
+            # Abandon the readiness waits now, the stop may be queued
+            self._cancel.set()
+            self._request(self.stop_all)
+
+    def _request(self, action):
+        """Private: Queue a start or stop, after those already requested"""
+        future = self._control.submit(action)
+        future.add_done_callback(self._request_done)
+
+    def _request_done(self, future):
+        """Private: Log a start or stop that failed"""
+        if not future.cancelled() and future.exception() is not None:
+            self._logger.error(
+                "Launcher request failed", exc_info=future.exception()
+            )
+
+    def _set_state(self, app, state):
+        """Private: Record and report the state of an app"""
+        self.states[app.name] = state
+        self._logger.info("%s %s", app.name, state)
+        if self.emitter is not None:
+            self.emitter.app_state.emit(app.name, state)
+
+    def start_all(self):
+        """Start every app that is not running, concurrently. Returns once the
+        starts cancelled by a stop have finished, an app is only started once
+        at a time.
+
+        Returns:
+            list: Future per app started, resolving to its final state
+        """
+        pending = []
+        with self._lock:
+            if self._cancel.is_set():
+                # The starts cancelled so far must stay cancelled
+                self._cancel = threading.Event()
+                pending = [
+                    future for future in self._starts.values() if not future.done()
+                ]
+        wait(pending)
+
+        futures = []
+        with self._lock:
+            cancel = self._cancel
+            for app in self.apps:
+                proc = self._processes.get(app.name)
+                if proc is not None and proc.poll() is None:
+                    continue
+                if self.states[app.name] in ("starting", "external"):
+                    continue
+                self.states[app.name] = "starting"
+                future = self._executor.submit(self._start, app, cancel)
+                self._starts[app.name] = future
+                futures.append(future)
+        return futures
+
+    def _already_running(self, app):
+        """Private: Check whether an app with a window is already open"""
+        if app.ready_window is None or self.window_backend is None:
+            return False
+        match = title_matcher(app.ready_window)
+        return any(match(title) for _hwnd, title in self.window_backend.enum_windows())
+
+    def _start(self, app, cancel):
+        """Private: Start an app and wait for it to be ready, run on the pool
+
+        Args:
+            app (CompanionApp): App to start
+            cancel (threading.Event): Set when the start is cancelled
+
+        Returns:
+            str: Final state
+        """
+        with tracing.span(f"launch {app.name}", "launcher"):
+            if self._already_running(app):
+                self._set_state(app, "external")
+                return "external"
+            started = time.perf_counter()
+            try:
+                proc = subprocess.Popen(
+                    app.command, cwd=app.cwd, creationflags=CREATION_FLAGS
+                )
+            except OSError as e:
+                self._logger.error("Could not start %s: %s", app.name, e)
+                self._set_state(app, "failed")
+                return "failed"
+            with self._lock:
+                cancelled = cancel.is_set()
+                if not cancelled:
+                    self._processes[app.name] = proc
+            if cancelled:
+                # Stopped while starting, stop_all did not see this process
+                self._request_exit(proc)
+                self._reap(app.name, proc, time.monotonic() + self.stop_timeout)
+                return "stopped"
+            self._set_state(app, "starting")
+
+            if not self._wait_ready(app, proc, cancel):
+                state = "stopped" if cancel.is_set() else "failed"
+                self._set_state(app, state)
+                return state
+            self._ready_time.labels(app.name).observe(
+                time.perf_counter() - started
+            )
+            self._set_state(app, "ready")
+            return "ready"
+
+    def _is_ready(self, app, proc, started):
+        """Private: Run the readiness check of an app once"""
+        if app.ready_port is not None:
+            try:
+                with socket.create_connection(("127.0.0.1", app.ready_port), 0.1):
+                    return True
+            except OSError:
+                return False
+        if app.ready_window is not None and self.window_backend is not None:
+            return self._already_running(app)
+        return time.monotonic() - started >= app.ready_delay
+
+    def _wait_ready(self, app, proc, cancel):
+        """Private: Poll an app until it is ready, exits, times out or the
+        launcher stops it
+
+        Args:
+            app (CompanionApp): App started
+            proc (subprocess.Popen): App process
+            cancel (threading.Event): Set when the start is cancelled
+
+        Returns:
+            bool: True if ready
+        """
+        started = time.monotonic()
+        deadline = started + app.ready_timeout
+        while True:
+            if proc.poll() is not None:
+                self._logger.warning(
+                    "%s exited with code %s while starting", app.name, proc.returncode
+                )
+                return False
+            if self._is_ready(app, proc, started):
+                return True
+            if time.monotonic() >= deadline:
+                self._logger.warning(
+                    "%s not ready after %ss", app.name, app.ready_timeout
+                )
+                return False
+            if cancel.wait(0.1):
+                return False
+
+    def stop_all(self, timeout=None):
+        """Stop every app we started, concurrently. Each app is asked to exit
+        then killed if it is still running after the timeout.
+
+        Args:
+            timeout (float, optional): Seconds an app gets to exit.
+                                       Defaults to stop_timeout.
+
+        Returns:
+            bool: True if every app exited
+        """
+        timeout = self.stop_timeout if timeout is None else timeout
+        with self._lock:
+            self._cancel.set()
+            running = list(self._processes.items())
+            self._processes.clear()
+        for app in self.apps:
+            if self.states[app.name] == "external":
+                self.states[app.name] = "stopped"
+        if not running:
+            return True
+
+        # Ask everything first so the apps shut down side by side
+        for _name, proc in running:
+            if proc.poll() is None:
+                self._request_exit(proc)
+        deadline = time.monotonic() + timeout
+        threads = [
+            threading.Thread(
+                target=self._reap, args=(name, proc, deadline), name=f"stop {name}"
+            )
+            for name, proc in running
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            # Killing takes a moment after the deadline
+            thread.join(max(deadline - time.monotonic(), 0) + 1)
+        return all(proc.poll() is not None for _name, proc in running)
+
+    def _request_exit(self, proc):
+        """Private: Ask an app to exit, _reap kills it if it does not. On
+        Windows its windows are closed, an app without any gets a Ctrl+Break.
+
+        Args:
+            proc (subprocess.Popen): App process
+        """
+        if not WINDOWS:
+            proc.terminate()
+            return
+        backend = self.window_backend
+        hwnds = [
+            hwnd
+            for hwnd, _title in backend.enum_windows()
+            if backend.get_window_pid(hwnd) == proc.pid
+        ]
+        for hwnd in hwnds:
+            backend.close_window(hwnd)
+        if hwnds:
+            return
+        try:
+            # Started in a process group of its own, see CREATION_FLAGS
+            proc.send_signal(signal.CTRL_BREAK_EVENT)
+        except OSError as e:
+            self._logger.warning("Could not ask pid %s to exit: %s", proc.pid, e)
+
+    def _reap(self, name, proc, deadline):
+        """Private: Wait for an app asked to exit to do so, killing it at the
+        deadline"""
+        app = next(app for app in self.apps if app.name == name)
+        try:
+            proc.wait(max(deadline - time.monotonic(), 0))
+        except subprocess.TimeoutExpired:
+            self._logger.warning("%s did not exit in time, killing it", name)
+            proc.kill()
+            proc.wait()
+        self._set_state(app, "stopped")
+
+    def shutdown(self):
+        """Stop the apps and the thread pools, call before exiting"""
+        self._cancel.set()
+        # Let a stop in progress finish, drop the requests still queued
+        self._control.shutdown(wait=True, cancel_futures=True)
+        self.stop_all()
+        self._executor.shutdown(wait=False, cancel_futures=True)
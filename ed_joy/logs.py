@@ -1,8 +1,21 @@
+import atexit
 import logging
+import queue
+import threading
+import time
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
 
 from ed_joy import resource_path
 from ed_joy.settings import Settings
 
+RATE_LIMITED = {"rate_limited": True}
+"""Pass as extra= for per-event messages, see RateLimitFilter"""
+
+_queue = queue.SimpleQueue()
+"""Records waiting to be written by the listener thread"""
+_listener = None
+_listener_lock = threading.Lock()
+
 
 def str_to_level(level: str):
     """Convert string level to log level.
@@ -17,44 +30,132 @@ def str_to_level(level: str):
     return getattr(logging, level.upper(), 10)
 
 
+class RateLimitFilter(logging.Filter):
+    """Let through at most one record per message per interval for records
+    logged with extra=RATE_LIMITED, other records are not affected. The number
+    of records dropped is added to the next one let through."""
+
+    def __init__(self, interval=1.0):
+        """
+        Args:
+            interval (float, optional): Seconds between two records with the same
+                                        message. Defaults to 1.0.
+        """
+        super().__init__()
+        self.interval = interval
+        self._last = {}
+        """message: (time last let through, records dropped since)"""
+
+    def filter(self, record):
+        if not getattr(record, "rate_limited", False):
+            return True
+        now = time.monotonic()
+        last, dropped = self._last.get(record.msg, (0, 0))
+        if now - last < self.interval:
+            self._last[record.msg] = (last, dropped + 1)
+            return False
+        self._last[record.msg] = (now, 0)
+        if dropped:
+            record.msg = f"{record.msg} ({dropped} similar suppressed)"
+        return True
+
+
+class _QueueHandler(QueueHandler):
+    """Hand records to the listener without formatting them on the calling
+    thread, the listener's handlers do the formatting."""
+
+    def prepare(self, record):
+        return record
+
+
+class _RoutingHandler(logging.Handler):
+    """Write each record to the rotating log file of its logger. Only used by the
+    listener thread."""
+
+    def __init__(self, formatter: logging.Formatter):
+        super().__init__()
+        self.setFormatter(formatter)
+        self._handlers = {}
+
+    def emit(self, record):
+        handler = self._handlers.get(record.name)
+        if handler is None:
+            log_file = resource_path(f"logs/ed_joy_{record.name}.log", mkdir=True)
+            handler = RotatingFileHandler(
+                log_file, maxBytes=1024 * 1024, backupCount=3
+            )
+            handler.setFormatter(self.formatter)
+            self._handlers[record.name] = handler
+        handler.handle(record)
+
+    def close(self):
+        for handler in self._handlers.values():
+            handler.close()
+        super().close()
+
+
+def get_listener():
+    """Start the background listener writing log records, if not started
+
+    Returns:
+        QueueListener: listener
+    """
+    global _listener
+    with _listener_lock:
+        if _listener is None:
+            # Create a formatter to attach to the handlers
+            format = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+            formatter = logging.Formatter(format)
+
+            # Create the console handler for debug messages
+            console_handler = logging.StreamHandler()
+            console_handler.setLevel(logging.DEBUG)
+            console_handler.setFormatter(formatter)
+
+            _listener = QueueListener(
+                _queue,
+                _RoutingHandler(formatter),
+                console_handler,
+                respect_handler_level=True,
+            )
+            _listener.start()
+            atexit.register(stop_listener)
+    return _listener
+
+
+def stop_listener():
+    """Write out the queued records and stop the listener"""
+    global _listener
+    with _listener_lock:
+        if _listener is not None:
+            _listener.stop()
+            for handler in _listener.handlers:
+                handler.close()
+            _listener = None
+
+
 def get_logger(name: str):
-    """Create a logger
+    """Create a logger. Records are queued and written by a background thread
+    so logging never blocks the caller on I/O.
 
     Args:
         name (str): Name for new logger
     """
-    #  Get the log file using resource_path
-    log_file = resource_path(f'logs/ed_joy_{name}.log', mkdir=True)
-
     logger = logging.getLogger(name)
     # Grab settings so we can check the log level
     settings = Settings()
     log_level = str_to_level(settings["logging.level"])
     logger.setLevel(log_level)
 
-    # Create a formatter to attach to the handlers
-    format = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-    formatter = logging.Formatter(format)
-
+    get_listener()
     # Check the number of handlers we currently have.
     if len(logger.handlers) == 0:
-        add_handlers(logger, log_file, formatter)
-    elif len(logger.handlers) != 2:
-        # we have an odd number of handlers, we should probably remove them
-        # and create new ones
-        # [ ] Add logic to remove and re-add handlers if we don't have 2
-        pass
+        add_handlers(logger)
     return logger
 
-def add_handlers(logger:logging.Logger, file ,formatter: logging.Formatter):
-    # Create the file handler
-    file_handler = logging.FileHandler(file)
-    file_handler.setFormatter(formatter)
-
-    # Create the console handler for debug messages
-    console_handler = logging.StreamHandler()
-    console_handler.setLevel(logging.DEBUG)
-    console_handler.setFormatter(formatter)
-    # Add the handlers to the logger
-    logger.addHandler(file_handler)
-    logger.addHandler(console_handler)
+
+def add_handlers(logger: logging.Logger):
+    # Records go through the queue to the listener
+    logger.addHandler(_QueueHandler(_queue))
+    # Rate limit in the calling thread, before anything is queued
+    logger.addFilter(RateLimitFilter())
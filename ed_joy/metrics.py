@@ -0,0 +1,332 @@
+"""Runtime metrics. Counters, gauges and summaries are kept in a single registry,
+shown by the diagnostics panel and optionally served in the Prometheus text
+format on a localhost port, see metrics.port."""
+import threading
+import time
+from collections import deque
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+from ed_joy import logs
+from ed_joy.supervisor import Worker
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+"""Prometheus text exposition format"""
+QUANTILES = (0.5, 0.99)
+"""Quantiles reported for summaries"""
+
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list.
+
+    Args:
+        sorted_values (list): Sorted values
+        pct (float): Percentile between 0 and 100
+
+    Returns:
+        float: Value at the requested percentile, None if the list is empty
+    """
+    if not sorted_values:
+        return None
+    index = round(pct / 100 * (len(sorted_values) - 1))
+    return sorted_values[index]
+
+
+class CounterValue:
+    """Value of a counter for one set of labels"""
+
+    __slots__ = ("value",)
+
+    def __init__(self):
+        self.value = 0
+
+    def inc(self, amount=1):
+        self.value += amount
+
+
+class GaugeValue:
+    """Value of a gauge for one set of labels"""
+
+    __slots__ = ("value",)
+
+    def __init__(self):
+        self.value = 0
+
+    def set(self, value):
+        self.value = value
+
+    def inc(self, amount=1):
+        self.value += amount
+
+
+class SummaryValue:
+    """Observations of a summary for one set of labels. The count and sum cover
+    every observation, quantiles only the most recent samples."""
+
+    __slots__ = ("count", "sum", "samples")
+
+    def __init__(self, samples=1024):
+        self.count = 0
+        self.sum = 0.0
+        self.samples = deque(maxlen=samples)
+
+    def observe(self, value):
+        self.count += 1
+        self.sum += value
+        self.samples.append(value)
+
+    def quantiles(self):
+        """Return the QUANTILES of the recent samples
+
+        Returns:
+            dict: quantile: value, None when nothing was observed
+        """
+        values = sorted(self.samples)
+        return {q: percentile(values, q * 100) for q in QUANTILES}
+
+
+class Metric:
+    """A named metric with a value per set of label values. Each value should
+    only be written by one thread, reads may happen from any thread."""
+
+    kind = None
+    value_class = None
+
+    def __init__(self, name, help, labels=()):
+        """
+        Args:
+            name (str): Metric name
+            help (str): Description
+            labels (tuple, optional): Label names. Defaults to ().
+        """
+        self.name = name
+        self.help = help
+        self.label_names = tuple(labels)
+        self._values = {}
+        """tuple of label values: value"""
+        self._lock = threading.Lock()
+
+    def labels(self, *values):
+        """Get the value for a set of label values, created on first use
+
+        Returns:
+            CounterValue, GaugeValue or SummaryValue: value
+        """
+        value = self._values.get(values)
+        if value is None:
+            with self._lock:
+                value = self._values.setdefault(values, self.value_class())
+        return value
+
+    def values(self):
+        """Return the label values and value pairs
+
+        Returns:
+            list: (tuple of label values, value) tuples
+        """
+        with self._lock:
+            return list(self._values.items())
+
+
+class Counter(Metric):
+    kind = "counter"
+    value_class = CounterValue
+
+    def inc(self, amount=1):
+        self.labels().inc(amount)
+
+
+class Gauge(Metric):
+    kind = "gauge"
+    value_class = GaugeValue
+
+    def set(self, value):
+        self.labels().set(value)
+
+
+class Summary(Metric):
+    kind = "summary"
+    value_class = SummaryValue
+
+    def observe(self, value):
+        self.labels().observe(value)
+
+
+class Metrics:
+    """Registry of every metric, see counter(), gauge() and summary()"""
+
+    _instance = None
+    _lock = threading.Lock()  # Ensure that we have thread-safe access
+
+    def __new__(cls):
+        if cls._instance is None:
+            with cls._lock:  # Lock only if we are not initialized
+                if cls._instance is None:
+                    # Verify that we did not get initialized before we locked
+                    cls._instance = super().__new__(cls)
+        return cls._instance
+
+    def __init__(self):
+        """Initialization logic that will only run the first time"""
+        if hasattr(self, "_initialized"):
+            return  # short circuit if we are initialized
+        self._metrics = {}
+        """name: Metric"""
+        self.started = time.monotonic()
+        self._initialized = True
+
+    def _get(self, cls, name, help, labels):
+        """Private: Return the metric called name, registering it if needed"""
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = cls(name, help, labels)
+        if not isinstance(metric, cls):
+            raise TypeError(f"Metric {name} is a {metric.kind}")
+        return metric
+
+    def counter(self, name, help, labels=()):
+        """Get or register a counter
+
+        Args:
+            name (str): Metric name, ending in _total
+            help (str): Description
+            labels (tuple, optional): Label names. Defaults to ().
+
+        Returns:
+            Counter: counter
+        """
+        return self._get(Counter, name, help, labels)
+
+    def gauge(self, name, help, labels=()):
+        """Get or register a gauge, see counter()"""
+        return self._get(Gauge, name, help, labels)
+
+    def summary(self, name, help, labels=()):
+        """Get or register a summary, see counter(). Observations in seconds
+        should use a name ending in _seconds."""
+        return self._get(Summary, name, help, labels)
+
+    def metrics(self):
+        with self._lock:
+            return sorted(self._metrics.values(), key=lambda x: x.name)
+
+    def exposition(self):
+        """Render every metric in the Prometheus text format
+
+        Returns:
+            str: exposition
+        """
+        lines = []
+        for metric in self.metrics():
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            for label_values, value in metric.values():
+                labels = list(zip(metric.label_names, label_values))
+                if metric.kind == "summary":
+                    for q, v in value.quantiles().items():
+                        if v is not None:
+                            lines.append(_sample(
+                                metric.name, labels + [("quantile", q)], v
+                            ))
+                    lines.append(_sample(f"{metric.name}_sum", labels, value.sum))
+                    lines.append(
+                        _sample(f"{metric.name}_count", labels, value.count)
+                    )
+                else:
+                    lines.append(_sample(metric.name, labels, value.value))
+        return "\n".join(lines) + "\n"
+
+
+def _sample(name, labels, value):
+    """Private: Format one sample line"""
+    if labels:
+        label_str = ",".join(f'{k}="{_escape(v)}"' for k, v in labels)
+        name = f"{name}{{{label_str}}}"
+    return f"{name} {float(value)!r}"
+
+
+def _escape(value):
+    """Private: Escape a label value"""
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace(
+        "\n", "\\n"
+    )
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    """Serve the registry at /metrics"""
+
+    def do_GET(self):  # noqa: N802
+        if self.path.split("?")[0] not in ("/", "/metrics"):
+            self.send_error(404)
+            return
+        body = Metrics().exposition().encode()
+        self.send_response(200)
+        self.send_header("Content-Type", CONTENT_TYPE)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        logs.get_logger(__name__).debug(format, *args)
+
+
+class MetricsServer:
+    """Serve the metrics in the Prometheus text format on localhost. Requests
+    are handled one at a time by a Worker."""
+
+    def __init__(self, port, host="127.0.0.1"):
+        """
+        Args:
+            port (int): Port to listen on
+            host (str, optional): Address to bind. Defaults to "127.0.0.1".
+        """
+        self.address = (host, port)
+        self._server = None
+        self._worker = Worker(
+            "metrics_server",
+            self._serve_pass,
+            setup=self._bind,
+            teardown=self._close,
+        )
+
+    def _bind(self):
+        """Private: Worker setup, open the listening socket"""
+        self._server = HTTPServer(self.address, _MetricsHandler)
+        # Return from handle_request regularly so a stop is noticed
+        self._server.timeout = 0.5
+        logs.get_logger(__name__).info(
+            "Serving metrics on http://%s:%s/metrics", *self.address
+        )
+
+    def _serve_pass(self):
+        """Private: Handle at most one request, run by the worker"""
+        self._server.handle_request()
+
+    def _close(self):
+        """Private: Worker teardown"""
+        if self._server is not None:
+            self._server.server_close()
+            self._server = None
+
+    def start(self):
+        self._worker.start()
+
+    def stop(self, timeout=2.0):
+        self._worker.stop(timeout)
+
+
+def serve(settings):
+    """Start the metrics server if metrics.port is set
+
+    Args:
+        settings (Settings): Settings
+
+    Returns:
+        MetricsServer: server, None when disabled
+    """
+    port = settings["metrics.port"] or 0
+    if port <= 0:
+        return None
+    server = MetricsServer(port)
+    server.start()
+    return server
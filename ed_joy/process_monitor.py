@@ -1,122 +1,310 @@
+import asyncio
 import threading
 import time
 
+from ed_joy import logs, tracing
 from ed_joy.emitters import ProcessMonitorEmitter
+from ed_joy.metrics import Metrics
+from ed_joy.settings import DEFAULT_TARGET, Settings
+from ed_joy.supervisor import Worker
+from ed_joy.targets import Target
+from ed_joy.windows import Win32WindowBackend, WindowMatcher, WindowTracker
 
 
-class ProcessMonitor:
-    _instance = None
-    _lock = threading.Lock()  # Ensure that we have thread-safe access
-
-    def __new__(cls):
-        if cls._instance is None:
-            with cls._lock:  # Lock only if we are not initialized
-                if (cls._instance is None):
-                    # Verify that we did not get initialized before we locked
-                    cls._instance = super().__new__(cls)
-        return cls._instance
-
-    def __init__(self):
-        """Initialization logic that will only run the first time"""
-        if hasattr(self, "_initialized"):
-            return  # short circuit if we are initialized
-
-        self._sleep = None
-        """How many times per second should we run."""
-        self.fps = 30
-        """Our targeted FPS, used to determine how often to run"""
-        self._halt_thread = False
-        self._running = False
-        self._initialized = True
-
-        self._emitter = ProcessMonitorEmitter()
-        """Process Monitor Event Emitter"""
-
-    def set_monitor_window_name(self, name:str):
-        # [ ] Add logic to use _lock to update tracked window
-        # Likely need to also implement logic to restart thread
-        pass
-
-    # def __init__(
-    #     self, emitter: ProcessMonitorEmitter, monitor_window_name, *args, **kwargs
-    # ):
-    #     """Initialize our Process Monitor
-    #     Args:
-    #         monitor_window_name (str): The name of the process to monitor for
-    #     """
-    #     super().__init__()
-    #     self.emitter = emitter
-    #     self.monitor_name = monitor_window_name.lower()
-
-    #     self.queue = queue.Queue()
-    #     self._win_list = []
-
-    #     """Internal list of windows"""
-    #     self.is_process_running = False
-    #     self.signals = ProcessMonitorEmitter()
-
-    #     self.running = False
+def route_axes(batch, routes):
+    """Pick the target an axis batch should focus, the route of the last
+    monitored joystick in the batch wins.
 
-    @property
-    def emitter(self):
-        """Get the JoystickEventEmitter
+    Args:
+        batch (array): Flattened (joy_id, axis, value) triples
+        routes (dict): Joystick ID: target name, see SettingsSnapshot.routes
+
+    Returns:
+        str: Target name, None if no joystick in the batch is monitored
+    """
+    target = None
+    for i in range(0, len(batch), 3):
+        target = routes.get(batch[i], target)
+    return target
+
+
+class ProcessMonitorWorker:
+    def __init__(
+        self,
+        emitter: ProcessMonitorEmitter,
+        monitor_window_name=None,
+        window_backend=None,
+        *args,
+        executable=None,
+        pid=None,
+        targets=None,
+        **kwargs,
+    ):
+        """Initialize our Process Monitor
+        Args:
+            monitor_window_name (str): The name of the process to monitor for,
+                                       ignored when passing targets.
+            window_backend (WindowBackend, optional): Windowing system backend.
+                                                      Defaults to Win32.
+            executable (str, optional): Also match windows of processes running
+                                        this executable. Defaults to None.
+            pid (int, optional): Also match windows of this process.
+                                 Defaults to None.
+            targets (list, optional): Target per window to monitor, see
+                                      SettingsSnapshot.targets. Defaults to a
+                                      single target built from the above.
+        """
+        self.emitter = emitter
+        if targets is None:
+            targets = [
+                Target(DEFAULT_TARGET, monitor_window_name, executable, pid)
+            ]
+        self.targets = tuple(targets)
+        """Monitored windows, all tracked in a single pass"""
+        self._target_index = {
+            target.name: i for i, target in enumerate(self.targets)
+        }
+        self.refocus_interval = Settings().snapshot.refocus_interval
+        """Minimum time (s) between two focus operations"""
+
+        self._focus_pending = threading.Event()
+        """Set when at least one focus request is waiting to be handled"""
+        self._focus_target = 0
+        """Index of the target to focus, the latest request wins"""
+        self._last_focus = 0
+        self.focus_stats = dict.fromkeys(
+            ("requested", "coalesced", "skipped", "performed", "unrouted"), 0
+        )
+        """Focus request counters"""
+        self._stats_lock = threading.Lock()
+        """Guards focus_stats, written by the GUI and worker threads"""
+        metrics = Metrics()
+        self._focus_attempts = metrics.counter(
+            "ed_joy_focus_attempts_total", "Focus operations attempted"
+        )
+        self._focus_failures = metrics.counter(
+            "ed_joy_focus_failures_total",
+            "Focus requests that did not leave the monitored window focused",
+            ("reason",),
+        )
+        self._scan_time = metrics.summary(
+            "ed_joy_window_scan_seconds",
+            "Time spent bringing the monitored windows up to date per pass",
+        )
+        self._signals = metrics.counter(
+            "ed_joy_signals_emitted_total", "Qt signals emitted", ("signal",)
+        )
+        self.tracker = WindowTracker(
+            window_backend or Win32WindowBackend(), WindowMatcher(self.targets)
+        )
+        """Tracks the monitored windows"""
+        self.is_process_running = [False] * len(self.targets)
+        """Last reported running state per target"""
+        self._logger = logs.get_logger(__name__)
+        self.signals = ProcessMonitorEmitter()
+
+        self.worker = self._make_worker()
+        """Runs the monitor loop, see start()"""
+
+    def _make_worker(self):
+        """Private: Build the worker running the monitor loop
 
         Returns:
-            JoystickEventEmitter: emitter
+            Worker: worker, not started
+        """
+        return Worker(
+            "process_monitor_worker",
+            self._monitor_pass,
+            setup=self.tracker.start,
+            teardown=self._teardown,
+            wake=self._focus_pending.set,
+        )
+
+    def focus_on_monitor_window(self, target=None):
+        """Request focus on a monitored window. Requests made while one is
+        already pending are coalesced into it.
+
+        Args:
+            target (str, optional): Target name. Defaults to the first target.
+        """
+        self._count("requested")
+        index = 0 if target is None else self._target_index.get(target)
+        if index is None:
+            self._count("unrouted")
+            return
+        self._focus_target = index
+        if self._focus_pending.is_set():
+            self._count("coalesced")
+            return
+        self._focus_pending.set()
+
+    def _count(self, stat):
+        """Private: Increment a focus_stats counter"""
+        with self._stats_lock:
+            self.focus_stats[stat] += 1
+
+    def _handle_focus_request(self):
+        """Private: Handle a pending focus request, waiting out the minimum
+        re-focus interval first so requests made meanwhile are coalesced."""
+        wait = self._focus_delay()
+        if wait > 0:
+            self.worker.wait(wait)
+        self._focus_pending.clear()
+
+        if not self.worker.stopping:
+            # The window may have been replaced while we waited
+            hwnds = self._refresh()
+            self._perform_focus(hwnds[self._focus_target])
+
+    def _focus_delay(self):
+        """Private: Seconds left before the next focus operation is allowed"""
+        return self._last_focus + self.refocus_interval - time.monotonic()
+
+    def _perform_focus(self, hwnd):
+        """Private: Focus the monitored window unless it already is
+
+        Args:
+            hwnd (int): Window handle of the monitored window, None if not found
+        """
+        if hwnd and self.tracker.backend.get_foreground_window() == hwnd:
+            self._count("skipped")
+            return
+
+        self._focus_attempts.inc()
+        if not hwnd:
+            self._focus_failures.labels("not_found").inc()
+            return
+        self._focus_window(hwnd, True)
+        self._count("performed")
+        self._last_focus = time.monotonic()
+        if self.tracker.backend.get_foreground_window() != hwnd:
+            self._focus_failures.labels("not_focused").inc()
+
+    def _focus_window(self, hwnd, force=False):
+        """Private: Set focused window to hwnd. Gracefully continue if it fails.
+
+        Args:
+            hwnd (hwnd): Window Handle
+            force (bool, optional): Force focus. Defaults to False.
         """
-        return self._emitter
+        with tracing.span("focus", "process_monitor"):
+            self.tracker.backend.focus_window(hwnd, force)
+
+    def _update_proc_running_state(self, hwnds):
+        # is_process_running - Flag per target indicating last signal
+        # if flag and is_running are different, update the flag and call the signal
+        for index, hwnd in enumerate(hwnds):
+            is_running = hwnd is not None
+            if self.is_process_running[index] == is_running:
+                continue
+            self.is_process_running[index] = is_running
+            name = self.targets[index].name
+            self._logger.info("%s is running: %s", name, is_running)
+            with tracing.span("process_running", "emit"):
+                self.emitter.process_running.emit(name, is_running)
+            self._signals.labels("process_running").inc()
 
     @property
-    def fps(self):
-        """Return the current FPS.
+    def running(self):
+        return self.worker.is_alive() and not self.worker.stopping
+
+    def _refresh(self):
+        """Private: Bring the tracked windows and the running states up to date
 
         Returns:
-            int: Current FPS
+            tuple: Window handle per target, None if not found
         """
-        return self._fps
+        started = time.perf_counter()
+        hwnds = self.tracker.refresh()
+        ended = time.perf_counter()
+        self._scan_time.observe(ended - started)
+        tracing.complete("window_scan", "process_monitor", started, ended)
+        self._update_proc_running_state(hwnds)
+        return hwnds
+
+    def _monitor_pass(self):
+        """Private: One pass of the monitor loop, run by the worker. Window
+        notifications are delivered to the subscribing (worker) thread."""
+        self._refresh()
 
-    @fps.setter
-    def fps(self, fps):
-        if not isinstance(fps, (int, float)):
-            raise TypeError("fps parameter must be an int or float")
-        if fps <= 0 or fps >= 60:
-            raise ValueError("fps must be >0 and <=60")
+        # Rescan the windows every 500ms unless focus is requested
+        if self._focus_pending.wait(timeout=0.5):
+            self._handle_focus_request()
 
-        with self._lock:
-            self._fps = fps
-            self._sleep = 1 / self.fps * 1000
+    def _teardown(self):
+        """Private: Worker teardown"""
+        self.tracker.stop()
+        self._logger.debug("Focus stats: %s", self.focus_stats)
+        self._logger.debug("Window tracker stats: %s", self.tracker.stats)
 
     def start(self):
-        """Start the thread to monitor input.
-        If already started, do nothing"""
-        if hasattr(self,'_thread') and self._thread is not None:
-            # Only run if we do not have an existing thread
-            return
+        """Start running the process monitor worker. If already running, do
+        nothing"""
+        self.worker.start()
 
-        self._thread = threading.Thread(
-            target=self.__monitor_thread, args=(), daemon=True
-        )
-        self._thread.start()
+    def stop(self, timeout=2.0):
+        """Stop the process monitor worker and wait for it to finish
 
-    def stop(self):
-        if not hasattr(self,'_thread') or self._thread is None:
-            # Only run if we do have an existing thread
-            return
-        with self._lock:
-            self._halt_thread = True
-
-    def __monitor_thread(self):
-        while True:
-            try:
-                # [ ] add logic for our monitor loop
-
-                with self._lock:
-                    if self._halt_thread:
-                        # Gracefully clean up our thread
-                        self._thread = None
-                        self.halt_thread = False
-                        return
-            except Exception as e:
-                print(e)
-
-            time.sleep(self.fps)
+        Args:
+            timeout (float, optional): Seconds to wait. Defaults to 2.0.
+        """
+        self.worker.stop(timeout)
+
+
+class AsyncProcessMonitor(ProcessMonitorWorker):
+    """ProcessMonitorWorker running as an asyncio task on the calling thread's
+    event loop instead of on a worker thread, see ed_joy.aio"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._wakeup = asyncio.Event()
+        """Set with _focus_pending, awaited by the task"""
+        self._task = None
+
+    def _make_worker(self):
+        """Private: The monitor loop runs as a task, see start()"""
+        return None
+
+    @property
+    def running(self):
+        return self._task is not None and not self._task.done()
+
+    def focus_on_monitor_window(self, target=None):
+        super().focus_on_monitor_window(target)
+        if self._focus_pending.is_set():
+            self._wakeup.set()
+
+    async def _run(self):
+        """Private: Monitor loop, window notifications are delivered to the
+        event loop thread"""
+        self.tracker.start()
+        try:
+            while True:
+                self._refresh()
+
+                # Rescan the windows every 500ms unless focus is requested
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), 0.5)
+                except TimeoutError:
+                    continue
+                wait = self._focus_delay()
+                if wait > 0:
+                    await asyncio.sleep(wait)
+                self._wakeup.clear()
+                self._focus_pending.clear()
+                # The window may have been replaced while we waited
+                hwnds = self._refresh()
+                self._perform_focus(hwnds[self._focus_target])
+        finally:
+            self._teardown()
+
+    def start(self):
+        """Start the monitor task. If already running, do nothing"""
+        if not self.running:
+            self._task = asyncio.ensure_future(self._run())
+
+    def stop(self, timeout=None):
+        """Cancel the monitor task, it finishes on the next event loop pass"""
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
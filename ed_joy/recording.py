@@ -0,0 +1,191 @@
+import struct
+import time
+from pathlib import Path
+
+from ed_joy.inputs import (
+    JOYAXISMOTION,
+    JOYBUTTONDOWN,
+    JOYBUTTONUP,
+    JOYHATMOTION,
+    InputEvent,
+)
+
+MAGIC = b"EDJR"
+VERSION = 1
+HEADER = struct.Struct("<4sH")
+"""Magic, format version. Written once at the start of a file"""
+RECORD = struct.Struct("<dBBHhh")
+"""Timestamp (epoch seconds), kind, joystick ID, axis/button/hat, value, value"""
+
+AXIS, BUTTON_DOWN, BUTTON_UP, HAT, SESSION = 0, 1, 2, 3, 255
+"""Record kinds. SESSION marks the start of a recording session"""
+AXIS_SCALE = 32767
+"""Axis values are stored at SDL's native 16 bit resolution"""
+
+
+class InputRecorder:
+    """Append raw joystick events to a compact binary file, 16 bytes per event.
+    Each session starts with a SESSION record so several sessions can share a
+    file."""
+
+    def __init__(self, path):
+        """
+        Args:
+            path (Path): File to append to, created if missing
+        """
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = self.path.open("ab")
+        if self._file.tell() == 0:
+            self._file.write(HEADER.pack(MAGIC, VERSION))
+        self._file.write(RECORD.pack(time.time(), SESSION, 0, 0, 0, 0))
+        self.count = 0
+        """Number of events recorded"""
+
+    def record(self, event, ts):
+        """Record a joystick event, other events are ignored
+
+        Args:
+            event (pg.event.Event): pygame event or InputEvent
+            ts (float): Timestamp the event was read
+        """
+        if event.type == JOYAXISMOTION:
+            value = round(max(-1.0, min(1.0, event.value)) * AXIS_SCALE)
+            rec = RECORD.pack(ts, AXIS, event.joy, event.axis, value, 0)
+        elif event.type == JOYBUTTONDOWN:
+            rec = RECORD.pack(ts, BUTTON_DOWN, event.joy, event.button, 0, 0)
+        elif event.type == JOYBUTTONUP:
+            rec = RECORD.pack(ts, BUTTON_UP, event.joy, event.button, 0, 0)
+        elif event.type == JOYHATMOTION:
+            x, y = event.value
+            rec = RECORD.pack(ts, HAT, event.joy, event.hat, x, y)
+        else:
+            return
+        # Buffered by the file object, flushed on close
+        self._file.write(rec)
+        self.count += 1
+
+    def close(self):
+        if not self._file.closed:
+            self._file.close()
+
+
+def read_records(path):
+    """Read every record from a recording
+
+    Args:
+        path (Path): Recording file
+
+    Raises:
+        ValueError: The file is not a recording or has an unknown version
+
+    Yields:
+        tuple: timestamp, kind, joystick ID, index, value, value
+    """
+    with Path(path).open("rb") as file:
+        header = file.read(HEADER.size)
+        if len(header) < HEADER.size:
+            raise ValueError(f"{path} is not a version {VERSION} recording")
+        magic, version = HEADER.unpack(header)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{path} is not a version {VERSION} recording")
+        while chunk := file.read(RECORD.size * 1024):
+            # Ignore a partially written trailing record
+            usable = len(chunk) - len(chunk) % RECORD.size
+            yield from RECORD.iter_unpack(chunk[:usable])
+
+
+def to_event(kind, joy_id, index, v0, v1):
+    """Convert a record back into the event it was made from
+
+    Returns:
+        InputEvent: event, None for SESSION records
+    """
+    if kind == AXIS:
+        return InputEvent(
+            JOYAXISMOTION,
+            joy=joy_id,
+            instance_id=joy_id,
+            axis=index,
+            value=v0 / AXIS_SCALE,
+        )
+    if kind == BUTTON_DOWN:
+        return InputEvent(JOYBUTTONDOWN, joy=joy_id, instance_id=joy_id, button=index)
+    if kind == BUTTON_UP:
+        return InputEvent(JOYBUTTONUP, joy=joy_id, instance_id=joy_id, button=index)
+    if kind == HAT:
+        return InputEvent(
+            JOYHATMOTION, joy=joy_id, instance_id=joy_id, hat=index, value=(v0, v1)
+        )
+    return None
+
+
+class ReplaySource:
+    """Feed a recording to Joysticks in place of the SDL event queue, either at
+    the original timing or as fast as possible."""
+
+    def __init__(self, path, realtime=True, batch=256, idle=0.25):
+        """
+        Args:
+            path (Path): Recording file
+            realtime (bool, optional): Keep the original timing. Defaults to True.
+            batch (int, optional): Max events per call when not realtime.
+                                   Defaults to 256.
+            idle (float, optional): Seconds to sleep per call once finished.
+                                    Defaults to 0.25.
+        """
+        self.realtime = realtime
+        self._batch = batch
+        self._idle = idle
+        self._records = read_records(path)
+        self._next = None
+        self._offset = None
+        """Difference between the replay clock and the recorded timestamps"""
+        self.finished = False
+        self.count = 0
+        """Number of events replayed"""
+
+    def _peek(self):
+        """Private: Return the next record, handling SESSION records"""
+        while self._next is None:
+            record = next(self._records, None)
+            if record is None:
+                self.finished = True
+                return None
+            if record[1] == SESSION:
+                # Skip the gap between sessions
+                self._offset = None
+                continue
+            self._next = record
+        return self._next
+
+    def wait_for_events(self):
+        """Return the next events that are due, sleeping until they are when
+        replaying in realtime
+
+        Returns:
+            list: InputEvents
+        """
+        events = []
+        while len(events) < self._batch:
+            record = self._peek()
+            if record is None:
+                break
+            if self.realtime:
+                now = time.perf_counter()
+                if self._offset is None:
+                    self._offset = now - record[0]
+                due = record[0] + self._offset
+                if due > now:
+                    # Cap the sleep so Joysticks can still check for a halt
+                    if not events:
+                        time.sleep(min(due - now, self._idle))
+                    if due > time.perf_counter():
+                        break
+            self._next = None
+            events.append(to_event(*record[1:]))
+
+        if not events and self.finished:
+            time.sleep(self._idle)
+        self.count += len(events)
+        return events
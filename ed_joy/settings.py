@@ -1,8 +1,180 @@
+import copy
+import os
+import threading
+import time
 from pathlib import Path
 
 import toml
 
 from ed_joy import resource_path
+from ed_joy.targets import Target
+
+DEFAULT_TARGET = "default"
+"""Name of the target built from monitor.process, see SettingsSnapshot.targets"""
+
+DEFAULTS = {
+    "logging.level": "DEBUG",
+    # Joystick loop mode, "event" (block until input) or "fps" (fixed rate)
+    "joysticks.mode": "event",
+    # Input backend, "pygame" (SDL) or "evdev" (Linux /dev/input devices)
+    "joysticks.backend": "pygame",
+    # Read SDL on the joystick "thread" or in its own "process"
+    "joysticks.capture": "thread",
+    # How long (ms) the event loop may block before checking for a halt
+    "joysticks.idle_timeout": 250,
+    # Record the raw joystick events to this file, empty to disable
+    "joysticks.record": "",
+    # Axis filter, values are in quantised units (-100..100)
+    "joysticks.filter.deadzone": 0,
+    # Off by default, a single unit change is a genuine movement
+    "joysticks.filter.hysteresis": 0,
+    # Per device ("0") or per axis ("0:2") deadzone/hysteresis overrides
+    "joysticks.filter.overrides": {},
+    # Start the launcher.apps when the launcher.target window is found
+    "launcher.enabled": False,
+    "launcher.target": DEFAULT_TARGET,
+    # Stop the apps when the target closes, they are always stopped on exit
+    "launcher.terminate": True,
+    # How long (s) an app gets to exit before it is killed
+    "launcher.stop_timeout": 5.0,
+    # Apps to start, [{name, command, cwd, ready_window, ready_port, ...}]
+    "launcher.apps": [],
+    # Serve the runtime metrics on this localhost port, 0 to disable
+    "metrics.port": 0,
+    "monitor.joysticks": [],
+    "monitor.process.enabled": False,
+    # Populate the default Elite Dangerous Client title
+    "monitor.process.title": "Elite - Dangerous (CLIENT)",
+    # Executable of the monitored process, matched as well as the title
+    "monitor.process.executable": "EliteDangerous64.exe",
+    # Additional windows to monitor, name: {title, executable, display_name}
+    "monitor.targets": {},
+    # Joystick ID: target name, monitored joysticks default to monitor.process
+    "monitor.routes": {},
+    # Minimum time (ms) between two focus operations on the monitored window
+    "monitor.process.refocus_interval": 250,
+    # Populate the default display name (only used when reporting status)
+    "monitor.process.display_name": "Elite Dangerous",
+}
+"""Default value per setting, see Settings.get_defaults"""
+
+SETTINGS_VERSION = 1
+"""Version of the saved settings, see MIGRATIONS"""
+
+MIGRATIONS = {
+    # The hysteresis default went from 1 to 0, but saved files kept the 1
+    1: {"joysticks.filter.hysteresis": (1, 0)},
+}
+"""Settings version: {key: (old default, new default)}. Applied once to files
+saved before that version, a value other than the old default is kept."""
+
+
+class SettingsSnapshot:
+    """Immutable, typed copy of the settings used on hot paths. Rebuilt by
+    Settings whenever a setting changes."""
+
+    __slots__ = (
+        "logging_level",
+        "joysticks_mode",
+        "joysticks_idle_timeout",
+        "monitored_joysticks",
+        "monitored_mask",
+        "process_enabled",
+        "process_title",
+        "process_executable",
+        "process_display_name",
+        "refocus_interval",
+        "targets",
+        "routes",
+    )
+
+    def __init__(self, settings):
+        """
+        Args:
+            settings (Settings): Settings to copy
+        """
+        set_ = object.__setattr__
+        monitored = frozenset(int(x) for x in settings.get("monitor.joysticks", []))
+        set_(self, "logging_level", str(settings.get("logging.level", "DEBUG")))
+        set_(self, "joysticks_mode", str(settings.get("joysticks.mode", "event")))
+        set_(self, "joysticks_idle_timeout", int(
+            settings.get("joysticks.idle_timeout", 250)
+        ))
+        set_(self, "monitored_joysticks", monitored)
+        """frozenset of monitored joystick IDs"""
+        set_(self, "monitored_mask", sum(1 << x for x in monitored))
+        """Bitmask of monitored joystick IDs"""
+        set_(self, "process_enabled", bool(
+            settings.get("monitor.process.enabled", False)
+        ))
+        set_(self, "process_title", str(settings.get("monitor.process.title", "")))
+        set_(self, "process_executable", str(
+            settings.get("monitor.process.executable", "")
+        ))
+        set_(self, "process_display_name", str(
+            settings.get("monitor.process.display_name", "")
+        ))
+        set_(self, "refocus_interval", (
+            settings.get("monitor.process.refocus_interval", 0) / 1000
+        ))
+        """Minimum time (s) between two focus operations"""
+        targets = [Target(
+            DEFAULT_TARGET,
+            self.process_title,
+            self.process_executable,
+            display_name=self.process_display_name,
+        )]
+        for name, target in settings.get("monitor.targets", {}).items():
+            if name != DEFAULT_TARGET:
+                targets.append(Target(
+                    name,
+                    target.get("title"),
+                    target.get("executable"),
+                    display_name=target.get("display_name"),
+                ))
+        set_(self, "targets", tuple(targets))
+        """Target per monitored window, the monitor.process one first"""
+        names = {target.name for target in targets}
+        routes = dict.fromkeys(monitored, DEFAULT_TARGET)
+        for joy_id, name in settings.get("monitor.routes", {}).items():
+            try:
+                joy_id = int(joy_id)
+            except ValueError:
+                from ed_joy.logs import get_logger
+
+                get_logger(__name__).warning(
+                    "Ignoring monitor.routes entry %r, not a joystick ID", joy_id
+                )
+                continue
+            if joy_id in routes and name in names:
+                routes[joy_id] = name
+        set_(self, "routes", routes)
+        """Monitored joystick ID: name of the target it focuses"""
+
+    def __setattr__(self, name, value):
+        raise AttributeError("SettingsSnapshot is read-only")
+
+    def route(self, joy_id):
+        """Get the target a joystick focuses
+
+        Args:
+            joy_id (int): Joystick ID
+
+        Returns:
+            str: Target name, None if the joystick is not monitored
+        """
+        return self.routes.get(joy_id)
+
+    def is_monitored(self, joy_id):
+        """Check if a joystick is monitored
+
+        Args:
+            joy_id (int): Joystick ID
+
+        Returns:
+            bool: True if monitored
+        """
+        return bool(self.monitored_mask >> joy_id & 1)
 
 
 class Settings:
@@ -18,10 +190,58 @@ class Settings:
     def __init__(self):
         if not hasattr(self, "initialized"):  # Ensure that we only init once
             self.initialized = True
+            self.save_delay = 0.5
+            """How long (s) changes are batched before being written"""
+            self.changes = 0
+            """Number of changes made"""
+            self.writes = 0
+            """Number of times the settings were written to disk"""
+            self._lock = threading.Lock()
+            """Guards _settings against the writer thread"""
+            self._save_lock = threading.Lock()
+            """Ensure only one write happens at a time"""
+            self._saved = 0
+            """Value of changes included in the last write"""
+            self._dirty = threading.Event()
+            """Wakes the writer thread, set after every change"""
+            self._flush_lock = threading.Lock()
+            """Makes checking for changes and writing one step, see flush"""
+            self._writer_stopped = False
+            self._observers = []
+            """Called with the new SettingsSnapshot after every change"""
+            self._snapshot = None
+            self._writer = threading.Thread(
+                target=self.__writer_thread, args=(), daemon=True
+            )
+            self._writer.start()
             self.load_settings()
+            self.migrate()
             self.get_defaults()
             if not hasattr(self, "_settings"):
                 self._settings = {}
+            self._snapshot = SettingsSnapshot(self)
+
+    @property
+    def snapshot(self):
+        """Return the typed settings snapshot, plain attribute reads for hot paths
+
+        Returns:
+            SettingsSnapshot: snapshot
+        """
+        return self._snapshot
+
+    def subscribe(self, callback):
+        """Call callback(snapshot) every time a setting changes, on the thread
+        that made the change.
+
+        Args:
+            callback (callable): Called with the new SettingsSnapshot
+        """
+        self._observers.append(callback)
+
+    def unsubscribe(self, callback):
+        if callback in self._observers:
+            self._observers.remove(callback)
 
     @property
     def _config_path(self):
@@ -59,28 +279,88 @@ class Settings:
                                         Defaults to False.
         """
 
-        if self["logging.level"] is None or overwrite:
-            self["logging.level"] = "DEBUG"
+        for key, value in DEFAULTS.items():
+            if self[key] is None or overwrite:
+                # Mutable defaults are copied so the table is never modified
+                self[key] = copy.deepcopy(value)
+
+    def migrate(self):
+        """Replace the old defaults saved by earlier versions, see MIGRATIONS"""
+        version = self["settings.version"] or 0
+        for to_version, changes in MIGRATIONS.items():
+            if version >= to_version:
+                continue
+            for key, (old, new) in changes.items():
+                if self[key] == old:
+                    self[key] = new
+        if version != SETTINGS_VERSION:
+            self["settings.version"] = SETTINGS_VERSION
+
+    @property
+    def writes_saved(self):
+        """Number of writes avoided by batching changes
+
+        Returns:
+            int: changes made minus writes performed
+        """
+        return max(self.changes - self.writes, 0)
 
-        if self["monitor.joysticks"] is None or overwrite:
-            self["monitor.joysticks"] = []
+    def save_settings(self):
+        """Write settings to the TOML file. The file is written to a temporary
+        file first then renamed, so it is never left half written."""
+        with self._save_lock:
+            # Taken under the save lock, so an older copy never replaces a newer
+            with self._lock:
+                data = toml.dumps(self._settings)
+                changes = self.changes
+            pth = Path(self._config_path)
+            tmp = pth.with_name(pth.name + ".tmp")
+            with tmp.open("w") as file:
+                file.write(data)
+                file.flush()
+                os.fsync(file.fileno())
+            os.replace(tmp, pth)
+            self.writes += 1
+            self._saved = changes
 
-        if self["monitor.process.enabled"] is None or overwrite:
-            self["monitor.process.enabled"] = False
+    def flush(self):
+        """Write any pending changes now. Waits for a write already in progress,
+        so the changes are on disk when this returns."""
+        with self._flush_lock:
+            # Cleared first, a change made from here on sets it again
+            self._dirty.clear()
+            if self.changes != self._saved:
+                self.save_settings()
 
-        # # Populate the default Elite Dangerous Client title
-        if self["monitor.process.title"] is None or overwrite:
-            self["monitor.process.title"] = "Elite - Dangerous (CLIENT)"
+    def close(self):
+        """Stop the writer thread and write any pending changes, call before
+        shutting down"""
+        self.stop_writer()
+        self.flush()
 
-        # # Populate the default display name (only used when reporting status)
-        if self["monitor.process.display_name"] is None or overwrite:
-            self["monitor.process.display_name"] = "Elite Dangerous"
+    def stop_writer(self):
+        """Stop the background writer thread, changes are then only written by
+        flush(). Used when persistence is scheduled elsewhere, see ed_joy.aio"""
+        self._writer_stopped = True
+        self._dirty.set()  # Wake the writer so it can exit
+        self._writer.join(timeout=1)
 
+    def __writer_thread(self):
+        while True:
+            self._dirty.wait()
+            if self._writer_stopped:
+                return
+            # Keep collecting changes for a short while before writing
+            time.sleep(self.save_delay)
+            try:
+                self.flush()
+            except Exception:
+                # logs imports settings, so it is only imported when needed
+                from ed_joy.logs import get_logger
 
-    def save_settings(self):
-        """Write settings to the TOML file."""
-        with Path(self._config_path).open("w") as file:
-            toml.dump(self._settings, file)
+                get_logger(__name__).exception(
+                    "Exception occurred while saving settings."
+                )
 
     def get(self, dotted_key, default=None):
         """Retrieve setting by key."""
@@ -94,14 +374,22 @@ class Settings:
         return value
 
     def set(self, dotted_key, value):
+        """Update setting by key. Written to disk in the background, see flush."""
         keys = dotted_key.split(".")
-        d = self._settings
-        for key in keys[:-1]:
-            if key not in d or not isinstance(d[key], dict):
-                d[key] = {}
-            d = d[key]
-        d[keys[-1]] = value
-        self.save_settings()
+        with self._lock:
+            d = self._settings
+            for key in keys[:-1]:
+                if key not in d or not isinstance(d[key], dict):
+                    d[key] = {}
+                d = d[key]
+            d[keys[-1]] = value
+            self.changes += 1
+        self._dirty.set()
+        if self._snapshot is not None:
+            # Defaults are still being populated while _snapshot is None
+            self._snapshot = SettingsSnapshot(self)
+            for callback in list(self._observers):
+                callback(self._snapshot)
 
     def __getitem__(self, key):
         return self.get(key)
@@ -0,0 +1,136 @@
+"""Startup profiling, enabled with --startup-profile. Records the time spent
+importing each module and the time it takes to show the first window, or in
+headless mode to start the background loops."""
+import importlib.abc
+import sys
+import threading
+import time
+
+_profiler = None
+
+
+class _TimingLoader(importlib.abc.Loader):
+    """Wrap a loader, timing how long executing the module takes"""
+
+    def __init__(self, loader, profiler):
+        self._loader = loader
+        self._profiler = profiler
+
+    def create_module(self, spec):
+        return self._loader.create_module(spec)
+
+    def exec_module(self, module):
+        stack = self._profiler.stack()
+        stack.append(0.0)
+        start = time.perf_counter()
+        try:
+            self._loader.exec_module(module)
+        finally:
+            total = time.perf_counter() - start
+            nested = stack.pop()
+            self._profiler.modules[module.__name__] = (total, total - nested)
+            if stack:
+                stack[-1] += total
+
+    def __getattr__(self, name):
+        # Pass through anything else (get_resource_reader, is_package, ...)
+        return getattr(self._loader, name)
+
+
+class _TimingFinder(importlib.abc.MetaPathFinder):
+    """Find modules with the remaining finders and wrap their loaders"""
+
+    def __init__(self, profiler):
+        self._profiler = profiler
+        self._local = threading.local()
+
+    def find_spec(self, name, path, target=None):
+        if getattr(self._local, "busy", False):
+            return None
+        self._local.busy = True
+        try:
+            for finder in sys.meta_path:
+                if finder is self or not hasattr(finder, "find_spec"):
+                    continue
+                spec = finder.find_spec(name, path, target)
+                if spec is not None:
+                    if spec.loader is not None and hasattr(
+                        spec.loader, "exec_module"
+                    ):
+                        spec.loader = _TimingLoader(spec.loader, self._profiler)
+                    return spec
+            return None
+        finally:
+            self._local.busy = False
+
+
+class StartupProfiler:
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.modules = {}
+        """module: (cumulative seconds, self seconds)"""
+        self.first_window = None
+        """Seconds from enable() to the end of startup, see ready()"""
+        self.milestone = "first window"
+        """What marked the end of startup"""
+        self._local = threading.local()
+        self._finder = _TimingFinder(self)
+
+    def stack(self):
+        """Return the import stack of the calling thread"""
+        if not hasattr(self._local, "stack"):
+            self._local.stack = []
+        return self._local.stack
+
+    def install(self):
+        sys.meta_path.insert(0, self._finder)
+
+    def uninstall(self):
+        if self._finder in sys.meta_path:
+            sys.meta_path.remove(self._finder)
+
+    def report(self, top=25):
+        """Print the slowest imports and the time to the end of startup
+
+        Args:
+            top (int, optional): Number of modules to list. Defaults to 25.
+        """
+        print(f"{'self ms':>9} {'cumul ms':>9}  module")
+        ranked = sorted(self.modules.items(), key=lambda x: x[1][1], reverse=True)
+        for name, (total, own) in ranked[:top]:
+            print(f"{own * 1000:9.1f} {total * 1000:9.1f}  {name}")
+        own_total = sum(own for _total, own in self.modules.values())
+        print(f"{len(self.modules)} modules imported in {own_total * 1000:.1f} ms")
+        if self.first_window is not None:
+            print(f"Time to {self.milestone}: {self.first_window * 1000:.1f} ms")
+
+
+def enable():
+    """Start profiling imports, call as early as possible"""
+    global _profiler
+    if _profiler is None:
+        _profiler = StartupProfiler()
+        _profiler.install()
+
+
+def is_enabled():
+    return _profiler is not None
+
+
+def ready(milestone):
+    """Record the time to the end of startup and print the report
+
+    Args:
+        milestone (str): What marks the end of startup, shown in the report
+    """
+    if _profiler is None or _profiler.first_window is not None:
+        return
+    _profiler.first_window = time.perf_counter() - _profiler.started
+    _profiler.milestone = milestone
+    _profiler.uninstall()
+    _profiler.report()
+
+
+def first_window_shown():
+    """Record the time to first window and print the report"""
+    ready("first window")
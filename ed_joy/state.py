@@ -0,0 +1,133 @@
+from array import array
+
+
+class DeviceState:
+    """State of a single joystick. Axes are floats between -1 and 1, buttons are
+    a bitset (bit n set when button n is pressed) and hats are (x, y) tuples."""
+
+    __slots__ = ("axes", "buttons", "hats")
+
+    def __init__(self, num_axes=0, num_hats=0):
+        self.axes = array("f", bytes(4 * num_axes))
+        self.buttons = 0
+        self.hats = [(0, 0)] * num_hats
+
+    def copy(self):
+        """Return a copy that does not share any buffers with this state"""
+        ret = DeviceState()
+        ret.axes = array("f", self.axes)
+        ret.buttons = self.buttons
+        ret.hats = list(self.hats)
+        return ret
+
+    def is_pressed(self, button):
+        """Check if a button is pressed
+
+        Args:
+            button (int): Button ID
+
+        Returns:
+            bool: Button state
+        """
+        return bool(self.buttons >> button & 1)
+
+
+class StateSnapshot:
+    """Published, read-only view of every device. Never modified once published."""
+
+    __slots__ = ("seq", "timestamp", "devices")
+
+    def __init__(self, seq, timestamp, devices):
+        self.seq = seq
+        """Increases every time a new snapshot is published"""
+        self.timestamp = timestamp
+        """Timestamp of the events included in this snapshot"""
+        self.devices = devices
+        """joy_id: DeviceState"""
+
+
+class StateTable:
+    """Device state table, written by a single thread and read by any number of
+    threads. The writer updates a working copy and publish() swaps in a fresh
+    snapshot, so readers never need a lock and never see a partial update.
+    """
+
+    def __init__(self):
+        self._working = {}
+        """joy_id: DeviceState, only touched by the writer"""
+        self._dirty = set()
+        """joy_ids changed since the last publish"""
+        self._published = StateSnapshot(0, 0, {})
+
+    def add_device(self, joy_id, num_axes, num_hats):
+        """Add or reset a device
+
+        Args:
+            joy_id (int): Joystick ID
+            num_axes (int): Number of axes
+            num_hats (int): Number of hats
+        """
+        self._working[joy_id] = DeviceState(num_axes, num_hats)
+        self._dirty.add(joy_id)
+
+    def remove_device(self, joy_id):
+        if self._working.pop(joy_id, None) is not None:
+            self._dirty.add(joy_id)
+
+    def _device(self, joy_id):
+        """Private: Return the working state, marking it as changed"""
+        self._dirty.add(joy_id)
+        if joy_id not in self._working:
+            self._working[joy_id] = DeviceState()
+        return self._working[joy_id]
+
+    def set_axis(self, joy_id, axis, value):
+        device = self._device(joy_id)
+        if axis >= len(device.axes):
+            device.axes.extend([0.0] * (axis + 1 - len(device.axes)))
+        device.axes[axis] = value
+
+    def set_button(self, joy_id, button, pressed):
+        device = self._device(joy_id)
+        if pressed:
+            device.buttons |= 1 << button
+        else:
+            device.buttons &= ~(1 << button)
+
+    def set_hat(self, joy_id, hat, value):
+        device = self._device(joy_id)
+        if hat >= len(device.hats):
+            device.hats.extend([(0, 0)] * (hat + 1 - len(device.hats)))
+        device.hats[hat] = tuple(value)
+
+    def publish(self, timestamp):
+        """Publish the changes made since the last call. Only the devices that
+        changed are copied, the others are shared with the previous snapshot.
+
+        Args:
+            timestamp (float): Timestamp of the events included
+
+        Returns:
+            bool: True if a new snapshot was published
+        """
+        if not self._dirty:
+            return False
+        previous = self._published
+        devices = dict(previous.devices)
+        for joy_id in self._dirty:
+            if joy_id in self._working:
+                devices[joy_id] = self._working[joy_id].copy()
+            else:
+                devices.pop(joy_id, None)
+        self._dirty.clear()
+        # A single reference assignment, atomic for readers
+        self._published = StateSnapshot(previous.seq + 1, timestamp, devices)
+        return True
+
+    def snapshot(self):
+        """Return the latest published snapshot, safe to call from any thread
+
+        Returns:
+            StateSnapshot: snapshot
+        """
+        return self._published
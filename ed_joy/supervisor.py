@@ -0,0 +1,255 @@
+"""Background worker lifecycle. Every background loop runs as a Worker, which
+owns its thread, stops promptly through an Event, joins with a timeout,
+restarts its loop after a crash and keeps health data."""
+import threading
+import time
+
+from ed_joy import logs
+
+
+class Worker:
+    """Run step() on a thread of its own until stopped. An exception escaping
+    step() counts as a crash, the worker tears down, backs off and sets up again
+    unless restart is disabled."""
+
+    def __init__(
+        self,
+        name,
+        step,
+        setup=None,
+        teardown=None,
+        wake=None,
+        restart=True,
+        backoff=0.5,
+        max_backoff=5.0,
+    ):
+        """
+        Args:
+            name (str): Worker name, used for the thread and health data
+            step (callable): One loop iteration. Should block with wait() or
+                             for at most a short while.
+            setup (callable, optional): Run on the worker thread before the
+                                        first step and after every crash.
+            teardown (callable, optional): Run on the worker thread when
+                                           stopping and after every crash.
+            wake (callable, optional): Called by stop() to interrupt a step
+                                       blocked on something other than wait().
+            restart (bool, optional): Restart after a crash. Defaults to True.
+            backoff (float, optional): Seconds to wait before the first restart,
+                                       doubled on every crash in a row.
+                                       Defaults to 0.5.
+            max_backoff (float, optional): Longest wait before a restart.
+                                           Defaults to 5.0.
+        """
+        self.name = name
+        self._step = step
+        self._setup = setup
+        self._teardown = teardown
+        self._wake = wake
+        self.restart_on_crash = restart
+        self._backoff = backoff
+        self._max_backoff = max_backoff
+        self._stop = threading.Event()
+        self._thread = None
+        self._logger = logs.get_logger(__name__)
+
+        self.iterations = 0
+        self.crashes = 0
+        self.last_error = None
+        """repr of the exception of the last crash"""
+        self.last_iteration = None
+        """time.monotonic() of the end of the last iteration"""
+        self._interval = None
+        """Smoothed seconds per iteration"""
+
+    @property
+    def stopping(self):
+        return self._stop.is_set()
+
+    def is_alive(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def wait(self, timeout):
+        """Sleep for timeout seconds, returning early when the worker is stopped
+
+        Args:
+            timeout (float): Seconds
+
+        Returns:
+            bool: True if the worker is stopping
+        """
+        return self._stop.wait(timeout)
+
+    def start(self):
+        """Start the worker thread. If already running, do nothing"""
+        if self.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+        Supervisor().add(self)
+        self._thread.start()
+
+    def request_stop(self):
+        """Ask the worker to stop without waiting for it"""
+        self._stop.set()
+        if self._wake is not None:
+            self._wake()
+
+    def stop(self, timeout=2.0):
+        """Stop the worker and wait for its thread to finish
+
+        Args:
+            timeout (float, optional): Seconds to wait for the thread.
+                                       Defaults to 2.0.
+
+        Returns:
+            bool: True if the thread finished in time
+        """
+        self.request_stop()
+        thread = self._thread
+        if thread is None or thread is threading.current_thread():
+            return True
+        thread.join(timeout)
+        if thread.is_alive():
+            self._logger.warning(f"Worker {self.name} did not stop in {timeout}s")
+            return False
+        return True
+
+    def restart(self, timeout=2.0):
+        """Stop the worker then start it again
+
+        Args:
+            timeout (float, optional): Seconds to wait for the thread to stop.
+                                       Defaults to 2.0.
+
+        Returns:
+            bool: True if the worker was restarted, False if its thread did
+                  not stop in time and is left stopping
+        """
+        if not self.stop(timeout):
+            self._logger.error(f"Worker {self.name} not restarted, still running")
+            return False
+        self.start()
+        return True
+
+    def health(self):
+        """Return the worker health data
+
+        Returns:
+            dict: alive, iterations, loop rate (Hz), seconds since the last
+                  iteration, crashes and the last error
+        """
+        last = self.last_iteration
+        return {
+            "alive": self.is_alive(),
+            "iterations": self.iterations,
+            "loop_rate": 1 / self._interval if self._interval else 0.0,
+            "since_last_iteration": None if last is None else time.monotonic() - last,
+            "crashes": self.crashes,
+            "last_error": self.last_error,
+        }
+
+    def _run(self):
+        """Private: Worker thread"""
+        backoff = self._backoff
+        while not self._stop.is_set():
+            try:
+                if self._setup is not None:
+                    self._setup()
+                while not self._stop.is_set():
+                    self._step()
+                    now = time.monotonic()
+                    if self.last_iteration is not None:
+                        dt = now - self.last_iteration
+                        self._interval = (
+                            dt if self._interval is None
+                            else self._interval * 0.9 + dt * 0.1
+                        )
+                    self.last_iteration = now
+                    self.iterations += 1
+                    backoff = self._backoff
+            except Exception as e:
+                self.crashes += 1
+                self.last_error = repr(e)
+                self._logger.exception(f"Worker {self.name} crashed")
+                if not self.restart_on_crash:
+                    self._stop.set()
+            finally:
+                self._run_teardown()
+            if self.wait(backoff):
+                break
+            backoff = min(backoff * 2, self._max_backoff)
+            self._logger.info(f"Restarting worker {self.name}")
+
+    def _run_teardown(self):
+        """Private: Run teardown, a failing teardown must not kill the thread"""
+        if self._teardown is None:
+            return
+        try:
+            self._teardown()
+        except Exception:
+            self._logger.exception(f"Worker {self.name} teardown failed")
+
+
+class Supervisor:
+    """Keep track of every worker started, to report their health and stop them
+    all on shutdown."""
+
+    _instance = None
+    _lock = threading.Lock()  # Ensure that we have thread-safe access
+
+    def __new__(cls):
+        if cls._instance is None:
+            with cls._lock:  # Lock only if we are not initialized
+                if cls._instance is None:
+                    # Verify that we did not get initialized before we locked
+                    cls._instance = super().__new__(cls)
+        return cls._instance
+
+    def __init__(self):
+        """Initialization logic that will only run the first time"""
+        if hasattr(self, "_initialized"):
+            return  # short circuit if we are initialized
+        self._workers = {}
+        """name: Worker"""
+        self._initialized = True
+
+    def add(self, worker):
+        """Track a worker, replacing a previous worker with the same name
+
+        Args:
+            worker (Worker): Worker
+        """
+        with self._lock:
+            self._workers[worker.name] = worker
+
+    def workers(self):
+        with self._lock:
+            return list(self._workers.values())
+
+    def health(self):
+        """Return the health data of every worker
+
+        Returns:
+            dict: name: Worker.health()
+        """
+        return {worker.name: worker.health() for worker in self.workers()}
+
+    def stop_all(self, timeout=2.0):
+        """Stop every worker, all at once, then wait for them to finish
+
+        Args:
+            timeout (float, optional): Seconds to wait for all the threads.
+                                       Defaults to 2.0.
+
+        Returns:
+            bool: True if every thread finished in time
+        """
+        workers = self.workers()
+        for worker in workers:
+            worker.request_stop()
+        deadline = time.monotonic() + timeout
+        stopped = True
+        for worker in workers:
+            stopped &= worker.stop(max(deadline - time.monotonic(), 0))
+        return stopped
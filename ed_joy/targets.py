@@ -0,0 +1,32 @@
+"""The windows to monitor. Kept apart from ed_joy.windows, so the settings can
+describe targets without importing the window tracking and its Win32 code."""
+
+
+class Target:
+    """A window to monitor, matched on its title, the executable name of its
+    process or its process ID."""
+
+    __slots__ = ("name", "title", "executable", "pid", "display_name")
+
+    def __init__(
+        self, name, title=None, executable=None, pid=None, display_name=None
+    ):
+        """
+        Args:
+            name (str): Target name, used for routing
+            title (str, optional): Part of the window title to look for.
+                                   Defaults to None.
+            executable (str, optional): Executable file name, without a path.
+                                        Defaults to None.
+            pid (int, optional): Process ID. Defaults to None.
+            display_name (str, optional): Name used when reporting status.
+                                          Defaults to name.
+        """
+        self.name = name
+        self.title = title or None
+        self.executable = executable or None
+        self.pid = pid
+        self.display_name = display_name or name
+
+    def __repr__(self):
+        return f"Target({self.name!r}, {self.title!r}, {self.executable!r})"
@@ -0,0 +1,183 @@
+"""Event pipeline tracing, enabled with --trace <file>. Spans are recorded into a
+ring buffer and written out on exit in the Chrome trace format, open the file in
+chrome://tracing or https://ui.perfetto.dev to see the timeline per thread."""
+import atexit
+import contextlib
+import itertools
+import json
+import os
+import threading
+import time
+from collections import deque
+from pathlib import Path
+
+_recorder = None
+_null_span = contextlib.nullcontext()
+
+
+class TraceRecorder:
+    """Keep the most recent spans in a ring buffer. Recording a span is a tuple
+    append, the Chrome trace events are only built when writing."""
+
+    def __init__(self, path, capacity=262144):
+        """
+        Args:
+            path (Path): Trace file written by write()
+            capacity (int, optional): Spans kept, older spans are dropped.
+                                      Defaults to 262144.
+        """
+        self.path = Path(path)
+        self.origin = time.perf_counter()
+        """perf_counter() of the start of the trace"""
+        self._spans = deque(maxlen=capacity)
+        """(name, category, thread id, start, end, args)"""
+        self._count = itertools.count(1)
+        """Thread-safe span counter"""
+        self.recorded = 0
+        """Number of spans recorded, including the ones since dropped"""
+        self._threads = {}
+        """Native thread id: thread name"""
+
+    def complete(self, name, cat, start, end, args=None):
+        """Record a span
+
+        Args:
+            name (str): Span name
+            cat (str): Category, e.g. the thread or subsystem
+            start (float): perf_counter() at the start of the span
+            end (float): perf_counter() at the end of the span
+            args (dict, optional): Extra data shown with the span.
+                                   Defaults to None.
+        """
+        tid = threading.get_native_id()
+        if tid not in self._threads:
+            self._threads[tid] = threading.current_thread().name
+        self.recorded = next(self._count)
+        self._spans.append((name, cat, tid, start, end, args))
+
+    def events(self):
+        """Build the Chrome trace events
+
+        Returns:
+            list: Trace event dicts, thread names first
+        """
+        pid = os.getpid()
+        events = [
+            {
+                "name": "thread_name",
+                "ph": "M",
+                "pid": pid,
+                "tid": tid,
+                "args": {"name": name},
+            }
+            for tid, name in list(self._threads.items())
+        ]
+        for name, cat, tid, start, end, args in list(self._spans):
+            event = {
+                "name": name,
+                "cat": cat,
+                "ph": "X",
+                "pid": pid,
+                "tid": tid,
+                "ts": (start - self.origin) * 1e6,
+                "dur": (end - start) * 1e6,
+            }
+            if args:
+                event["args"] = args
+            events.append(event)
+        return events
+
+    def write(self):
+        """Write the trace file"""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        spans = len(self._spans)
+        data = {
+            "traceEvents": self.events(),
+            "displayTimeUnit": "ms",
+            "otherData": {
+                "recorded": self.recorded,
+                "dropped": self.recorded - spans,
+            },
+        }
+        with self.path.open("w") as file:
+            json.dump(data, file)
+        print(f"Trace written to {self.path} ({spans} spans)")
+
+
+class _Span:
+    """Context manager recording a span on exit"""
+
+    __slots__ = ("name", "cat", "args", "start")
+
+    def __init__(self, name, cat, args):
+        self.name = name
+        self.cat = cat
+        self.args = args
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        recorder = _recorder
+        if recorder is not None:
+            recorder.complete(
+                self.name, self.cat, self.start, time.perf_counter(), self.args
+            )
+
+
+def enable(path):
+    """Start recording, the trace is written when the program exits
+
+    Args:
+        path (str): Trace file
+    """
+    global _recorder
+    if _recorder is None:
+        _recorder = TraceRecorder(path)
+        atexit.register(write)
+
+
+def is_enabled():
+    return _recorder is not None
+
+
+def now():
+    """Timestamp for complete()"""
+    return time.perf_counter()
+
+
+def span(name, cat, args=None):
+    """Context manager recording a span, does nothing when tracing is off
+
+    Args:
+        name (str): Span name
+        cat (str): Category
+        args (dict, optional): Extra data shown with the span. Defaults to None.
+    """
+    if _recorder is None:
+        return _null_span
+    return _Span(name, cat, args)
+
+
+def complete(name, cat, start, end=None, args=None):
+    """Record a span that started at start, does nothing when tracing is off
+
+    Args:
+        name (str): Span name
+        cat (str): Category
+        start (float): now() at the start of the span
+        end (float, optional): now() at the end of the span. Defaults to now.
+        args (dict, optional): Extra data shown with the span. Defaults to None.
+    """
+    recorder = _recorder
+    if recorder is not None:
+        recorder.complete(
+            name, cat, start, time.perf_counter() if end is None else end, args
+        )
+
+
+def write():
+    """Write the trace file, if tracing"""
+    if _recorder is not None:
+        _recorder.write()
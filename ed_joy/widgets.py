@@ -0,0 +1,273 @@
+import time
+from array import array
+
+from PySide6.QtCore import QRect, QSize, Qt, QTimer
+from PySide6.QtGui import QFontDatabase, QPainter, QPalette, QRegion
+from PySide6.QtWidgets import QPlainTextEdit, QSizePolicy, QVBoxLayout, QWidget
+
+from ed_joy.metrics import Metrics
+
+
+class AxisBarsWidget(QWidget):
+    """Draw every axis of a joystick as a horizontal bar. Updates only mark the
+    widget dirty, it is repainted at most max_fps times per second no matter how
+    many updates arrive."""
+
+    ROW_HEIGHT = 18
+    LABEL_WIDTH = 48
+
+    def __init__(self, num_axes, max_fps=30, parent=None):
+        """
+        Args:
+            num_axes (int): Number of axes to draw
+            max_fps (int, optional): Maximum repaints per second. Defaults to 30.
+            parent (QWidget, optional): Parent widget. Defaults to None.
+        """
+        super().__init__(parent)
+        self._values = array("i", bytes(4 * num_axes))
+        """Axis values between -100 and 100"""
+        self._interval = 1 / max_fps
+        self._last_repaint = 0
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.timeout.connect(self.update)
+        self.setSizePolicy(QSizePolicy.Policy.Expanding, QSizePolicy.Policy.Fixed)
+
+    def sizeHint(self):  # noqa: N802
+        return QSize(200, self.ROW_HEIGHT * len(self._values))
+
+    def minimumSizeHint(self):  # noqa: N802
+        return QSize(self.LABEL_WIDTH + 50, self.ROW_HEIGHT * len(self._values))
+
+    def value(self, axis):
+        return self._values[axis]
+
+    def set_axis(self, axis, value):
+        """Set an axis value and schedule a repaint
+
+        Args:
+            axis (int): Axis
+            value (int): Value between -100 and 100
+        """
+        if axis >= len(self._values):
+            self._values.extend([0] * (axis + 1 - len(self._values)))
+            self.updateGeometry()
+        if self._values[axis] == value:
+            return
+        self._values[axis] = value
+        if not self._timer.isActive():
+            # Wait until the next allowed frame, the timer repaints once
+            delay = self._last_repaint + self._interval - time.perf_counter()
+            self._timer.start(max(0, round(delay * 1000)))
+
+    def paintEvent(self, event):  # noqa: N802
+        self._last_repaint = time.perf_counter()
+        palette = self.palette()
+        painter = QPainter(self)
+        bar_width = max(self.width() - self.LABEL_WIDTH, 1)
+        half = bar_width // 2
+        text_color = palette.color(QPalette.ColorRole.WindowText)
+        base = palette.color(QPalette.ColorRole.Base)
+        highlight = palette.color(QPalette.ColorRole.Highlight)
+
+        for axis, val in enumerate(self._values):
+            top = axis * self.ROW_HEIGHT
+            row = QRect(0, top + 2, self.LABEL_WIDTH - 4, self.ROW_HEIGHT - 4)
+            painter.setPen(text_color)
+            painter.drawText(row, Qt.AlignmentFlag.AlignVCenter, f"Axis {axis}")
+
+            bar = QRect(self.LABEL_WIDTH, top + 2, bar_width, self.ROW_HEIGHT - 4)
+            painter.fillRect(bar, base)
+            # Fill from the centre towards the value
+            length = round(half * max(-100, min(100, val)) / 100)
+            left = self.LABEL_WIDTH + half + min(length, 0)
+            painter.fillRect(
+                QRect(left, bar.top(), abs(length), bar.height()), highlight
+            )
+            painter.setPen(text_color)
+            painter.drawText(bar, Qt.AlignmentFlag.AlignCenter, str(val))
+        painter.end()
+
+
+HAT_ARROWS = {
+    (0, 0): "\u00b7",
+    (0, 1): "\u2191",
+    (1, 1): "\u2197",
+    (1, 0): "\u2192",
+    (1, -1): "\u2198",
+    (0, -1): "\u2193",
+    (-1, -1): "\u2199",
+    (-1, 0): "\u2190",
+    (-1, 1): "\u2196",
+}
+"""Arrow drawn for each hat position"""
+
+
+class ButtonMatrixWidget(QWidget):
+    """Draw the buttons of a joystick as a grid of cells followed by its hats.
+    Button state is kept as an integer bitset, set_state() diffs it against the
+    last state and repaints only the cells that changed, in a single pass."""
+
+    CELL = 22
+    COLUMNS = 16
+
+    def __init__(self, num_buttons, num_hats, parent=None):
+        """
+        Args:
+            num_buttons (int): Number of buttons to draw
+            num_hats (int): Number of hats to draw
+            parent (QWidget, optional): Parent widget. Defaults to None.
+        """
+        super().__init__(parent)
+        self._num_buttons = num_buttons
+        self._buttons = 0
+        """Bitset, bit n set when button n is pressed"""
+        self._hats = [(0, 0)] * num_hats
+        self.setSizePolicy(QSizePolicy.Policy.Fixed, QSizePolicy.Policy.Fixed)
+
+    def _cell_rect(self, index):
+        """Private: Rect of the cell at index, buttons first then hats"""
+        row, column = divmod(index, self.COLUMNS)
+        size = self.CELL - 2
+        return QRect(column * self.CELL, row * self.CELL, size, size)
+
+    def sizeHint(self):  # noqa: N802
+        cells = self._num_buttons + len(self._hats)
+        columns = min(max(cells, 1), self.COLUMNS)
+        rows = max((cells + self.COLUMNS - 1) // self.COLUMNS, 1)
+        return QSize(columns * self.CELL, rows * self.CELL)
+
+    def minimumSizeHint(self):  # noqa: N802
+        return self.sizeHint()
+
+    @property
+    def buttons(self):
+        return self._buttons
+
+    def set_state(self, buttons, hats):
+        """Update the state, repainting only the cells that changed
+
+        Args:
+            buttons (int): Button bitset
+            hats (list): (x, y) tuple per hat
+        """
+        changed = self._buttons ^ buttons
+        region = QRegion()
+        while changed:
+            # Walk the set bits only, lowest first
+            low = changed & -changed
+            button = low.bit_length() - 1
+            if button < self._num_buttons:
+                region += self._cell_rect(button)
+            changed ^= low
+        self._buttons = buttons
+
+        for hat, value in enumerate(hats[: len(self._hats)]):
+            if self._hats[hat] != value:
+                self._hats[hat] = value
+                region += self._cell_rect(self._num_buttons + hat)
+
+        if not region.isEmpty():
+            self.update(region)
+
+    def paintEvent(self, event):  # noqa: N802
+        palette = self.palette()
+        painter = QPainter(self)
+        region = event.region()
+        text_color = palette.color(QPalette.ColorRole.WindowText)
+        pressed_text = palette.color(QPalette.ColorRole.HighlightedText)
+        base = palette.color(QPalette.ColorRole.Base)
+        highlight = palette.color(QPalette.ColorRole.Highlight)
+
+        for button in range(self._num_buttons):
+            rect = self._cell_rect(button)
+            if not region.intersects(rect):
+                continue
+            pressed = self._buttons >> button & 1
+            painter.fillRect(rect, highlight if pressed else base)
+            painter.setPen(pressed_text if pressed else text_color)
+            painter.drawText(rect, Qt.AlignmentFlag.AlignCenter, str(button))
+
+        for hat, value in enumerate(self._hats):
+            rect = self._cell_rect(self._num_buttons + hat)
+            if not region.intersects(rect):
+                continue
+            centred = value == (0, 0)
+            painter.fillRect(rect, base if centred else highlight)
+            painter.setPen(text_color if centred else pressed_text)
+            painter.drawText(
+                rect, Qt.AlignmentFlag.AlignCenter, HAT_ARROWS.get(tuple(value), "?")
+            )
+        painter.end()
+
+
+class MetricsPanel(QWidget):
+    """Diagnostics panel listing every metric, refreshed once per interval while
+    shown. Counters also show their rate over the last interval, summaries their
+    p50 and p99."""
+
+    def __init__(self, interval=1000, parent=None):
+        """
+        Args:
+            interval (int, optional): Refresh interval in ms. Defaults to 1000.
+            parent (QWidget, optional): Parent widget. Defaults to None.
+        """
+        super().__init__(parent)
+        self.setWindowTitle("Diagnostics")
+        self._text = QPlainTextEdit()
+        self._text.setReadOnly(True)
+        self._text.setFont(QFontDatabase.systemFont(QFontDatabase.FixedFont))
+        layout = QVBoxLayout()
+        layout.addWidget(self._text)
+        self.setLayout(layout)
+        self.resize(560, 400)
+        self._last = {}
+        """(metric name, label values): counter value at the last refresh"""
+        self._last_refresh = None
+        self._timer = QTimer(self)
+        self._timer.setInterval(interval)
+        self._timer.timeout.connect(self.refresh)
+
+    def showEvent(self, event):  # noqa: N802
+        self.refresh()
+        self._timer.start()
+        super().showEvent(event)
+
+    def hideEvent(self, event):  # noqa: N802
+        self._timer.stop()
+        super().hideEvent(event)
+
+    def refresh(self):
+        """Redraw the metrics"""
+        now = time.monotonic()
+        elapsed = None if self._last_refresh is None else now - self._last_refresh
+        self._last_refresh = now
+        lines = []
+        for metric in Metrics().metrics():
+            lines.append(metric.help)
+            for label_values, value in metric.values():
+                labels = ", ".join(
+                    f"{k}={v}" for k, v in zip(metric.label_names, label_values)
+                )
+                text = self._format(metric, label_values, value, elapsed)
+                lines.append(f"  {labels or '-':<24} {text}")
+        self._text.setPlainText("\n".join(lines))
+
+    def _format(self, metric, label_values, value, elapsed):
+        """Private: Format one value of a metric"""
+        if metric.kind == "summary":
+            # Summaries are all in seconds
+            quantiles = value.quantiles()
+            parts = [f"n={value.count}"]
+            for q, v in quantiles.items():
+                if v is not None:
+                    parts.append(f"p{round(q * 100)}={v * 1000:.3f} ms")
+            return "  ".join(parts)
+        if metric.kind == "counter":
+            key = (metric.name, label_values)
+            last = self._last.get(key)
+            self._last[key] = value.value
+            if elapsed and last is not None:
+                rate = (value.value - last) / elapsed
+                return f"{value.value:>10}  {rate:8.1f}/s"
+        return f"{value.value:>10}"
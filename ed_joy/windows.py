@@ -0,0 +1,833 @@
+import ctypes
+import itertools
+import ntpath
+import re
+import threading
+import time
+from abc import ABC, abstractmethod
+
+from ed_joy import logs
+from ed_joy.targets import Target
+
+# Win32 event constants used by SetWinEventHook
+EVENT_OBJECT_CREATE = 0x8000
+EVENT_OBJECT_DESTROY = 0x8001
+EVENT_OBJECT_NAMECHANGE = 0x800C
+WINEVENT_OUTOFCONTEXT = 0x0000
+OBJID_WINDOW = 0
+PM_REMOVE = 0x0001
+PROCESS_QUERY_LIMITED_INFORMATION = 0x1000
+STILL_ACTIVE = 259
+
+WINDOW_EVENTS = {
+    EVENT_OBJECT_CREATE: "create",
+    EVENT_OBJECT_DESTROY: "destroy",
+    EVENT_OBJECT_NAMECHANGE: "title",
+}
+"""Map Win32 event ids to the notification kinds used by WindowTracker"""
+
+
+class WindowMatcher:
+    """Match windows against every target at once. The titles of all targets are
+    compiled into a single case-insensitive pattern, so a window title is
+    searched once whatever the number of targets and no lowercased copy is made.
+    Executables and PIDs are dict lookups. A window belongs to the first target
+    it matches that does not have a window yet."""
+
+    def __init__(self, targets):
+        """
+        Args:
+            targets (list): Target for each window to track
+        """
+        self.targets = tuple(targets)
+        titles = [
+            f"(?P<t{i}>{re.escape(target.title)})"
+            for i, target in enumerate(self.targets)
+            if target.title
+        ]
+        self._pattern = re.compile("|".join(titles), re.IGNORECASE) if titles else None
+        self._titles = {
+            i: re.compile(re.escape(target.title), re.IGNORECASE)
+            for i, target in enumerate(self.targets)
+            if target.title
+        }
+        """Target index: title pattern, for titles matching several targets"""
+        self._executables = {}
+        """Lowercased executable name: target index"""
+        self._pids = {}
+        """pid: target index"""
+        for i, target in reversed(list(enumerate(self.targets))):
+            if target.executable:
+                self._executables[target.executable.lower()] = i
+            if target.pid is not None:
+                self._pids[target.pid] = i
+
+    @property
+    def needs_process(self):
+        """True when windows have to be matched on their process too"""
+        return bool(self._executables or self._pids)
+
+    @property
+    def needs_executable(self):
+        """True when processes have to be matched on their executable name"""
+        return bool(self._executables)
+
+    def match_title(self, title, skip=()):
+        """Check a window title
+
+        Args:
+            title (str): Window title
+            skip (Container, optional): Indexes of the targets to leave out,
+                                        e.g. those already tracked.
+                                        Defaults to none.
+
+        Returns:
+            int: Index of the matching target, None if none matches
+        """
+        if self._pattern is None:
+            return None
+        found = self._pattern.search(title)
+        if found is None:
+            return None
+        index = int(found.lastgroup[1:])
+        if index not in skip:
+            return index
+        # Titles may overlap, check the other targets one by one
+        for i, pattern in self._titles.items():
+            if i not in skip and pattern.search(title):
+                return i
+        return None
+
+    def title_matches(self, title, index):
+        """Check a window title against a single target
+
+        Args:
+            title (str): Window title
+            index (int): Target index
+
+        Returns:
+            bool: True if the title matches the target
+        """
+        pattern = self._titles.get(index)
+        return pattern is not None and pattern.search(title) is not None
+
+    def __call__(self, title):
+        """Check a window title
+
+        Args:
+            title (str): Window title
+
+        Returns:
+            bool: True if the title matches any target
+        """
+        return self.match_title(title) is not None
+
+    def match_process(self, pid, name):
+        """Check a process
+
+        Args:
+            pid (int): Process ID
+            name (str): Executable file name, None if unknown
+
+        Returns:
+            int: Index of the matching target, None if none matches
+        """
+        index = self._pids.get(pid)
+        if index is None and name is not None:
+            index = self._executables.get(name.lower())
+        return index
+
+
+def title_matcher(name: str):
+    """Create a case-insensitive substring matcher for window titles
+
+    Args:
+        name (str): Part of the window title to look for
+
+    Returns:
+        WindowMatcher: Returns True when called with a matching title
+    """
+    return WindowMatcher([Target(name, title=name)])
+
+
+class WindowBackend(ABC):
+    """Interface between the WindowTracker and the windowing system."""
+
+    @abstractmethod
+    def enum_windows(self):
+        """List all top level windows with a title
+
+        Returns:
+            list: (hwnd, title) tuples
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def is_window(self, hwnd):
+        """Check that a window handle is still valid"""
+        raise NotImplementedError
+
+    @abstractmethod
+    def get_window_text(self, hwnd):
+        """Get the title of a window, empty string if there is none"""
+        raise NotImplementedError
+
+    @abstractmethod
+    def get_foreground_window(self):
+        """Get the handle of the current foreground window"""
+        raise NotImplementedError
+
+    @abstractmethod
+    def focus_window(self, hwnd, force=False):
+        """Bring a window to the foreground. Gracefully continue if it fails.
+
+        Args:
+            hwnd (int): Window handle
+            force (bool, optional): Force focus. Defaults to False.
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def close_window(self, hwnd):
+        """Ask a window to close, as its close button would. Returns without
+        waiting for it to close."""
+        raise NotImplementedError
+
+    @abstractmethod
+    def get_window_pid(self, hwnd):
+        """Get the ID of the process owning a window, None if unknown"""
+        raise NotImplementedError
+
+    @abstractmethod
+    def get_process_name(self, pid):
+        """Get the executable file name of a process, None if unknown"""
+        raise NotImplementedError
+
+    @abstractmethod
+    def is_process_alive(self, pid):
+        """Check that a process is still running. May keep a handle to the
+        process open until release_process() so later checks are cheap."""
+        raise NotImplementedError
+
+    def release_process(self, pid):
+        """Release anything kept open by is_process_alive()"""
+        pass
+
+    def subscribe(self, callback):
+        """Deliver window notifications to callback(kind, hwnd), kind being one
+        of "create", "destroy" or "title".
+
+        Returns:
+            bool: False if the backend can not deliver notifications
+        """
+        return False
+
+    def unsubscribe(self):
+        """Stop delivering window notifications"""
+        pass
+
+    def pump(self):
+        """Deliver any queued notifications on the calling thread"""
+        pass
+
+
+class Win32WindowBackend(WindowBackend):
+    """Windows backend using win32gui and SetWinEventHook. Notifications are
+    delivered to the thread that called subscribe(), from within pump()."""
+
+    def __init__(self):
+        import pywintypes
+        import win32api
+        import win32con
+        import win32gui
+
+        self._logger = logs.get_logger(__name__)
+        self._pywintypes = pywintypes
+        self._win32api = win32api
+        self._win32con = win32con
+        self._win32gui = win32gui
+        self._user32 = ctypes.windll.user32
+        self._kernel32 = ctypes.windll.kernel32
+        self._processes = {}
+        """pid: process handle, see is_process_alive"""
+        self._hooks = []
+        self._proc = None
+        self._callback = None
+
+    def __enum_windows_callback(self, hwnd, result):
+        """capture all running processes with window names"""
+        name = self._win32gui.GetWindowText(hwnd)
+        # we can exclude blank names
+        if name:
+            result.append((hwnd, name))
+
+    def enum_windows(self):
+        result = []
+        self._win32gui.EnumWindows(self.__enum_windows_callback, result)
+        return result
+
+    def is_window(self, hwnd):
+        return bool(self._win32gui.IsWindow(hwnd))
+
+    def get_window_text(self, hwnd):
+        return self._win32gui.GetWindowText(hwnd)
+
+    def get_foreground_window(self):
+        return self._win32gui.GetForegroundWindow()
+
+    def get_window_pid(self, hwnd):
+        from ctypes import wintypes
+
+        pid = wintypes.DWORD()
+        if not self._user32.GetWindowThreadProcessId(hwnd, ctypes.byref(pid)):
+            return None
+        return pid.value
+
+    def _open_process(self, pid):
+        """Private: Open a process handle for queries, 0 if not allowed"""
+        return self._kernel32.OpenProcess(
+            PROCESS_QUERY_LIMITED_INFORMATION, False, pid
+        )
+
+    def get_process_name(self, pid):
+        from ctypes import wintypes
+
+        opened = pid not in self._processes
+        handle = self._open_process(pid) if opened else self._processes[pid]
+        if not handle:
+            return None
+        try:
+            size = wintypes.DWORD(1024)
+            buf = ctypes.create_unicode_buffer(size.value)
+            if not self._kernel32.QueryFullProcessImageNameW(
+                handle, 0, buf, ctypes.byref(size)
+            ):
+                return None
+            return ntpath.basename(buf.value)
+        finally:
+            if opened:
+                self._kernel32.CloseHandle(handle)
+
+    def is_process_alive(self, pid):
+        from ctypes import wintypes
+
+        # Holding the handle also stops the PID from being reused
+        handle = self._processes.get(pid)
+        if handle is None:
+            handle = self._open_process(pid)
+            if not handle:
+                return False
+            self._processes[pid] = handle
+        code = wintypes.DWORD()
+        if not self._kernel32.GetExitCodeProcess(handle, ctypes.byref(code)):
+            return False
+        return code.value == STILL_ACTIVE
+
+    def release_process(self, pid):
+        handle = self._processes.pop(pid, None)
+        if handle:
+            self._kernel32.CloseHandle(handle)
+
+    def focus_window(self, hwnd, force=False):
+        try:
+            self._win32gui.ShowWindow(hwnd, self._win32con.SW_RESTORE)
+            self._win32gui.SetForegroundWindow(hwnd)
+        except self._pywintypes.error:
+            if force:
+                self._force_focus(hwnd)
+
+    def close_window(self, hwnd):
+        try:
+            self._win32gui.PostMessage(hwnd, self._win32con.WM_CLOSE, 0, 0)
+        except self._pywintypes.error:
+            pass  # Already gone
+
+    def _force_focus(self, hwnd_target):
+        """Private: Force focus on specified window.
+        NOTE: As windows restricts when we can focus another program, we need to
+        hook into the active foreground window. This is potentially an issue
+        for games with cheat detection, need to be careful
+
+        Args:
+            hwnd_target (int): Window handle
+        """
+        user32 = self._user32
+        foreground_hwnd = user32.GetForegroundWindow()
+        if foreground_hwnd == hwnd_target:
+            self._logger.debug(
+                "Already focused, doing nothing", extra=logs.RATE_LIMITED
+            )
+            return  # We already have focus
+
+        foreground_tid = user32.GetWindowThreadProcessId(foreground_hwnd, 0)
+        target_tid = user32.GetWindowThreadProcessId(hwnd_target, 0)
+
+        current_thread_id = self._win32api.GetCurrentThreadId()
+
+        # Attach to the foreground thread
+        user32.AttachThreadInput(current_thread_id, foreground_tid, True)
+        user32.AttachThreadInput(current_thread_id, target_tid, True)
+
+        try:
+            self._win32gui.ShowWindow(hwnd_target, self._win32con.SW_RESTORE)
+            self._win32gui.SetForegroundWindow(hwnd_target)
+        except Exception:
+            self._logger.exception("Exception occurred while focusing.")
+
+        # Detach from foreground thread
+        user32.AttachThreadInput(current_thread_id, foreground_tid, False)
+        user32.AttachThreadInput(current_thread_id, target_tid, False)
+
+    def _on_win_event(self, hook, event, hwnd, id_object, id_child, thread, event_time):
+        """Private: WinEventProc, only forward notifications for windows"""
+        if id_object == OBJID_WINDOW and id_child == 0 and hwnd:
+            self._callback(WINDOW_EVENTS[event], hwnd)
+
+    def subscribe(self, callback):
+        from ctypes import wintypes
+
+        win_event_proc = ctypes.WINFUNCTYPE(
+            None,
+            wintypes.HANDLE,
+            wintypes.DWORD,
+            wintypes.HWND,
+            wintypes.LONG,
+            wintypes.LONG,
+            wintypes.DWORD,
+            wintypes.DWORD,
+        )
+        self._callback = callback
+        # Keep a reference to the proc, otherwise it is garbage collected
+        self._proc = win_event_proc(self._on_win_event)
+        # Separate hooks so we don't receive the noisy events in between
+        for first, last in (
+            (EVENT_OBJECT_CREATE, EVENT_OBJECT_DESTROY),
+            (EVENT_OBJECT_NAMECHANGE, EVENT_OBJECT_NAMECHANGE),
+        ):
+            hook = self._user32.SetWinEventHook(
+                first, last, 0, self._proc, 0, 0, WINEVENT_OUTOFCONTEXT
+            )
+            if hook:
+                self._hooks.append(hook)
+        if len(self._hooks) != 2:
+            self.unsubscribe()
+            return False
+        return True
+
+    def unsubscribe(self):
+        for hook in self._hooks:
+            self._user32.UnhookWinEvent(hook)
+        self._hooks = []
+        self._proc = None
+        self._callback = None
+
+    def pump(self):
+        from ctypes import wintypes
+
+        msg = wintypes.MSG()
+        while self._user32.PeekMessageW(ctypes.byref(msg), 0, 0, 0, PM_REMOVE):
+            self._user32.TranslateMessage(ctypes.byref(msg))
+            self._user32.DispatchMessageW(ctypes.byref(msg))
+
+
+class FakeWindowBackend(WindowBackend):
+    """In-memory backend, used to exercise and benchmark the WindowTracker
+    without a windowing system. Processes are kept in a stand-in process table,
+    windows created without a process belong to PID 0. Notifications are queued
+    until pump()."""
+
+    def __init__(self, notifications=True):
+        """
+        Args:
+            notifications (bool, optional): Support subscribe(). Defaults to True.
+        """
+        self.windows = {}
+        """hwnd: title"""
+        self.window_pids = {}
+        """hwnd: pid"""
+        self.processes = {}
+        """Stand-in process table, pid: executable name"""
+        self.foreground = None
+        self.focused = []
+        """(hwnd, perf_counter) for each focus_window call"""
+        self.closed = []
+        """hwnd for each close_window call"""
+        self.notifications = notifications
+        self.calls = dict.fromkeys(
+            (
+                "enum_windows",
+                "is_window",
+                "get_window_text",
+                "get_window_pid",
+                "get_process_name",
+                "is_process_alive",
+            ),
+            0,
+        )
+        """Number of calls made to each of the (normally expensive) queries"""
+        self._hwnds = itertools.count(0x10000)
+        self._pids = itertools.count(1000)
+        self._lock = threading.Lock()
+        self._queued = []
+        self._callback = None
+
+    def _notify(self, kind, hwnd):
+        if self._callback is not None:
+            with self._lock:
+                self._queued.append((kind, hwnd))
+
+    def create_process(self, executable):
+        """Add a process to the process table
+
+        Args:
+            executable (str): Executable file name
+
+        Returns:
+            int: pid
+        """
+        pid = next(self._pids)
+        self.processes[pid] = executable
+        return pid
+
+    def kill_process(self, pid):
+        """Remove a process from the process table along with its windows"""
+        for hwnd in [x for x, owner in self.window_pids.items() if owner == pid]:
+            self.destroy_window(hwnd)
+        self.processes.pop(pid, None)
+
+    def create_window(self, title, pid=0):
+        """Create a window
+
+        Args:
+            title (str): Window title
+            pid (int, optional): Owning process. Defaults to 0.
+
+        Returns:
+            int: hwnd
+        """
+        hwnd = next(self._hwnds)
+        self.windows[hwnd] = title
+        self.window_pids[hwnd] = pid
+        self._notify("create", hwnd)
+        return hwnd
+
+    def destroy_window(self, hwnd):
+        self.windows.pop(hwnd, None)
+        self.window_pids.pop(hwnd, None)
+        if self.foreground == hwnd:
+            self.foreground = None
+        self._notify("destroy", hwnd)
+
+    def set_title(self, hwnd, title):
+        self.windows[hwnd] = title
+        self._notify("title", hwnd)
+
+    def set_foreground(self, hwnd):
+        self.foreground = hwnd
+
+    def enum_windows(self):
+        self.calls["enum_windows"] += 1
+        return [(hwnd, title) for hwnd, title in self.windows.items() if title]
+
+    def is_window(self, hwnd):
+        self.calls["is_window"] += 1
+        return hwnd in self.windows
+
+    def get_window_text(self, hwnd):
+        self.calls["get_window_text"] += 1
+        return self.windows.get(hwnd, "")
+
+    def get_foreground_window(self):
+        return self.foreground
+
+    def get_window_pid(self, hwnd):
+        self.calls["get_window_pid"] += 1
+        return self.window_pids.get(hwnd)
+
+    def get_process_name(self, pid):
+        self.calls["get_process_name"] += 1
+        return self.processes.get(pid)
+
+    def is_process_alive(self, pid):
+        self.calls["is_process_alive"] += 1
+        return pid in self.processes
+
+    def focus_window(self, hwnd, force=False):
+        if hwnd in self.windows:
+            self.foreground = hwnd
+        self.focused.append((hwnd, time.perf_counter()))
+
+    def close_window(self, hwnd):
+        self.closed.append(hwnd)
+        if hwnd in self.windows:
+            self.destroy_window(hwnd)
+
+    def subscribe(self, callback):
+        if not self.notifications:
+            return False
+        self._callback = callback
+        return True
+
+    def unsubscribe(self):
+        self._callback = None
+        with self._lock:
+            self._queued = []
+
+    def pump(self):
+        with self._lock:
+            queued, self._queued = self._queued, []
+        for kind, hwnd in queued:
+            if self._callback is not None:
+                self._callback(kind, hwnd)
+
+
+class WindowTracker:
+    """Track the window of every target of a WindowMatcher. Matched hwnds are
+    cached and only validated on each refresh. Missing targets are all looked
+    for in a single walk over the windows. When the backend delivers
+    notifications, new or renamed windows are checked individually instead of
+    rescanning every window.
+
+    When matching on processes, the result is cached per PID so each process is
+    only looked up once. An entry is dropped once the last window seen for its
+    process is destroyed, as the PID may be reused. A window found through its
+    process is validated by checking the process is alive instead of re-reading
+    its title, so it is not lost when the title changes.
+    """
+
+    def __init__(self, backend: WindowBackend, match: WindowMatcher):
+        """
+        Args:
+            backend (WindowBackend): Windowing system backend
+            match (WindowMatcher): Targets to track
+        """
+        self.backend = backend
+        self.match = match
+        count = len(match.targets)
+        self._hwnds = [None] * count
+        """Tracked window handle per target"""
+        self._pids = [None] * count
+        """Process of the tracked window per target, None unless it matched on
+        its process"""
+        self._tracked = {}
+        """hwnd: target index"""
+        self._processes = {}
+        """pid: index of the matching target, -1 if none, see _process_target"""
+        self._window_pids = {}
+        """hwnd: pid of the windows whose process was looked up"""
+        self._process_windows = {}
+        """pid: number of windows in _window_pids, see _forget_window"""
+        self._subscribed = False
+        self._rescan = True
+        """Set when we can not rely on notifications to find the windows"""
+        self.stats = dict.fromkeys(
+            ("scans", "validations", "notifications", "process_lookups"), 0
+        )
+
+    @property
+    def hwnd(self):
+        """Return the window handle of the first target, None if not found"""
+        return self._hwnds[0]
+
+    @property
+    def pid(self):
+        """Return the process of the window of the first target, None if not
+        found or if the window matched on its title only"""
+        return self._pids[0]
+
+    @property
+    def hwnds(self):
+        """Return the tracked window handle per target, None if not found"""
+        return tuple(self._hwnds)
+
+    def start(self):
+        """Subscribe to notifications, call from the thread running refresh()"""
+        self._subscribed = self.backend.subscribe(self._on_notification)
+        self._rescan = True
+
+    def stop(self):
+        """Unsubscribe from notifications"""
+        if self._subscribed:
+            self.backend.unsubscribe()
+            self._subscribed = False
+        for index in range(len(self._hwnds)):
+            self._untrack(index)
+
+    def _window_pid(self, hwnd):
+        """Private: Process of a window, None when not matching on processes"""
+        if not self.match.needs_process:
+            return None
+        return self.backend.get_window_pid(hwnd)
+
+    def _remember_window(self, hwnd, pid):
+        """Private: Record the process of a window, see _forget_window"""
+        if hwnd not in self._window_pids:
+            self._window_pids[hwnd] = pid
+            self._process_windows[pid] = self._process_windows.get(pid, 0) + 1
+
+    def _forget_window(self, hwnd):
+        """Private: Forget a destroyed window, and the cached match of its
+        process once it has no window left"""
+        pid = self._window_pids.pop(hwnd, None)
+        if pid is None:
+            return
+        count = self._process_windows[pid] - 1
+        if count:
+            self._process_windows[pid] = count
+        else:
+            del self._process_windows[pid]
+            self._processes.pop(pid, None)
+
+    def _process_target(self, pid):
+        """Private: Index of the target matching a process, cached per PID
+
+        Returns:
+            int: Target index, -1 if none matches
+        """
+        index = self._processes.get(pid)
+        if index is None:
+            self.stats["process_lookups"] += 1
+            name = None
+            if self.match.needs_executable:
+                name = self.backend.get_process_name(pid)
+            index = self.match.match_process(pid, name)
+            index = self._processes[pid] = -1 if index is None else index
+        return index
+
+    def _target(self, hwnd, pid, title=None):
+        """Private: Find the target of a window
+
+        Args:
+            hwnd (int): Window handle
+            pid (int): Owning process, None when not matching on processes
+            title (str, optional): Window title, fetched when needed.
+                                   Defaults to None.
+
+        Returns:
+            tuple: Target index (None if none matches), True if the process
+                   matched
+        """
+        # Targets that already have a window do not hide the others
+        tracked = self._tracked.values()
+        if pid is not None:
+            self._remember_window(hwnd, pid)
+            index = self._process_target(pid)
+            if index >= 0 and index not in tracked:
+                return index, True
+        if title is None:
+            title = self.backend.get_window_text(hwnd)
+        return self.match.match_title(title, tracked), False
+
+    def _track(self, index, hwnd, pid):
+        """Private: Start tracking the window of a target
+
+        Args:
+            index (int): Target index
+            hwnd (int): Window handle
+            pid (int): Process of the window, None if it matched on its title
+        """
+        self._untrack(index)
+        self._hwnds[index] = hwnd
+        self._pids[index] = pid
+        self._tracked[hwnd] = index
+
+    def _untrack(self, index):
+        """Private: Stop tracking the window of a target"""
+        hwnd = self._hwnds[index]
+        if hwnd is None:
+            return
+        pid = self._pids[index]
+        if pid is not None and pid not in self._pids[:index] + self._pids[index + 1:]:
+            self.backend.release_process(pid)
+        self._tracked.pop(hwnd, None)
+        self._hwnds[index] = None
+        self._pids[index] = None
+
+    def _on_notification(self, kind, hwnd):
+        """Private: Handle a window notification from the backend"""
+        self.stats["notifications"] += 1
+        index = self._tracked.get(hwnd)
+        if kind == "destroy":
+            self._forget_window(hwnd)
+            if index is not None:
+                self._untrack(index)
+            return
+
+        if index is not None:
+            # Our window was renamed, make sure it still matches
+            if self._pids[index] is None and not self.match.title_matches(
+                self.backend.get_window_text(hwnd), index
+            ):
+                self._untrack(index)
+        elif None in self._hwnds:
+            pid = self._window_pid(hwnd)
+            index, by_process = self._target(hwnd, pid)
+            if index is not None and self._hwnds[index] is None:
+                self._track(index, hwnd, pid if by_process else None)
+
+    def _scan(self):
+        """Private: Walk every window once, looking for every missing target"""
+        self.stats["scans"] += 1
+        missing = self._hwnds.count(None)
+        seen = {}  # hwnd: pid of every window seen
+        for hwnd, title in self.backend.enum_windows():
+            pid = self._window_pid(hwnd)
+            if pid is not None:
+                seen[hwnd] = pid
+            index, by_process = self._target(hwnd, pid, title)
+            if index is not None and self._hwnds[index] is None:
+                self._track(index, hwnd, pid if by_process else None)
+                missing -= 1
+                if not missing:
+                    return
+        # Every window was seen, forget the windows destroyed without a
+        # notification and the processes without any as their PID may be reused
+        self._window_pids = seen
+        self._process_windows = {}
+        for pid in seen.values():
+            self._process_windows[pid] = self._process_windows.get(pid, 0) + 1
+        self._processes = {
+            pid: index
+            for pid, index in self._processes.items()
+            if pid in self._process_windows
+        }
+
+    def _validate(self, index):
+        """Private: Check the tracked window of a target is still the one to
+        track"""
+        hwnd = self._hwnds[index]
+        pid = self._pids[index]
+        if pid is not None:
+            # Matched on its process, the title does not matter
+            if not self.backend.is_process_alive(pid):
+                self._processes.pop(pid, None)
+                return False
+            return self.backend.is_window(hwnd)
+        return self.backend.is_window(hwnd) and (
+            # Without notifications title changes must be checked here
+            self._subscribed
+            or self.match.title_matches(self.backend.get_window_text(hwnd), index)
+        )
+
+    def refresh(self):
+        """Bring the tracked windows up to date
+
+        Returns:
+            tuple: Tracked window handle per target, None if not found
+        """
+        if self._subscribed:
+            self.backend.pump()
+
+        for index, hwnd in enumerate(self._hwnds):
+            if hwnd is None:
+                continue
+            self.stats["validations"] += 1
+            if not self._validate(index):
+                self._untrack(index)
+                # A notification may have been missed
+                self._rescan = True
+
+        if None in self._hwnds and (self._rescan or not self._subscribed):
+            self._scan()
+            self._rescan = False
+        return tuple(self._hwnds)
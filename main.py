@@ -1,3 +1,7 @@
 if __name__ == "__main__":
-    from ed_joy import core
-    core.run()
+    import multiprocessing
+
+    # Frozen builds re-run this script for the capture process
+    multiprocessing.freeze_support()
+    from ed_joy.__main__ import main
+    main()
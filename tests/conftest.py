@@ -0,0 +1,13 @@
+import os
+
+import pytest
+
+
+@pytest.fixture(autouse=True, scope="session")
+def workdir(tmp_path_factory):
+    """Run in a scratch directory, the settings and logs are written to the
+    working directory"""
+    previous = os.getcwd()
+    os.chdir(tmp_path_factory.mktemp("workdir"))
+    yield
+    os.chdir(previous)
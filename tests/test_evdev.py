@@ -0,0 +1,201 @@
+import os
+import sys
+import threading
+import time
+
+import pytest
+
+if not sys.platform.startswith("linux"):
+    pytest.skip("evdev is Linux only", allow_module_level=True)
+
+from ed_joy.evdev import (  # noqa: E402
+    ABS_HAT0X,
+    ABS_X,
+    ABS_Y,
+    BTN_JOYSTICK,
+    EV_ABS,
+    EV_KEY,
+    EV_SYN,
+    INPUT_EVENT,
+    SYN_DROPPED,
+    SYN_REPORT,
+    EvdevBackend,
+    EvdevDevice,
+    make_guid,
+)
+from ed_joy.inputs import (  # noqa: E402
+    JOYAXISMOTION,
+    JOYBUTTONDOWN,
+    JOYBUTTONUP,
+    JOYDEVICEADDED,
+    JOYDEVICEREMOVED,
+    JOYHATMOTION,
+    InputBackend,
+)
+
+AXES = [(ABS_X, 0, 1024, 512), (ABS_Y, 0, 1024, 512)]
+
+
+def record(ev_type, code, value, ts=1.5):
+    return INPUT_EVENT.pack(int(ts), int(ts % 1 * 1e6), ev_type, code, value)
+
+
+def syn(code=SYN_REPORT):
+    return record(EV_SYN, code, 0)
+
+
+class FakeJoystick:
+    """Device reading the read end of a pipe, written to like the kernel would"""
+
+    def __init__(self):
+        r, self._w = os.pipe()
+        os.set_blocking(r, False)
+        self.device = EvdevDevice(
+            r, "Fake joystick", axes=AXES, buttons=[BTN_JOYSTICK], hats=[0]
+        )
+
+    def write(self, data):
+        os.write(self._w, data)
+
+    def unplug(self):
+        if self._w is not None:
+            os.close(self._w)
+            self._w = None
+
+    def close(self):
+        self.unplug()
+        self.device.close()
+
+
+@pytest.fixture
+def joystick():
+    joystick = FakeJoystick()
+    yield joystick
+    joystick.close()
+
+
+def test_events_are_released_at_syn_report(joystick):
+    device = joystick.device
+    joystick.write(record(EV_ABS, ABS_X, 1024) + record(EV_KEY, BTN_JOYSTICK, 1))
+    assert device.read() == []
+
+    # A record split across two reads
+    frame = record(EV_ABS, ABS_HAT0X + 1, -1) + syn()
+    joystick.write(frame[:5])
+    assert device.read() == []
+    joystick.write(frame[5:])
+    events = device.read()
+    assert [event.type for event in events] == [
+        JOYAXISMOTION,
+        JOYBUTTONDOWN,
+        JOYHATMOTION,
+    ]
+    assert events[0].axis == 0 and events[0].value == 1.0
+    assert events[1].button == 0
+    # evdev counts down as positive, SDL up
+    assert events[2].value == (0, 1)
+    assert events[0].probe_ts == 1.5
+    assert device.values == [1.0, 0.0]
+
+
+def test_syn_dropped_discards_the_frame(joystick):
+    device = joystick.device
+    joystick.write(
+        record(EV_ABS, ABS_X, 0)
+        + syn(SYN_DROPPED)
+        + record(EV_ABS, ABS_Y, 0)
+        + syn()
+        + record(EV_KEY, BTN_JOYSTICK, 1)
+        + syn(),
+    )
+    events = device.read()
+    assert device.dropped == 1
+    # A pipe can not be queried, nothing is resynchronised
+    assert [event.type for event in events] == [JOYBUTTONDOWN]
+
+
+def test_autorepeat_is_ignored(joystick):
+    device = joystick.device
+    joystick.write(
+        record(EV_KEY, BTN_JOYSTICK, 1)
+        + record(EV_KEY, BTN_JOYSTICK, 2)
+        + record(EV_KEY, BTN_JOYSTICK, 0)
+        + syn(),
+    )
+    assert [event.type for event in device.read()] == [JOYBUTTONDOWN, JOYBUTTONUP]
+
+
+@pytest.fixture
+def backend():
+    backend = EvdevBackend(pattern=None, idle_timeout=5000)
+    backend.start()
+    yield backend
+    backend.stop()
+
+
+def test_backend_announces_reads_and_removes_devices(backend, joystick):
+    backend.add_device(joystick.device)
+    (added,) = backend.wait_for_events()
+    assert added.type == JOYDEVICEADDED
+    assert added.device_index == -1
+    assert (added.num_axes, added.num_buttons, added.num_hats) == (2, 1, 1)
+    assert added.axes == [0.0, 0.0]
+
+    joystick.write(record(EV_ABS, ABS_Y, 0) + syn())
+    (moved,) = backend.wait_for_events()
+    assert moved.type == JOYAXISMOTION
+    assert moved.instance_id == added.instance_id
+    assert (moved.axis, moved.value) == (1, -1.0)
+
+    joystick.unplug()
+    (removed,) = backend.wait_for_events()
+    assert removed.type == JOYDEVICEREMOVED
+    assert removed.instance_id == added.instance_id
+    assert backend.devices == []
+
+
+def test_backend_reads_file_devices(backend, tmp_path):
+    path = tmp_path / "events"
+    path.write_bytes(
+        record(EV_ABS, ABS_X, 0)
+        + syn()
+        + record(EV_ABS, ABS_HAT0X, 1)
+        + syn()
+    )
+    fd = os.open(path, os.O_RDONLY | os.O_NONBLOCK)
+    backend.add_device(EvdevDevice(fd, "Recorded joystick", axes=AXES, hats=[0]))
+    events = backend.wait_for_events()
+    assert [event.type for event in events] == [
+        JOYDEVICEADDED,
+        JOYAXISMOTION,
+        JOYHATMOTION,
+    ]
+    assert events[2].value == (1, 0)
+
+    # Read through, but a file is not a device going away
+    (device,) = backend.devices
+    assert device.read() == []
+    assert not device.closed
+
+
+def test_wake_interrupts_wait(backend):
+    threading.Timer(0.05, backend.wake).start()
+    start = time.monotonic()
+    assert backend.wait_for_events() == []
+    assert time.monotonic() - start < 2
+
+
+def test_make_guid_matches_sdl():
+    # Bus, CRC-16 of the name, vendor, product and version, as SDL builds it
+    assert make_guid(3, 0x044F, 0xB10A, 0x0111, b"123456789") == (
+        "03003dbb4f0400000ab1000011010000"
+    )
+    # Without IDs the name stands in for them
+    assert make_guid(0x19, 0, 0, 0, b"123456789") == (
+        "19003dbb313233343536373839000000"
+    )
+
+
+def test_input_backend_is_abstract():
+    with pytest.raises(TypeError):
+        InputBackend()
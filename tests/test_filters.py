@@ -0,0 +1,57 @@
+from array import array
+
+from ed_joy.joysticks import AxisFilter, unpack_axes
+
+
+def test_deadzone_snaps_to_centre():
+    axis_filter = AxisFilter(deadzone=5)
+    assert axis_filter.apply(0, 0, 0.5) == 50
+    assert axis_filter.apply(0, 0, 0.04) == 0
+    # Already centred, noise inside the deadzone is dropped
+    assert axis_filter.apply(0, 0, -0.03) is None
+    assert axis_filter.dropped["deadzone"] == 1
+
+
+def test_unchanged_values_are_dropped():
+    axis_filter = AxisFilter()
+    assert axis_filter.apply(0, 0, 0.251) == 25
+    # Differs before quantisation only
+    assert axis_filter.apply(0, 0, 0.259) is None
+    assert axis_filter.dropped["unchanged"] == 1
+    assert axis_filter.passed == 1
+
+
+def test_single_unit_changes_pass_by_default():
+    axis_filter = AxisFilter()
+    assert [axis_filter.apply(0, 0, v / 100) for v in (20, 21, 22)] == [20, 21, 22]
+
+
+def test_hysteresis_lets_end_stops_and_centre_through():
+    axis_filter = AxisFilter(hysteresis=3)
+    assert axis_filter.apply(0, 0, 0.97) == 97
+    assert axis_filter.apply(0, 0, 0.99) is None
+    assert axis_filter.apply(0, 0, 1.0) == 100
+    assert axis_filter.apply(0, 0, 0.02) == 2
+    assert axis_filter.apply(0, 0, 0.0) == 0
+    assert axis_filter.dropped["hysteresis"] == 1
+
+
+def test_overrides_take_priority():
+    overrides = {"1": {"deadzone": 10}, "1:2": {"deadzone": 20, "hysteresis": 4}}
+    axis_filter = AxisFilter(deadzone=1, hysteresis=2, overrides=overrides)
+    assert axis_filter.params(0, 2) == (1, 2)
+    assert axis_filter.params(1, 0) == (10, 2)
+    assert axis_filter.params(1, 2) == (20, 4)
+
+
+def test_seed_and_forget():
+    axis_filter = AxisFilter()
+    assert axis_filter.seed(3, 1, -0.5) == -50
+    assert axis_filter.apply(3, 1, -0.5) is None
+    axis_filter.forget(3)
+    assert axis_filter.apply(3, 1, -0.5) == -50
+
+
+def test_unpack_axes():
+    batch = array("i", [0, 1, -50, 2, 0, 100])
+    assert list(unpack_axes(batch)) == [(0, 1, -50), (2, 0, 100)]
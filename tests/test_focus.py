@@ -0,0 +1,89 @@
+import time
+
+import pytest
+
+from ed_joy.emitters import ProcessMonitorEmitter
+from ed_joy.process_monitor import ProcessMonitorWorker
+from ed_joy.targets import Target
+from ed_joy.windows import FakeWindowBackend
+
+
+@pytest.fixture
+def backend():
+    return FakeWindowBackend()
+
+
+@pytest.fixture
+def windows(backend):
+    """Window handles by name, none of them focused"""
+    windows = {
+        "game": backend.create_window("Elite - Dangerous (CLIENT)"),
+        "map": backend.create_window("Galaxy map"),
+        "other": backend.create_window("Browser"),
+    }
+    backend.set_foreground(windows["other"])
+    return windows
+
+
+@pytest.fixture
+def monitor(backend, windows):
+    monitor = ProcessMonitorWorker(
+        ProcessMonitorEmitter(),
+        window_backend=backend,
+        targets=[Target("game", "Elite - Dangerous"), Target("map", "Galaxy map")],
+    )
+    monitor.refocus_interval = 0.2
+    return monitor
+
+
+def focused(backend):
+    return [hwnd for hwnd, _t in backend.focused]
+
+
+def test_requests_are_coalesced(monitor, backend, windows):
+    for target in ("map", "game", "game"):
+        monitor.focus_on_monitor_window(target)
+    monitor._handle_focus_request()
+    # One focus operation, on the latest target
+    assert focused(backend) == [windows["game"]]
+    assert monitor.focus_stats["requested"] == 3
+    assert monitor.focus_stats["coalesced"] == 2
+    assert monitor.focus_stats["performed"] == 1
+
+
+def test_focused_window_is_not_refocused(monitor, backend, windows):
+    backend.set_foreground(windows["game"])
+    monitor.focus_on_monitor_window()
+    monitor._handle_focus_request()
+    assert focused(backend) == []
+    assert monitor.focus_stats["skipped"] == 1
+
+
+def test_unknown_target_is_unrouted(monitor):
+    monitor.focus_on_monitor_window("missing")
+    assert not monitor._focus_pending.is_set()
+    assert monitor.focus_stats["unrouted"] == 1
+
+
+def test_refocus_waits_for_the_interval(monitor, backend, windows):
+    monitor.focus_on_monitor_window("map")
+    monitor._handle_focus_request()
+    backend.set_foreground(windows["other"])
+    monitor.focus_on_monitor_window("map")
+    monitor._handle_focus_request()
+    (first, first_t), (second, second_t) = backend.focused
+    assert first == second == windows["map"]
+    assert second_t - first_t >= monitor.refocus_interval - 0.01
+
+
+def test_worker_handles_requests(monitor, backend, windows):
+    monitor.start()
+    try:
+        monitor.focus_on_monitor_window("map")
+        deadline = time.monotonic() + 5
+        while not backend.focused and time.monotonic() < deadline:
+            time.sleep(0.01)
+    finally:
+        monitor.stop()
+    assert backend.foreground == windows["map"]
+    assert monitor.is_process_running == [True, True]
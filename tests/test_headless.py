@@ -0,0 +1,68 @@
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip("pygame")
+pytest.importorskip("PySide6")
+
+ROOT = Path(__file__).parent.parent
+
+RUN_HEADLESS = """
+import os
+import signal
+import sys
+
+from ed_joy import headless, process_monitor, startup
+from ed_joy.supervisor import Supervisor
+from ed_joy.windows import FakeWindowBackend
+
+# No windowing system here
+process_monitor.Win32WindowBackend = FakeWindowBackend
+
+
+def ready(milestone):
+    health = Supervisor().health()
+    print("alive", sorted(name for name in health if health[name]["alive"]))
+    # As if Ctrl+C was pressed once the loops are running
+    os.kill(os.getpid(), signal.SIGTERM)
+
+
+startup.ready = ready
+headless.run({use_asyncio})
+health = Supervisor().health()
+print("stopped", not any(worker["alive"] for worker in health.values()))
+print("widgets", "PySide6.QtWidgets" in sys.modules)
+"""
+
+
+@pytest.mark.skipif(os.name == "nt", reason="SIGTERM ends the process on Windows")
+@pytest.mark.parametrize(
+    "use_asyncio, loops",
+    [
+        (False, "['joysticks', 'process_monitor_worker']"),
+        # Tasks on the main thread instead of workers
+        (True, "[]"),
+    ],
+)
+def test_headless_runs_and_stops_without_widgets(tmp_path, use_asyncio, loops):
+    env = dict(
+        os.environ,
+        PYTHONPATH=str(ROOT),
+        SDL_VIDEODRIVER="dummy",
+        SDL_AUDIODRIVER="dummy",
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", RUN_HEADLESS.format(use_asyncio=use_asyncio)],
+        cwd=tmp_path,
+        env=env,
+        capture_output=True,
+        text=True,
+        timeout=60,
+    )
+    assert result.returncode == 0, result.stderr
+    assert f"alive {loops}" in result.stdout
+    assert "stopped True" in result.stdout
+    assert "widgets False" in result.stdout
@@ -0,0 +1,103 @@
+import pytest
+
+from ed_joy.devices import DeviceRegistry
+from ed_joy.inputs import (
+    JOYAXISMOTION,
+    JOYBUTTONDOWN,
+    JOYDEVICEADDED,
+    JOYDEVICEREMOVED,
+    InputEvent,
+)
+from ed_joy.joysticks import Joysticks
+
+
+def added(instance_id, guid="guid-a", axes=(0.5,)):
+    return InputEvent(
+        JOYDEVICEADDED,
+        device_index=-1,
+        instance_id=instance_id,
+        guid=guid,
+        name=f"Stick {instance_id}",
+        num_axes=len(axes),
+        num_buttons=4,
+        num_hats=0,
+        axes=list(axes),
+    )
+
+
+def test_reconnected_device_gets_its_joy_id_back():
+    registry = DeviceRegistry()
+    assert registry.add(10, "guid-a", "Stick").joy_id == 0
+    assert registry.add(11, "guid-b", "Throttle").joy_id == 1
+    assert registry.add(10, "guid-a", "Stick") is None
+
+    registry.remove(10)
+    assert 10 not in registry
+    # A new device does not take the slot of the one unplugged
+    assert registry.add(12, "guid-c", "Pedals").joy_id == 2
+    # Replugged with a new SDL instance ID
+    assert registry.add(13, "guid-a", "Stick").joy_id == 0
+    assert registry.joy_id(13) == 0
+    assert registry.joy_id(10, default=-1) == -1
+    assert len(registry) == 3
+
+
+def test_identical_devices_get_their_own_joy_id():
+    registry = DeviceRegistry()
+    assert registry.add(1, "guid-a", "Stick").joy_id == 0
+    assert registry.add(2, "guid-a", "Stick").joy_id == 1
+
+
+@pytest.fixture
+def joysticks(monkeypatch):
+    """Fresh Joysticks, recording the signals emitted"""
+    monkeypatch.setattr(Joysticks, "_instance", None)
+    joysticks = Joysticks()
+    joysticks.emitted = []
+    emitter = joysticks.emitter
+    for name in ("device_added", "device_removed", "axes_moved", "button_down"):
+        signal = getattr(emitter, name)
+        signal.connect(lambda *args, name=name: joysticks.emitted.append((name, args)))
+    return joysticks
+
+
+def test_hotplug_only_touches_that_device(joysticks):
+    joysticks._process_events([added(10), added(20, "guid-b")])
+    assert [name for name, _args in joysticks.emitted] == [
+        "device_added",
+        "device_added",
+        "axes_moved",
+    ]
+    # Current axis positions are sent once the devices are registered
+    assert list(joysticks.emitted[-1][1][0]) == [0, 0, 50, 1, 0, 50]
+    joysticks.emitted.clear()
+
+    joysticks._process_events(
+        [
+            InputEvent(JOYAXISMOTION, joy=0, instance_id=10, axis=0, value=-1.0),
+            InputEvent(JOYDEVICEREMOVED, instance_id=20),
+        ]
+    )
+    assert [name for name, _args in joysticks.emitted] == [
+        "device_removed",
+        "axes_moved",
+    ]
+    assert joysticks.emitted[0][1] == (1,)
+    assert list(joysticks.emitted[1][1][0]) == [0, 0, -100]
+    assert list(joysticks.state.devices) == [0]
+
+
+def test_replugged_device_keeps_its_joy_id(joysticks):
+    joysticks._process_events([added(10), added(20, "guid-b")])
+    joysticks._process_events([InputEvent(JOYDEVICEREMOVED, instance_id=10)])
+    joysticks.emitted.clear()
+    joysticks._process_events(
+        [
+            added(30),
+            InputEvent(JOYBUTTONDOWN, joy=5, instance_id=30, button=2),
+        ]
+    )
+    assert joysticks.emitted[0] == ("device_added", (0, "Stick 30", 1, 4, 0))
+    assert joysticks.emitted[1][0] == "button_down"
+    assert joysticks.emitted[1][1][:2] == (0, 2)
+    assert joysticks.state.devices[0].is_pressed(2)
@@ -0,0 +1,193 @@
+import signal
+import socket
+import sys
+import time
+
+import pytest
+
+from ed_joy import launcher as launcher_module
+from ed_joy.launcher import CompanionApp, Launcher
+from ed_joy.windows import FakeWindowBackend
+
+APP_SOURCE = """
+import signal, socket, sys, time
+if sys.argv[2] == "stubborn":
+    signal.signal(signal.SIGTERM, signal.SIG_IGN)
+port = int(sys.argv[1])
+if sys.argv[3] == "listen":
+    s = socket.socket()
+    s.bind(("127.0.0.1", port))
+    s.listen()
+time.sleep(60)
+"""
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def dummy_app(name, port=None, behaviour="polite", listen=True, **kwargs):
+    """App running a Python child, listening on port once started"""
+    command = [
+        sys.executable,
+        "-c",
+        APP_SOURCE,
+        str(port or 0),
+        behaviour,
+        "listen" if port and listen else "",
+    ]
+    return CompanionApp(name, command, ready_port=port, **kwargs)
+
+
+def wait_for(predicate, timeout=10):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.01)
+
+
+@pytest.fixture
+def make_launcher():
+    launchers = []
+
+    def make(apps, **kwargs):
+        kwargs.setdefault("stop_timeout", 1.0)
+        launcher = Launcher(apps, window_backend=FakeWindowBackend(), **kwargs)
+        launchers.append(launcher)
+        return launcher
+
+    yield make
+    for launcher in launchers:
+        launcher.shutdown()
+
+
+def test_start_and_stop_apps(make_launcher):
+    launcher = make_launcher(
+        [dummy_app("port", free_port()), dummy_app("delay", ready_delay=0.2)]
+    )
+    futures = launcher.start_all()
+    assert [future.result(10) for future in futures] == ["ready", "ready"]
+    processes = dict(launcher._processes)
+
+    assert not launcher.start_all(), "apps started twice"
+    assert launcher.stop_all()
+    assert launcher.states == {"port": "stopped", "delay": "stopped"}
+    assert all(proc.poll() is not None for proc in processes.values())
+
+
+def test_app_exiting_while_starting_failed(make_launcher):
+    app = CompanionApp("crash", [sys.executable, "-c", "raise SystemExit(3)"])
+    app.ready_delay = 5
+    launcher = make_launcher([app])
+    assert launcher.start_all()[0].result(10) == "failed"
+
+
+def test_missing_executable_failed(make_launcher):
+    launcher = make_launcher([CompanionApp("missing", ["./no-such-program"])])
+    assert launcher.start_all()[0].result(10) == "failed"
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="SIGTERM is a kill on Windows")
+def test_app_ignoring_terminate_is_killed(make_launcher):
+    launcher = make_launcher(
+        [dummy_app("stubborn", free_port(), "stubborn")], stop_timeout=0.5
+    )
+    assert launcher.start_all()[0].result(10) == "ready"
+    proc = launcher._processes["stubborn"]
+
+    start = time.monotonic()
+    assert launcher.stop_all()
+    assert time.monotonic() - start >= 0.5
+    assert proc.returncode == -signal.SIGKILL
+
+
+def test_target_stopping_cancels_starts(make_launcher):
+    # Never opens its port, waits until cancelled
+    launcher = make_launcher([dummy_app("slow", free_port(), listen=False)])
+    launcher.on_process_running("default", True)
+    wait_for(lambda: "slow" in launcher._processes)
+    proc = launcher._processes["slow"]
+    launcher.on_process_running("default", False)
+    wait_for(lambda: launcher.states["slow"] == "stopped", timeout=5)
+    wait_for(lambda: proc.poll() is not None, timeout=5)
+
+
+def test_other_targets_are_ignored(make_launcher):
+    launcher = make_launcher([dummy_app("delay", ready_delay=0.1)])
+    launcher.on_process_running("other", True)
+    time.sleep(0.2)
+    assert launcher.states == {"delay": "stopped"}
+
+
+def test_restart_after_quick_stop_keeps_apps_running(make_launcher):
+    launcher = make_launcher([dummy_app("port", free_port())])
+    launcher.on_process_running("default", True)
+    launcher.on_process_running("default", False)
+    launcher.on_process_running("default", True)
+
+    wait_for(lambda: launcher.states["port"] == "ready")
+    time.sleep(0.3)
+    assert launcher.states["port"] == "ready"
+    assert launcher._processes["port"].poll() is None
+
+
+class FakeProcess:
+    pid = 4242
+
+    def __init__(self):
+        self.signals = []
+
+    def send_signal(self, sig):
+        self.signals.append(sig)
+
+    def terminate(self):
+        raise AssertionError("terminate() kills the app on Windows")
+
+
+def test_windows_closes_app_windows(make_launcher, monkeypatch):
+    monkeypatch.setattr(launcher_module, "WINDOWS", True)
+    launcher = make_launcher([])
+    backend = launcher.window_backend
+    first = backend.create_window("Tool", FakeProcess.pid)
+    second = backend.create_window("Tool settings", FakeProcess.pid)
+    other = backend.create_window("Other app", 1)
+
+    proc = FakeProcess()
+    launcher._request_exit(proc)
+    assert backend.closed == [first, second]
+    assert backend.is_window(other)
+    assert proc.signals == []
+
+
+def test_windows_console_app_gets_ctrl_break(make_launcher, monkeypatch):
+    monkeypatch.setattr(launcher_module, "WINDOWS", True)
+    monkeypatch.setattr(signal, "CTRL_BREAK_EVENT", 1, raising=False)
+    launcher = make_launcher([])
+
+    proc = FakeProcess()
+    launcher._request_exit(proc)
+    assert proc.signals == [signal.CTRL_BREAK_EVENT]
+
+
+def test_ready_window(make_launcher):
+    launcher = make_launcher([dummy_app("window", ready_window="Tool")])
+    future = launcher.start_all()[0]
+    time.sleep(0.3)
+    assert launcher.states["window"] == "starting"
+    launcher.window_backend.create_window("Tool - main")
+    assert future.result(10) == "ready"
+
+
+def test_ready_window_without_a_windowing_backend(monkeypatch, caplog):
+    monkeypatch.setattr(launcher_module, "WINDOWS", False)
+    app = dummy_app("window", ready_window="Tool", ready_delay=0.1)
+    launcher = Launcher([app], stop_timeout=1.0)
+    try:
+        assert "No windowing backend" in caplog.text
+        assert launcher.window_backend is None
+        # Falls back to ready_delay instead of importing pywin32
+        assert launcher.start_all()[0].result(10) == "ready"
+    finally:
+        launcher.shutdown()
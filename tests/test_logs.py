@@ -0,0 +1,32 @@
+import logging
+
+from ed_joy.logs import RATE_LIMITED, RateLimitFilter
+
+
+def record(msg, rate_limited=True):
+    record = logging.LogRecord("test", logging.INFO, __file__, 1, msg, (), None)
+    if rate_limited:
+        record.__dict__.update(RATE_LIMITED)
+    return record
+
+
+def test_rate_limited_messages(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr("ed_joy.logs.time.monotonic", lambda: now[0])
+    rate_limit = RateLimitFilter(interval=1.0)
+    assert rate_limit.filter(record("axis %s"))
+    assert not rate_limit.filter(record("axis %s"))
+    assert not rate_limit.filter(record("axis %s"))
+    # Each message is limited on its own
+    assert rate_limit.filter(record("button %s"))
+
+    now[0] += 1.0
+    let_through = record("axis %s")
+    assert rate_limit.filter(let_through)
+    assert let_through.msg == "axis %s (2 similar suppressed)"
+    assert not rate_limit.filter(record("axis %s"))
+
+
+def test_other_records_are_not_limited():
+    rate_limit = RateLimitFilter(interval=60)
+    assert all(rate_limit.filter(record("started", False)) for _ in range(3))
@@ -0,0 +1,69 @@
+import time
+import urllib.error
+import urllib.request
+
+import pytest
+
+from ed_joy.metrics import CONTENT_TYPE, Metrics, MetricsServer
+
+
+@pytest.fixture
+def metrics(monkeypatch):
+    """Fresh registry"""
+    monkeypatch.setattr(Metrics, "_instance", None)
+    return Metrics()
+
+
+def test_exposition(metrics):
+    metrics.counter("ed_joy_events_total", "Events", ("kind",)).labels("axis").inc(3)
+    metrics.gauge("ed_joy_joysticks", "Joysticks connected").set(2)
+    latency = metrics.summary("ed_joy_latency_seconds", "Latency")
+    for value in (0.1, 0.2, 0.3):
+        latency.observe(value)
+
+    lines = metrics.exposition().splitlines()
+    assert lines[:3] == [
+        "# HELP ed_joy_events_total Events",
+        "# TYPE ed_joy_events_total counter",
+        'ed_joy_events_total{kind="axis"} 3.0',
+    ]
+    assert "# TYPE ed_joy_joysticks gauge" in lines
+    assert "ed_joy_joysticks 2.0" in lines
+    assert "# TYPE ed_joy_latency_seconds summary" in lines
+    assert 'ed_joy_latency_seconds{quantile="0.5"} 0.2' in lines
+    assert "ed_joy_latency_seconds_count 3.0" in lines
+    assert any(line.startswith("ed_joy_latency_seconds_sum 0.6") for line in lines)
+
+
+def test_label_values_are_escaped(metrics):
+    counter = metrics.counter("ed_joy_errors_total", "Errors", ("error",))
+    counter.labels('bad "path"\\\n').inc()
+    assert 'ed_joy_errors_total{error="bad \\"path\\"\\\\\\n"} 1.0' in (
+        metrics.exposition().splitlines()
+    )
+
+
+def test_metric_kind_is_checked(metrics):
+    metrics.counter("ed_joy_things_total", "Things")
+    with pytest.raises(TypeError):
+        metrics.gauge("ed_joy_things_total", "Things")
+
+
+def test_server(metrics):
+    metrics.counter("ed_joy_requests_total", "Requests").inc()
+    server = MetricsServer(0)
+    server.start()
+    try:
+        # Bound on the worker thread
+        deadline = time.monotonic() + 5
+        while server._server is None:
+            assert time.monotonic() < deadline, "timed out"
+            time.sleep(0.01)
+        url = f"http://127.0.0.1:{server._server.server_port}"
+        with urllib.request.urlopen(f"{url}/metrics", timeout=5) as response:
+            assert response.headers["Content-Type"] == CONTENT_TYPE
+            assert "ed_joy_requests_total 1.0" in response.read().decode()
+        with pytest.raises(urllib.error.HTTPError):
+            urllib.request.urlopen(f"{url}/other", timeout=5)
+    finally:
+        server.stop()
@@ -0,0 +1,90 @@
+import pytest
+
+from ed_joy.inputs import (
+    JOYAXISMOTION,
+    JOYBUTTONDOWN,
+    JOYBUTTONUP,
+    JOYHATMOTION,
+    InputEvent,
+)
+from ed_joy.recording import (
+    AXIS,
+    HEADER,
+    SESSION,
+    InputRecorder,
+    ReplaySource,
+    read_records,
+)
+
+EVENTS = [
+    InputEvent(JOYAXISMOTION, joy=1, instance_id=7, axis=2, value=-0.5),
+    InputEvent(JOYBUTTONDOWN, joy=1, instance_id=7, button=3),
+    InputEvent(JOYBUTTONUP, joy=1, instance_id=7, button=3),
+    InputEvent(JOYHATMOTION, joy=0, instance_id=4, hat=0, value=(-1, 1)),
+]
+
+
+def attrs(event):
+    return {k: v for k, v in vars(event).items() if k != "instance_id"}
+
+
+def test_round_trip(tmp_path):
+    path = tmp_path / "input.edjr"
+    recorder = InputRecorder(path)
+    for i, event in enumerate(EVENTS):
+        recorder.record(event, 100.0 + i)
+    recorder.record(InputEvent(0x300), 105.0)  # Not a joystick event
+    recorder.close()
+    assert recorder.count == len(EVENTS)
+
+    records = list(read_records(path))
+    assert records[0][1] == SESSION
+    # Each event keeps its own timestamp
+    assert [record[0] for record in records[1:]] == [100.0, 101.0, 102.0, 103.0]
+
+    source = ReplaySource(path, realtime=False, idle=0)
+    replayed = source.wait_for_events()
+    assert source.finished
+    assert [attrs(event) for event in replayed] == [
+        {**attrs(event), "value": pytest.approx(event.value, abs=1e-4)}
+        if event.type == JOYAXISMOTION
+        else attrs(event)
+        for event in EVENTS
+    ]
+    # Replayed events are addressed by joystick ID
+    assert [event.instance_id for event in replayed] == [1, 1, 1, 0]
+
+
+def test_sessions_share_a_file(tmp_path):
+    path = tmp_path / "input.edjr"
+    for value in (0.25, 0.75):
+        recorder = InputRecorder(path)
+        recorder.record(
+            InputEvent(JOYAXISMOTION, joy=0, instance_id=0, axis=0, value=value),
+            1.0,
+        )
+        recorder.close()
+
+    kinds = [record[1] for record in read_records(path)]
+    assert kinds == [SESSION, AXIS, SESSION, AXIS]
+
+
+def test_realtime_replay_keeps_the_event_spacing(tmp_path):
+    path = tmp_path / "input.edjr"
+    recorder = InputRecorder(path)
+    recorder.record(EVENTS[1], 10.0)
+    recorder.record(EVENTS[2], 10.2)
+    recorder.close()
+
+    source = ReplaySource(path, realtime=True, idle=0.5)
+    assert len(source.wait_for_events()) == 1
+    # The release is due 200ms later, not in the same batch
+    assert [event.type for event in source.wait_for_events()] == [JOYBUTTONUP]
+
+
+@pytest.mark.parametrize("data", [b"", b"ED", HEADER.pack(b"NOPE", 1)])
+def test_not_a_recording(tmp_path, data):
+    path = tmp_path / "input.edjr"
+    path.write_bytes(data)
+    with pytest.raises(ValueError):
+        list(read_records(path))
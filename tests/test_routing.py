@@ -0,0 +1,51 @@
+from array import array
+
+import pytest
+
+from ed_joy.process_monitor import route_axes
+from ed_joy.settings import DEFAULT_TARGET, SettingsSnapshot
+
+
+def snapshot(settings):
+    """SettingsSnapshot only reads dotted keys, so a dict stands in for Settings"""
+    return SettingsSnapshot(settings)
+
+
+def test_route_axes_picks_the_last_monitored_joystick():
+    routes = {0: "game", 2: "map"}
+    assert route_axes(array("i", [0, 0, 10, 1, 0, 5]), routes) == "game"
+    assert route_axes(array("i", [2, 1, 10, 0, 0, 5, 1, 0, 3]), routes) == "game"
+    assert route_axes(array("i", [0, 0, 10, 2, 1, 5]), routes) == "map"
+
+
+def test_route_axes_without_monitored_joysticks():
+    assert route_axes(array("i", [1, 0, 10]), {0: "game"}) is None
+    assert route_axes(array("i"), {0: "game"}) is None
+
+
+def test_monitored_joysticks_default_to_the_process_target():
+    snap = snapshot({"monitor.joysticks": [0, 1]})
+    assert snap.routes == {0: DEFAULT_TARGET, 1: DEFAULT_TARGET}
+    assert [target.name for target in snap.targets] == [DEFAULT_TARGET]
+
+
+@pytest.mark.parametrize(
+    "routes, expected",
+    [
+        ({"1": "map"}, {0: DEFAULT_TARGET, 1: "map"}),
+        # Not monitored, unknown target, not a joystick ID
+        ({"5": "map"}, {0: DEFAULT_TARGET, 1: DEFAULT_TARGET}),
+        ({"1": "missing"}, {0: DEFAULT_TARGET, 1: DEFAULT_TARGET}),
+        ({"stick": "map"}, {0: DEFAULT_TARGET, 1: DEFAULT_TARGET}),
+    ],
+)
+def test_routes(routes, expected):
+    snap = snapshot(
+        {
+            "monitor.joysticks": [0, 1],
+            "monitor.targets": {"map": {"title": "Galaxy map"}},
+            "monitor.routes": routes,
+        }
+    )
+    assert snap.routes == expected
+    assert [target.title for target in snap.targets][1:] == ["Galaxy map"]
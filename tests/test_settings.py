@@ -0,0 +1,131 @@
+import time
+from pathlib import Path
+
+import pytest
+import toml
+
+from ed_joy.settings import SETTINGS_VERSION, Settings
+
+CONFIG = Path("config\\settings.toml")
+
+
+@pytest.fixture
+def load(tmp_path, monkeypatch):
+    """Create a fresh Settings, loading the given saved settings if any"""
+    monkeypatch.chdir(tmp_path)
+    loaded = []
+
+    def load(saved=None, writer=False):
+        if saved is not None:
+            CONFIG.parent.mkdir(parents=True, exist_ok=True)
+            CONFIG.write_text(toml.dumps(saved))
+        monkeypatch.setattr(Settings, "_instance", None)
+        settings = Settings()
+        if not writer:
+            settings.stop_writer()
+        loaded.append(settings)
+        return settings
+
+    yield load
+    for settings in loaded:
+        settings.close()
+
+
+def test_defaults(load):
+    settings = load()
+    assert settings["joysticks.filter.hysteresis"] == 0
+    assert settings["settings.version"] == SETTINGS_VERSION
+
+
+def test_saved_hysteresis_default_is_migrated(load):
+    settings = load({"joysticks": {"filter": {"hysteresis": 1}}})
+    assert settings["joysticks.filter.hysteresis"] == 0
+    assert settings["settings.version"] == SETTINGS_VERSION
+
+
+def test_chosen_hysteresis_is_kept(load):
+    settings = load({"joysticks": {"filter": {"hysteresis": 3}}})
+    assert settings["joysticks.filter.hysteresis"] == 3
+
+
+def test_migrations_only_run_once(load):
+    saved = {
+        "settings": {"version": SETTINGS_VERSION},
+        "joysticks": {"filter": {"hysteresis": 1}},
+    }
+    settings = load(saved)
+    # Set after the migration, so the user chose it
+    assert settings["joysticks.filter.hysteresis"] == 1
+
+
+def saved():
+    return toml.loads(CONFIG.read_text())
+
+
+def test_changes_are_written_behind(load):
+    settings = load(writer=True)
+    settings.save_delay = 0.05
+    settings.flush()
+    writes = settings.writes
+    for i in range(10):
+        settings["monitor.joysticks"] = list(range(i))
+    deadline = time.monotonic() + 5
+    while settings.writes == writes and time.monotonic() < deadline:
+        time.sleep(0.01)
+    time.sleep(0.1)
+    # Batched into a single write
+    assert settings.writes == writes + 1
+    assert saved()["monitor"]["joysticks"] == list(range(9))
+
+
+def test_flush_writes_pending_changes_once(load):
+    settings = load()
+    settings.flush()
+    writes = settings.writes
+    settings["metrics.port"] = 9000
+    settings.flush()
+    settings.flush()
+    assert settings.writes == writes + 1
+    assert saved()["metrics"]["port"] == 9000
+
+
+def test_pending_change_is_written_without_the_wake_flag(load):
+    settings = load()
+    settings["metrics.port"] = 9001
+    # As if a racing flush had cleared the flag before this change was saved
+    settings._dirty.clear()
+    settings.flush()
+    assert saved()["metrics"]["port"] == 9001
+
+
+def test_file_is_replaced_atomically(load):
+    settings = load()
+    settings["metrics.port"] = 9002
+    settings.flush()
+    assert saved()["metrics"]["port"] == 9002
+    assert list(CONFIG.parent.iterdir()) == [CONFIG]
+
+
+def test_snapshot_is_typed_and_read_only(load):
+    settings = load({"monitor": {"joysticks": ["1", "3"]}})
+    snapshot = settings.snapshot
+    assert snapshot.monitored_joysticks == frozenset({1, 3})
+    assert snapshot.is_monitored(3)
+    assert not snapshot.is_monitored(2)
+    assert snapshot.refocus_interval == 0.25
+    with pytest.raises(AttributeError):
+        snapshot.process_enabled = True
+
+
+def test_snapshot_is_replaced_on_change(load):
+    settings = load()
+    seen = []
+    settings.subscribe(seen.append)
+    before = settings.snapshot
+    settings["monitor.process.enabled"] = True
+    assert not before.process_enabled
+    assert settings.snapshot.process_enabled
+    assert seen == [settings.snapshot]
+    settings.unsubscribe(seen.append)
+    settings["monitor.process.enabled"] = False
+    assert len(seen) == 1
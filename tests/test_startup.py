@@ -0,0 +1,58 @@
+import os
+import subprocess
+import sys
+import textwrap
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip("pygame")
+pytest.importorskip("PySide6")
+
+ROOT = Path(__file__).parent.parent
+
+
+def run_python(code, cwd):
+    """Run code in a fresh interpreter, so pygame is not already imported"""
+    env = dict(
+        os.environ,
+        PYTHONPATH=str(ROOT),
+        SDL_VIDEODRIVER="dummy",
+        SDL_AUDIODRIVER="dummy",
+        QT_QPA_PLATFORM="offscreen",
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", textwrap.dedent(code)],
+        cwd=cwd,
+        env=env,
+        capture_output=True,
+        text=True,
+        timeout=60,
+    )
+    assert result.returncode == 0, result.stderr
+    return result.stdout
+
+
+def test_pygame_is_imported_when_the_joysticks_start(tmp_path):
+    out = run_python(
+        """
+        import sys
+        import types
+
+        from ed_joy import joysticks
+
+        print("before", "pygame" in sys.modules)
+        j = joysticks.Joysticks()
+        j.start()
+        assert j.stop()
+        pygame = sys.modules["pygame"]
+        print("module", type(pygame) is types.ModuleType)
+        print("same", joysticks.pg is pygame)
+        print("version", pygame.version.ver)
+        """,
+        tmp_path,
+    )
+    assert "before False" in out
+    assert "module True" in out
+    assert "same True" in out
+    assert "version 2." in out
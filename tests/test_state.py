@@ -0,0 +1,64 @@
+from ed_joy.state import StateTable
+
+
+def test_publish_swaps_in_a_new_snapshot():
+    table = StateTable()
+    table.add_device(0, num_axes=2, num_hats=1)
+    table.set_axis(0, 1, 0.5)
+    table.set_button(0, 3, True)
+    table.set_hat(0, 0, [1, -1])
+    before = table.snapshot()
+    assert before.seq == 0 and before.devices == {}
+
+    assert table.publish(12.5)
+    snapshot = table.snapshot()
+    assert (snapshot.seq, snapshot.timestamp) == (1, 12.5)
+    device = snapshot.devices[0]
+    assert list(device.axes) == [0.0, 0.5]
+    assert device.is_pressed(3) and not device.is_pressed(2)
+    assert device.hats == [(1, -1)]
+    # Nothing changed since
+    assert not table.publish(13.0)
+
+
+def test_published_snapshots_are_not_modified():
+    table = StateTable()
+    table.add_device(0, 1, 0)
+    table.publish(1.0)
+    snapshot = table.snapshot()
+    table.set_axis(0, 0, -1.0)
+    table.set_button(0, 0, True)
+    assert list(snapshot.devices[0].axes) == [0.0]
+    assert snapshot.devices[0].buttons == 0
+    table.publish(2.0)
+    assert list(table.snapshot().devices[0].axes) == [-1.0]
+
+
+def test_unchanged_devices_are_shared():
+    table = StateTable()
+    table.add_device(0, 1, 0)
+    table.add_device(1, 1, 0)
+    table.publish(1.0)
+    first = table.snapshot()
+    table.set_axis(1, 0, 1.0)
+    table.publish(2.0)
+    second = table.snapshot()
+    assert second.devices[0] is first.devices[0]
+    assert second.devices[1] is not first.devices[1]
+
+
+def test_inputs_past_the_known_counts_and_removal():
+    table = StateTable()
+    table.set_axis(2, 3, 0.25)
+    table.set_hat(2, 1, (0, 1))
+    table.set_button(2, 1, True)
+    table.set_button(2, 1, False)
+    table.publish(1.0)
+    device = table.snapshot().devices[2]
+    assert list(device.axes) == [0.0, 0.0, 0.0, 0.25]
+    assert device.hats == [(0, 0), (0, 1)]
+    assert device.buttons == 0
+
+    table.remove_device(2)
+    assert table.publish(2.0)
+    assert table.snapshot().devices == {}
@@ -0,0 +1,25 @@
+import threading
+
+from ed_joy.supervisor import Worker
+
+
+def test_restart():
+    worker = Worker("test_restart", lambda: worker.wait(1))
+    worker.start()
+    thread = worker._thread
+    assert worker.restart()
+    assert worker.is_alive() and worker._thread is not thread
+    assert worker.stop()
+
+
+def test_restart_reports_a_stuck_worker(caplog):
+    release = threading.Event()
+    worker = Worker("test_stuck", lambda: release.wait(5))
+    worker.start()
+    thread = worker._thread
+    assert not worker.restart(timeout=0.05)
+    # Left stopping, not started a second time
+    assert worker._thread is thread and worker.stopping
+    assert "not restarted" in caplog.text
+    release.set()
+    assert worker.stop()
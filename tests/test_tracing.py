@@ -0,0 +1,48 @@
+import json
+import threading
+
+from ed_joy import tracing
+from ed_joy.tracing import TraceRecorder
+
+
+def test_chrome_trace(tmp_path, capsys):
+    recorder = TraceRecorder(tmp_path / "trace.json")
+    start = recorder.origin + 0.001
+    recorder.complete("poll", "joysticks", start, start + 0.002, {"events": 3})
+
+    def worker():
+        recorder.complete("focus", "process_monitor", start, start + 0.001)
+
+    thread = threading.Thread(target=worker, name="trace_test_worker")
+    thread.start()
+    thread.join()
+    recorder.write()
+    assert "2 spans" in capsys.readouterr().out
+
+    data = json.loads(recorder.path.read_text())
+    events = data["traceEvents"]
+    names = {e["tid"]: e["args"]["name"] for e in events if e["ph"] == "M"}
+    assert "trace_test_worker" in names.values()
+    poll, focus = (e for e in events if e["ph"] == "X")
+    assert poll["name"] == "poll" and poll["cat"] == "joysticks"
+    assert round(poll["ts"]) == 1000 and round(poll["dur"]) == 2000
+    assert poll["args"] == {"events": 3}
+    assert "args" not in focus
+    assert names[focus["tid"]] == "trace_test_worker"
+    assert data["otherData"] == {"recorded": 2, "dropped": 0}
+
+
+def test_ring_buffer_drops_the_oldest_spans(tmp_path):
+    recorder = TraceRecorder(tmp_path / "trace.json", capacity=2)
+    for i in range(5):
+        recorder.complete(f"span{i}", "test", i, i + 1)
+    spans = [e["name"] for e in recorder.events() if e["ph"] == "X"]
+    assert spans == ["span3", "span4"]
+    assert recorder.recorded == 5
+
+
+def test_spans_are_free_when_disabled(monkeypatch):
+    monkeypatch.setattr(tracing, "_recorder", None)
+    assert not tracing.is_enabled()
+    assert tracing.span("poll", "joysticks") is tracing.span("emit", "emit")
+    tracing.complete("poll", "joysticks", tracing.now())
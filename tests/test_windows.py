@@ -0,0 +1,182 @@
+from ed_joy.windows import FakeWindowBackend, Target, WindowMatcher, WindowTracker
+
+
+def make_tracker(targets, notifications=True):
+    backend = FakeWindowBackend(notifications)
+    tracker = WindowTracker(backend, WindowMatcher(targets))
+    tracker.start()
+    return backend, tracker
+
+
+def test_fake_backend_windows_and_processes():
+    backend = FakeWindowBackend()
+    pid = backend.create_process("game.exe")
+    hwnd = backend.create_window("Game", pid)
+    assert backend.enum_windows() == [(hwnd, "Game")]
+    assert backend.get_window_pid(hwnd) == pid
+    assert backend.get_process_name(pid) == "game.exe"
+
+    backend.focus_window(hwnd)
+    assert backend.get_foreground_window() == hwnd
+
+    backend.kill_process(pid)
+    assert not backend.is_window(hwnd)
+    assert not backend.is_process_alive(pid)
+    assert backend.get_foreground_window() is None
+
+
+def test_fake_backend_queues_notifications_until_pump():
+    backend = FakeWindowBackend()
+    received = []
+    assert backend.subscribe(lambda kind, hwnd: received.append((kind, hwnd)))
+    hwnd = backend.create_window("Game")
+    backend.set_title(hwnd, "Game - menu")
+    backend.destroy_window(hwnd)
+    assert received == []
+
+    backend.pump()
+    assert received == [("create", hwnd), ("title", hwnd), ("destroy", hwnd)]
+
+
+def test_fake_backend_without_notifications():
+    backend = FakeWindowBackend(notifications=False)
+    assert not backend.subscribe(lambda kind, hwnd: None)
+
+
+def test_tracker_finds_every_target_in_one_scan():
+    backend = FakeWindowBackend()
+    backend.create_window("Notepad")
+    game = backend.create_window("Elite - Dangerous")
+    galaxy = backend.create_window("galaxy MAP")
+    tracker = WindowTracker(
+        backend, WindowMatcher([Target("game", "Elite"), Target("map", "Galaxy map")])
+    )
+    tracker.start()
+
+    assert tracker.refresh() == (game, galaxy)
+    assert tracker.stats["scans"] == 1
+
+
+def test_tracker_follows_notifications_without_rescanning():
+    backend, tracker = make_tracker([Target("game", "Elite")])
+    assert tracker.refresh() == (None,)
+    scans = tracker.stats["scans"]
+
+    hwnd = backend.create_window("Elite - Dangerous")
+    assert tracker.refresh() == (hwnd,)
+
+    backend.set_title(hwnd, "Something else")
+    assert tracker.refresh() == (None,)
+
+    backend.set_title(hwnd, "Elite - Dangerous")
+    assert tracker.refresh() == (hwnd,)
+
+    backend.destroy_window(hwnd)
+    assert tracker.refresh() == (None,)
+    assert tracker.stats["scans"] == scans
+
+
+def test_tracker_without_notifications_validates_titles():
+    backend, tracker = make_tracker([Target("game", "Elite")], notifications=False)
+    hwnd = backend.create_window("Elite - Dangerous")
+    assert tracker.refresh() == (hwnd,)
+
+    backend.set_title(hwnd, "Something else")
+    assert tracker.refresh() == (None,)
+
+
+def test_tracker_keeps_process_match_across_title_changes():
+    backend, tracker = make_tracker([Target("game", executable="Game.exe")])
+    pid = backend.create_process("game.exe")
+    hwnd = backend.create_window("Loading", pid)
+    assert tracker.refresh() == (hwnd,)
+    assert tracker.pid == pid
+
+    backend.set_title(hwnd, "Elite - Dangerous")
+    assert tracker.refresh() == (hwnd,)
+
+    backend.kill_process(pid)
+    assert tracker.refresh() == (None,)
+
+
+def test_tracker_looks_each_process_up_once():
+    backend, tracker = make_tracker([Target("game", executable="game.exe")])
+    pid = backend.create_process("other.exe")
+    for i in range(3):
+        backend.create_window(f"Other {i}", pid)
+    tracker.refresh()
+    assert tracker.stats["process_lookups"] == 1
+
+
+def test_tracker_forgets_process_when_its_last_window_is_destroyed():
+    backend, tracker = make_tracker([Target("game", executable="game.exe")])
+    pid = backend.create_process("other.exe")
+    first = backend.create_window("Other", pid)
+    second = backend.create_window("Other too", pid)
+    tracker.refresh()
+    assert tracker._processes == {pid: -1}
+
+    backend.destroy_window(first)
+    tracker.refresh()
+    assert tracker._processes == {pid: -1}
+
+    backend.destroy_window(second)
+    tracker.refresh()
+    assert tracker._processes == {}
+
+
+def test_tracker_matches_reused_pid():
+    backend, tracker = make_tracker([Target("game", executable="game.exe")])
+    pid = backend.create_process("other.exe")
+    hwnd = backend.create_window("Other", pid)
+    assert tracker.refresh() == (None,)
+
+    backend.kill_process(pid)
+    tracker.refresh()
+    # The PID is handed to the game
+    backend.processes[pid] = "game.exe"
+    hwnd = backend.create_window("Elite - Dangerous", pid)
+    assert tracker.refresh() == (hwnd,)
+
+
+def test_tracker_stop_untracks_and_unsubscribes():
+    backend, tracker = make_tracker([Target("game", "Elite")])
+    backend.create_window("Elite - Dangerous")
+    tracker.refresh()
+
+    tracker.stop()
+    assert tracker.hwnds == (None,)
+    backend.create_window("Elite - Dangerous")
+    backend.pump()
+    assert tracker.hwnds == (None,)
+
+
+def test_matcher_skips_targets_already_tracked():
+    match = WindowMatcher([Target("game", "Elite"), Target("launcher", "Launcher")])
+    title = "Elite Dangerous Launcher"
+    assert match.match_title(title) == 0
+    assert match.match_title(title, skip={0}) == 1
+    assert match.match_title(title, skip={0, 1}) is None
+
+
+def test_tracker_tracks_windows_matching_several_targets():
+    backend, tracker = make_tracker(
+        [Target("game", "Elite"), Target("launcher", "Elite Dangerous Launcher")]
+    )
+    game = backend.create_window("Elite - Dangerous")
+    launcher = backend.create_window("Elite Dangerous Launcher")
+    assert tracker.refresh() == (game, launcher)
+
+    # Renaming one window must not untrack the other
+    backend.set_title(launcher, "Elite Dangerous Launcher - updating")
+    assert tracker.refresh() == (game, launcher)
+
+
+def test_tracker_process_match_does_not_hide_title_match():
+    backend, tracker = make_tracker(
+        [Target("game", executable="game.exe"), Target("map", "Galaxy map")]
+    )
+    pid = backend.create_process("game.exe")
+    game = backend.create_window("Elite - Dangerous", pid)
+    galaxy = backend.create_window("Galaxy map", pid)
+    assert tracker.refresh() == (game, galaxy)